@@ -0,0 +1,25 @@
+# gunicorn 설정: gunicorn -c config/gunicorn.conf.py config.wsgi:application
+# 명령행 옵션(--workers, --preload 등)이 이 파일 값보다 우선한다.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv('GUNICORN_WORKERS', '3'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+# 마스터에서 앱을 한 번 로드하고 워밍업한 뒤 포크 (인덱스/템플릿을 워커끼리 copy-on-write 공유)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'False').lower() in ('1', 'true', 'yes')
+
+
+def when_ready(server):
+    # 워커를 띄우기 직전, 마스터에서 실행 (--preload일 때만 앱이 로드돼 있음)
+    if server.cfg.preload_app:
+        from shop.utils.warmup import warmup
+
+        timings = warmup(freeze=True)
+        server.log.info('warmup: %s', timings)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from shop.utils.warmup import worker_started
+
+        worker_started()
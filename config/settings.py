@@ -58,12 +58,16 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # Static files via WhiteNoise (must be right after SecurityMiddleware)
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # 뷰별 처리 시간/DB 쿼리 계측 (/metrics, Server-Timing)
+    'shop.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # 요청 단위 프로파일링 (서명 헤더/스태프 ?_profile=1/표본 추출, request.user 필요)
+    'shop.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -78,6 +82,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'shop.context_processors.catalog',
             ],
         },
     },
@@ -114,23 +119,68 @@ def _fix_db_url(url: str | None) -> str | None:
 DATABASE_URL = _fix_db_url(os.getenv('DATABASE_URL'))
 DIRECT_URL = _fix_db_url(os.getenv('DIRECT_URL'))
 
+# 연결 풀 (psycopg 3 ConnectionPool, Django 5.1+): 워커마다 DB_POOL_MIN_SIZE~MAX_SIZE개 연결을 재사용
+# psycopg_pool(psycopg[pool])이 없으면 기존 지속 연결(conn_max_age=600) 방식 사용
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+DB_POOL = ConnectionPool is not None and os.getenv('DB_POOL', 'True').lower() in ('1', 'true', 'yes')
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # 풀에서 연결을 기다리는 최대 시간(초)
+DB_DIRECT_POOL_MAX_SIZE = int(os.getenv('DB_DIRECT_POOL_MAX_SIZE', '4'))
+
+
+def _postgres_config(url, min_size, max_size):
+    """URL → DATABASES 항목. config()는 DATABASE_URL 환경변수를 우선하므로 parse()로 주어진 URL을 그대로 사용
+    - 풀 사용 시 conn_max_age=0 (Django가 지속 연결과 풀을 함께 쓰지 못하게 함)
+    - conn_health_checks: 풀에서는 꺼낼 때마다 끊긴 연결 확인(check_connection)으로 적용됨
+    """
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
+    )
+    if DB_POOL and config['ENGINE'].endswith('postgresql'):
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': min_size,
+            'max_size': max_size,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    return config
+
+
+# 읽기 복제본: 쉼표로 구분한 URL 목록과 같은 순서의 가중치 (기본 1). 별칭은 replica1, replica2, ...
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+DATABASE_REPLICA_WEIGHTS = [int(w) for w in os.getenv('DATABASE_REPLICA_WEIGHTS', '').split(',') if w.strip()]
+DB_REPLICA_POOL_MAX_SIZE = int(os.getenv('DB_REPLICA_POOL_MAX_SIZE', '10'))
+DATABASE_REPLICAS = {}  # {별칭: 가중치}, 아래에서 채움
+REPLICA_HEALTH_INTERVAL = float(os.getenv('REPLICA_HEALTH_INTERVAL', '10'))  # 상태 확인 주기(초)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '30'))  # 초과 시 제외 (0이면 확인 안 함)
+REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', '5'))  # 카탈로그 쓰기 후 primary 고정 시간(초)
+
 # Supabase PostgreSQL 연결
 try:
     if DATABASE_URL:
-        # Supabase 연결
+        # 풀러(pgbouncer 트랜잭션 모드, 6543) 경유 웹 트래픽용
         DATABASES = {
-            'default': dj_database_url.config(
-                default=DATABASE_URL,
-                conn_max_age=600,
-                conn_health_checks=True,
-            )
+            'default': _postgres_config(DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
         }
-        # 마이그레이션용 직접 연결 설정 (선택)
+        # 트랜잭션 풀링에서는 서버 측 커서(WITH HOLD)를 쓸 수 없음
+        if os.getenv('DB_TRANSACTION_POOLER', str(':6543/' in DATABASE_URL)).lower() in ('1', 'true', 'yes'):
+            DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+        # 직접 연결: 마이그레이션, 벡터 검색, 대량 임포트 (shop.db_routers.PrimaryDirectRouter)
         if DIRECT_URL:
-            DATABASES['direct'] = dj_database_url.config(
-                default=DIRECT_URL,
-                conn_max_age=0,
-            )
+            DATABASES['direct'] = _postgres_config(DIRECT_URL, 1, DB_DIRECT_POOL_MAX_SIZE)
+            # 같은 DB이므로 테스트에서는 default 테스트 DB를 그대로 사용
+            DATABASES['direct']['TEST'] = {'MIRROR': 'default'}
+        # 읽기 복제본 (선택): 카탈로그 조회를 가중 라운드로빈으로 분산
+        for i, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+            alias = f'replica{i}'
+            DATABASES[alias] = _postgres_config(_fix_db_url(url), 1, DB_REPLICA_POOL_MAX_SIZE)
+            DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+            DATABASE_REPLICAS[alias] = (DATABASE_REPLICA_WEIGHTS[i - 1] if i <= len(DATABASE_REPLICA_WEIGHTS) else 1)
     else:
         raise ValueError("SQLite로 전환")
 except Exception:
@@ -143,6 +193,12 @@ except Exception:
     }
 
 
+# 카탈로그 조회 → 읽기 복제본, 벡터 검색/대량 임포트 → 직접 연결(direct), 나머지 → default
+DATABASE_ROUTERS = ['shop.db_routers.CatalogReplicaRouter', 'shop.db_routers.PrimaryDirectRouter']
+
+# 커버링 인덱스의 INCLUDE 컬럼은 PostgreSQL 전용 (SQLite 로컬 개발에서는 무시되어도 됨)
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -179,7 +235,44 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic이 내용 해시 이름 + .gz/.br 사전 압축본을 만듦 (Brotli 패키지가 있으면 .br도 생성)
+# ShopStaticFilesStorage: collectstatic 전에는 해시 없는 이름 사용 (shop/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'shop.staticfiles.ShopStaticFilesStorage'},
+}
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'shop.staticfiles.BundleFinder',
+]
+# 템플릿 인라인 CSS/JS 대신 쓰는 번들 {번들 이름: [원본]} (shop/utils/bundles.py에서 이어 붙여 최소화)
+STATIC_BUNDLES = {
+    **{
+        f'shop/bundles/{page}.css': ['shop/css/base.css', f'shop/css/{page}.css']
+        for page in ('home', 'product_list', 'product_detail', 'cart', 'consent_form')
+    },
+    'shop/bundles/home.js': ['shop/js/home.js'],
+    'shop/bundles/product_list.js': ['shop/js/common.js', 'shop/js/product_list.js'],
+    'shop/bundles/product_detail.js': ['shop/js/common.js', 'shop/js/product_detail.js'],
+    'shop/bundles/cart.js': ['shop/js/common.js', 'shop/js/cart.js'],
+    'shop/bundles/consent_form.js': ['shop/js/consent_form.js'],
+}
+# 만든 번들을 두는 곳 (collectstatic이 여기서 STATIC_ROOT로 복사)
+STATIC_BUNDLE_DIR = Path(os.getenv('STATIC_BUNDLE_DIR') or BASE_DIR / 'build' / 'static')
+
+# 업로드/생성 파일 (상품 썸네일). 운영에서는 nginx가 /media/를 직접 서빙
+MEDIA_URL = '/media/'
+MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', BASE_DIR / 'media'))
+
+# 상품 이미지 썸네일 (shop/utils/images.py). False면 외부 원본 URL을 그대로 사용
+THUMBNAILS_ENABLED = os.getenv('THUMBNAILS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+THUMBNAIL_WIDTHS = [int(w) for w in os.getenv('THUMBNAIL_WIDTHS', '160,320,640').split(',') if w.strip()]
+THUMBNAIL_FORMATS = [f.strip() for f in os.getenv('THUMBNAIL_FORMATS', 'webp,jpeg').split(',') if f.strip()]
+THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', '80'))
+IMAGE_FETCH_TIMEOUT = float(os.getenv('IMAGE_FETCH_TIMEOUT', '10'))  # 원본 다운로드 제한 시간(초)
+IMAGE_FETCH_MAX_BYTES = int(os.getenv('IMAGE_FETCH_MAX_BYTES', str(10 * 1024 * 1024)))
+THUMBNAIL_RETRY_SECONDS = int(os.getenv('THUMBNAIL_RETRY_SECONDS', '3600'))  # 원본 다운로드 실패 후 재시도까지(초)
 
 # Behind Fly.io proxy
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -189,3 +282,136 @@ USE_X_FORWARDED_HOST = True
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# 상품 검색 설정
+# SEARCH_MODE: 'lexical'(문자열 일치, 기본) 또는 'hybrid'(문자열 + 벡터 RRF)
+# 요청별로 /shop/products/?q=...&mode=hybrid 로도 전환 가능
+SEARCH_MODE = os.getenv('SEARCH_MODE', 'lexical')
+# 문자열/벡터 각각에서 가져올 후보 수
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', '50'))
+# RRF 상수 k 및 가중치
+SEARCH_RRF_K = int(os.getenv('SEARCH_RRF_K', '60'))
+SEARCH_LEXICAL_WEIGHT = float(os.getenv('SEARCH_LEXICAL_WEIGHT', '1.0'))
+SEARCH_VECTOR_WEIGHT = float(os.getenv('SEARCH_VECTOR_WEIGHT', '1.0'))
+# 제휴 상품 가산점: 1.0(기본)이면 제휴 우선 정렬 유지, 0.01 정도면 약한 가산, 0이면 미적용
+SEARCH_AFFILIATED_BOOST = float(os.getenv('SEARCH_AFFILIATED_BOOST', '1.0'))
+
+
+# 추천(멀티 벡터) 점수 가중치: name_embedding 유사도 / description_embedding(리뷰) 유사도
+RECOMMEND_NAME_WEIGHT = float(os.getenv('RECOMMEND_NAME_WEIGHT', '0.6'))
+RECOMMEND_DESCRIPTION_WEIGHT = float(os.getenv('RECOMMEND_DESCRIPTION_WEIGHT', '0.4'))
+
+# 필터 벡터 검색
+# SQLite(Python) 경로: 인메모리 인덱스의 카탈로그 변경 확인 주기(초)
+VECTOR_INDEX_CHECK_INTERVAL = float(os.getenv('VECTOR_INDEX_CHECK_INTERVAL', '5'))
+# pgvector 경로: 필터에 맞는 상품이 이 수 이하면 HNSW 대신 정확한 거리 정렬
+VECTOR_EXACT_SCAN_THRESHOLD = int(os.getenv('VECTOR_EXACT_SCAN_THRESHOLD', '5000'))
+# pgvector 멀티 벡터(추천) 경로: name 벡터 HNSW 후보를 limit의 이 배수만큼 뽑아 가중합으로 재정렬
+VECTOR_RESCORE_FACTOR = int(os.getenv('VECTOR_RESCORE_FACTOR', '4'))
+# SQLite(Python) 경로의 프로세스 샤드 검색 (shop/utils/vector_shards.py)
+# VECTOR_SHARDS: 샤드 프로세스 수 (0/1이면 사용 안 함). 웹 워커마다 따로 띄우므로 워커 수 × 샤드 수 ≤ 코어 수 권장
+VECTOR_SHARDS = int(os.getenv('VECTOR_SHARDS', '0'))
+VECTOR_SHARD_BY = os.getenv('VECTOR_SHARD_BY', 'id')  # 'id'(ID 구간, 고르게) | 'classification'(분류 필터 검색은 해당 샤드만)
+# 임베딩 상품이 이보다 적으면 프로세스 간 통신 비용이 더 커서 단일 인덱스 사용
+VECTOR_SHARD_MIN_PRODUCTS = int(os.getenv('VECTOR_SHARD_MIN_PRODUCTS', '50000'))
+VECTOR_SHARD_START_METHOD = os.getenv('VECTOR_SHARD_START_METHOD', 'spawn')  # 스레드가 있는 프로세스의 fork는 위험
+VECTOR_SHARD_TIMEOUT = float(os.getenv('VECTOR_SHARD_TIMEOUT', '10'))  # 초과하면 그 샤드는 부모에서 계산
+
+# 상품 목록 패싯 필터 (shop/utils/facets.py 인메모리 비트셋)
+# 가격대 경계(원): 5,000원 미만 / 5,000~10,000원 / ... / 마지막 경계 이상
+FACET_PRICE_BOUNDS = [int(v) for v in os.getenv('FACET_PRICE_BOUNDS', '5000,10000,20000,50000').split(',') if v.strip()]
+FACET_MAX_VALUES = int(os.getenv('FACET_MAX_VALUES', '15'))  # 브랜드 등 값이 많은 패싯에 보여줄 최대 개수(건수순)
+PRODUCT_LIST_PAGE_SIZE = int(os.getenv('PRODUCT_LIST_PAGE_SIZE', '40'))
+
+
+# 캐시: CACHE_BACKEND=locmem(기본) | file | db
+# - file: CACHE_LOCATION 디렉터리 (기본 BASE_DIR/.cache), 워커 간 공유
+# - db: CACHE_LOCATION 테이블 (기본 shop_cache), 최초 1회 `python manage.py createcachetable` 필요
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem').lower()
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'roopang'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'shop_cache'),
+}
+if CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ValueError(f"CACHE_BACKEND는 {', '.join(_CACHE_BACKENDS)} 중 하나여야 합니다: {CACHE_BACKEND}")
+_cache_class, _cache_location = _CACHE_BACKENDS[CACHE_BACKEND]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_class,
+        'LOCATION': os.getenv('CACHE_LOCATION', _cache_location),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+# 상품 카드/상세 조각 캐시 만료(초). 키에 카탈로그 버전이 들어가므로 임포트 시 자동으로 새 조각 사용
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '86400'))
+# 카탈로그 버전 DB 조회 주기(초)
+CATALOG_VERSION_TTL = float(os.getenv('CATALOG_VERSION_TTL', '5'))
+# 카탈로그 파생 JSON API(자동완성/트렌딩)의 Cache-Control max-age(초). 이후에는 ETag로 재검증
+API_CACHE_MAX_AGE = int(os.getenv('API_CACHE_MAX_AGE', '60'))
+# 실시간 검색어 순서가 바뀌는 주기(초)
+TRENDING_ROTATE_SECONDS = int(os.getenv('TRENDING_ROTATE_SECONDS', '300'))
+
+
+# 참여자 이벤트 로그 (장바구니 담기/추천 노출·클릭): 메모리 버퍼에 모았다가 백그라운드에서 일괄 저장
+EVENTS_ENABLED = os.getenv('EVENTS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+EVENTS_BUFFER_SIZE = int(os.getenv('EVENTS_BUFFER_SIZE', '10000'))  # 워커당 최대 보관 수 (초과 시 오래된 것부터 버림)
+EVENTS_BATCH_SIZE = int(os.getenv('EVENTS_BATCH_SIZE', '200'))  # 이만큼 쌓이면 즉시 저장
+EVENTS_FLUSH_INTERVAL = float(os.getenv('EVENTS_FLUSH_INTERVAL', '2'))  # 저장 주기(초)
+
+# 임베딩 API 보호 (shop/utils/resilience.py)
+EMBEDDING_TIMEOUT_SECONDS = float(os.getenv('EMBEDDING_TIMEOUT_SECONDS', '10'))  # 호출당 최대 대기(초)
+EMBEDDING_MAX_RETRIES = int(os.getenv('EMBEDDING_MAX_RETRIES', '1'))  # SDK 재시도 횟수 (SDK 기본 2)
+EMBEDDING_BREAKER_FAILURES = int(os.getenv('EMBEDDING_BREAKER_FAILURES', '5'))  # 연속 실패 시 브레이커 열림
+EMBEDDING_BREAKER_RESET_SECONDS = float(os.getenv('EMBEDDING_BREAKER_RESET_SECONDS', '30'))  # 열린 뒤 시험 호출까지(초)
+# AI 추천 지연 예산(초): 넘으면 카테고리/제휴 SQL 추천으로 응답
+AI_RECO_BUDGET_SECONDS = float(os.getenv('AI_RECO_BUDGET_SECONDS', '2'))
+RECO_HEDGE_WORKERS = int(os.getenv('RECO_HEDGE_WORKERS', '4'))  # 워커당 추천 계산 스레드 수
+
+# 백그라운드 작업 큐 (shop/utils/jobs.py, run_worker 명령): 상품 저장 시 재임베딩/이웃 갱신 작업 등록
+JOBS_ENABLED = os.getenv('JOBS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+# 작업 종류별 동시 실행 수 상한 (전체 워커 합산, 임베딩 API 호출량 제한)
+JOB_CONCURRENCY = {
+    'embed_product': int(os.getenv('JOB_EMBED_CONCURRENCY', '2')),
+    'refresh_neighbors': 1,
+    'purge_sessions': 1,
+    'build_thumbnails': int(os.getenv('JOB_THUMBNAIL_CONCURRENCY', '2')),  # 외부 이미지 서버 동시 요청 수
+    'publish_thumbnails': 1,
+}
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))  # 이 횟수만큼 실패하면 failed
+JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', '10'))  # 재시도 간격: 10, 20, 40, ...초
+JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', '600'))  # 이보다 오래 running이면 워커 종료로 보고 재등록
+JOB_NEIGHBOR_DELAY_SECONDS = float(os.getenv('JOB_NEIGHBOR_DELAY_SECONDS', '5'))  # 이웃 갱신 지연(여러 임베딩을 묶음)
+
+# 만료 세션 정리 (purge_sessions 명령, shop/utils/sessions.py): 삭제 전 참여자 장바구니를 ArchivedCart에 보관
+SESSION_PURGE_BATCH_SIZE = int(os.getenv('SESSION_PURGE_BATCH_SIZE', '500'))  # 배치(트랜잭션)당 세션 수
+SESSION_PURGE_PAUSE_SECONDS = float(os.getenv('SESSION_PURGE_PAUSE_SECONDS', '0.05'))  # 배치 사이 대기
+# run_worker가 이 간격(초)마다 정리 작업을 실행 (0이면 cron으로만), 1회 최대 배치 수
+SESSION_PURGE_INTERVAL = int(os.getenv('SESSION_PURGE_INTERVAL', '3600'))
+SESSION_PURGE_MAX_BATCHES = int(os.getenv('SESSION_PURGE_MAX_BATCHES', '200'))
+
+# 워커 기동 워밍업 단계 (gunicorn --preload 시 마스터에서 포크 전에 실행, shop/utils/warmup.py)
+WARMUP_PHASES = [p.strip() for p in os.getenv('WARMUP_PHASES', 'imports,catalog,vector_index,templates').split(',')
+                 if p.strip()]
+
+# 계측 (/metrics Prometheus 엔드포인트, Server-Timing 헤더)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+# 브라우저 개발자도구에서 확인할 Server-Timing 헤더 (기본: DEBUG일 때만)
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', str(DEBUG)).lower() in ('1', 'true', 'yes')
+# /metrics 요청에 "Authorization: Bearer <토큰>" 필요. 운영(DEBUG=False)에서 비워 두면 /metrics는 항상 403
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# 요청 프로파일링 (shop/utils/profiling.py): 관리자 페이지 /admin/shop/profiles/ 에서 조회
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+# PROFILE_VIEWS 뷰의 요청 N건 중 1건을 자동 프로파일링 (0이면 헤더/스태프 요청만)
+PROFILE_SAMPLE_RATE = int(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_VIEWS = [v.strip() for v in os.getenv('PROFILE_VIEWS', 'cart_view,api_ai_recommendations').split(',')
+                 if v.strip()]
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '1'))  # 스택 샘플링 간격
+PROFILE_MAX_QUERIES = int(os.getenv('PROFILE_MAX_QUERIES', '500'))  # 프로파일당 기록할 SQL 수
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', '3600'))  # X-Shop-Profile 토큰 유효 시간(초)
+# 저장 위치와 보관 한도 (공개 서빙되는 MEDIA_ROOT 밖에 둘 것)
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR') or BASE_DIR / 'profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
+PROFILE_MAX_AGE_DAYS = int(os.getenv('PROFILE_MAX_AGE_DAYS', '7'))
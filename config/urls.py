@@ -16,11 +16,19 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from shop import views
+from shop import admin as shop_admin, views
 
 urlpatterns = [
+    # 요청 프로파일 조회 (스태프 전용, admin.site.urls보다 먼저)
+    path('admin/shop/profiles/', admin.site.admin_view(shop_admin.profile_list), name='admin_profiles'),
+    path('admin/shop/profiles/<str:name>/', admin.site.admin_view(shop_admin.profile_detail),
+         name='admin_profile_detail'),
     path('admin/', admin.site.urls),
     path('', views.consent_form, name='consent_form'),  # 루트 URL은 동의서로 시작
     path('home/', views.home, name='home'),  # 동의 후 이동할 홈 페이지
     path('shop/', include('shop.urls')),
+    path('metrics', views.metrics, name='metrics'),  # Prometheus 스크레이프
+    # 상품 썸네일: 운영에서는 nginx가 파일을 직접 서빙하고 없는 것만 여기로 옴
+    path('media/thumbs/<int:product_id>/<str:digest>-<int:width>.<str:ext>', views.product_thumbnail,
+         name='product_thumbnail'),
 ]
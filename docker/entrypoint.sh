@@ -47,9 +47,7 @@ echo "[entrypoint] Collecting static files"
 python manage.py collectstatic --noinput || true
 
 echo "[entrypoint] Starting Gunicorn"
-exec gunicorn config.wsgi:application \
-  --bind 0.0.0.0:${PORT:-8080} \
-  --workers ${GUNICORN_WORKERS:-3} \
-  --timeout 120
+# bind/workers/timeout/preload는 config/gunicorn.conf.py (PORT, GUNICORN_WORKERS, GUNICORN_PRELOAD)
+exec gunicorn -c config/gunicorn.conf.py config.wsgi:application
 
 
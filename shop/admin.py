@@ -1,3 +1,37 @@
 from django.contrib import admin
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
 
-# Register your models here.
+from .utils import profiling
+
+
+# 요청 프로파일 (shop/utils/profiling.py가 PROFILE_DIR에 저장한 파일, 모델 없음)
+
+def profile_list(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': '요청 프로파일',
+        'profiles': profiling.list_profiles(),
+        'token': profiling.make_token(),
+    }
+    return render(request, 'admin/shop/profile_list.html', context)
+
+
+def profile_detail(request, name):
+    data = profiling.load_profile(name)
+    if data is None:
+        raise Http404('프로파일을 찾을 수 없습니다')
+    if request.GET.get('format') == 'collapsed':
+        response = HttpResponse(profiling.collapsed_text(data), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{name}.folded"'
+        return response
+    rects = profiling.flame_rects(data['stacks'])
+    context = {
+        **admin.site.each_context(request),
+        'title': f"{data['method']} {data['path']}",
+        'name': name,
+        'profile': data,
+        'rects': rects,
+        'height': (max((r['depth'] for r in rects), default=-1) + 1) * 18,
+    }
+    return render(request, 'admin/shop/profile_detail.html', context)
@@ -0,0 +1,12 @@
+# shop/context_processors.py
+from django.conf import settings
+
+from .utils.catalog import catalog_version
+
+
+def catalog(request):
+    """템플릿 조각 캐시 키/만료 시간: {% cache fragment_timeout "이름" product.id catalog_version %}"""
+    return {
+        'catalog_version': catalog_version(),
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,52 @@
+# shop/db_routers.py
+from django.conf import settings
+
+from .utils.db import current_route, in_route_block, pin_primary, replica_for_read
+
+# 복제본에서 읽어도 되는 카탈로그 모델 (세션/참여자/이벤트/카탈로그 버전은 항상 primary)
+CATALOG_MODELS = {('shop', 'product'), ('shop', 'productneighbor')}
+
+
+def _is_catalog(model):
+    return (model._meta.app_label, model._meta.model_name) in CATALOG_MODELS
+
+
+class CatalogReplicaRouter:
+    """use_direct() 블록 밖의 카탈로그 조회를 읽기 복제본으로 분산.
+    카탈로그 쓰기가 있으면 잠시 primary로 고정해 방금 쓴 내용을 바로 읽을 수 있게 한다.
+    """
+
+    def db_for_read(self, model, **hints):
+        if in_route_block() or not _is_catalog(model):
+            return None
+        return replica_for_read()
+
+    def db_for_write(self, model, **hints):
+        if _is_catalog(model):
+            pin_primary()
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class PrimaryDirectRouter:
+    """use_direct() 블록 안의 ORM 조회/쓰기를 직접 연결(direct 또는 블록이 고른 복제본)로,
+    나머지는 풀러 경유 default로 보낸다. 모든 별칭이 같은 DB(또는 그 복제본)이므로 관계/마이그레이션 제한은 없다.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_route()
+
+    def db_for_write(self, model, **hints):
+        return current_route(write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 복제본은 읽기 전용이므로 마이그레이션 대상에서 제외
+        return False if db in settings.DATABASE_REPLICAS else None
@@ -0,0 +1,82 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from shop.utils.bench import (
+    bench_database, compare_results, environment_info, run_flow, seed_products, stub_embeddings, write_json,
+)
+from shop.utils.neighbors import rebuild_neighbors
+
+
+class Command(BaseCommand):
+    help = '합성 상품으로 참여자 쇼핑 흐름(동의→홈→검색→상세→담기→장바구니→AI 추천) 부하 벤치마크를 실행합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500, help='합성 상품 수 (기본값: 500)')
+        parser.add_argument('--users', type=int, default=8, help='동시 가상 참여자 수 (기본값: 8)')
+        parser.add_argument('--iterations', type=int, default=10, help='참여자당 흐름 반복 수 (기본값: 10)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드 (재현용)')
+        parser.add_argument('--dim', type=int, default=1536, help='가짜 임베딩 차원 (기본값: 1536)')
+        parser.add_argument('--csv', type=str, help='상품 템플릿 CSV 경로 (기본: 저장소의 상품 CSV)')
+        parser.add_argument('--with-neighbors', action='store_true', help='이웃 테이블을 미리 계산한 상태로 측정')
+        parser.add_argument('--output', type=str, help='결과 JSON 경로 (기본: bench/flow-<db>-<시각>.json)')
+        parser.add_argument('--compare', type=str, help='비교할 이전 결과 JSON (p95 회귀 검사)')
+        parser.add_argument('--threshold', type=float, default=0.10, help='회귀로 판단할 p95 증가율 (기본값: 0.10)')
+
+    def handle(self, *args, **options):
+        with bench_database(), stub_embeddings(options['dim']):
+            result = self._run(options)
+
+        output = options['output'] or (
+            f"bench/flow-{result['meta']['db_vendor']}-{timezone.now():%Y%m%d-%H%M%S}.json"
+        )
+        write_json(output, result)
+        self._print(result)
+        self.stdout.write(self.style.SUCCESS(f"결과 저장: {output}"))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            self._compare(result, baseline, options['threshold'])
+
+    def _run(self, options):
+        started = time.perf_counter()
+        seed_products(options['products'], options['seed'], options['csv'], options['dim'])
+        if options['with_neighbors']:
+            rebuild_neighbors()
+        seed_seconds = time.perf_counter() - started
+        self.stdout.write(f"합성 상품 {options['products']}개 준비 ({seed_seconds:.1f}초)")
+
+        run = run_flow(options['users'], options['iterations'], options['seed'])
+        meta = environment_info()
+        meta.update({
+            'timestamp': timezone.now().isoformat(),
+            'products': options['products'],
+            'users': options['users'],
+            'iterations': options['iterations'],
+            'seed': options['seed'],
+            'dim': options['dim'],
+            'with_neighbors': options['with_neighbors'],
+        })
+        return {'meta': meta, **run}
+
+    def _print(self, result):
+        self.stdout.write(f"\n{'endpoint':<22}{'count':>7}{'err':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>9}")
+        for name, s in result['endpoints'].items():
+            self.stdout.write(
+                f"{name:<22}{s['count']:>7}{s['errors']:>5}"
+                f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s.get('throughput_rps', 0):>9.1f}"
+            )
+        self.stdout.write(f"흐름 {result['flows']}회 / {result['elapsed_s']}초 = {result['flows_per_s']} flows/s")
+
+    def _compare(self, result, baseline, threshold):
+        rows = compare_results(result, baseline, threshold=threshold)
+        regressed = [r for r in rows if r[4]]
+        self.stdout.write(f"\n이전 결과({baseline.get('meta', {}).get('git_commit')}) 대비 p95:")
+        for name, before, after, change, bad in rows:
+            style = self.style.ERROR if bad else self.style.SUCCESS
+            self.stdout.write(style(f"  {name:<22}{before:>10.2f} → {after:>10.2f} ms ({change:+.1%})"))
+        if regressed:
+            raise CommandError(f"p95 회귀 {len(regressed)}건 (임계값 {threshold:.0%})")
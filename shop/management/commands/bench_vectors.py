@@ -0,0 +1,171 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from shop.models import Product
+from shop.utils.bench import (
+    bench_database, brute_force_top_k, environment_info, load_ground_truth_matrix, random_unit_vectors,
+    seed_products, stub_embeddings, summarize, vector_backends, write_json,
+)
+from shop.utils.embeddings import OpenAIEmbeddingGenerator
+from shop.utils.vector_index import PartitionedVectorIndex, get_vector_index, invalidate_vector_index
+from shop.utils.vector_shards import SHARD_BY, ShardedVectorIndex
+
+SCENARIOS = ('none', 'affiliated_only', 'categories', 'exclude_ids', 'combined')
+
+
+class Command(BaseCommand):
+    help = '합성 카탈로그(1k/10k/100k)로 벡터 검색 백엔드의 지연 시간·메모리·recall을 측정합니다 (임베딩 API 호출 없음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help='카탈로그 크기 목록 (기본값: 1000 10000 100000)')
+        parser.add_argument('--dim', type=int, default=256,
+                            help='벡터 차원 (기본값: 256, 실제 운영 차원은 1536)')
+        parser.add_argument('--queries', type=int, default=20, help='시나리오별 쿼리 수 (기본값: 20)')
+        parser.add_argument('--k', type=int, default=8, help='top-k (기본값: 8)')
+        parser.add_argument('--backends', nargs='+', help='측정할 백엔드 (기본: 현재 DB에서 가능한 전체)')
+        parser.add_argument('--budget', type=float, default=60.0,
+                            help='백엔드·크기별 최대 측정 시간(초), 초과 시 남은 쿼리 생략 (기본값: 60)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드 (재현용)')
+        parser.add_argument('--shards', type=int, default=0,
+                            help='1보다 크면 프로세스 샤드 검색(python_sharded)도 측정 (기본값: 0)')
+        parser.add_argument('--shard-by', choices=SHARD_BY, default='id', help='샤드 나누는 기준 (기본값: id)')
+        parser.add_argument('--output', type=str, help='결과 JSON 경로 (기본: bench/vectors-<db>-<시각>.json)')
+
+    def handle(self, *args, **options):
+        with bench_database(), stub_embeddings(options['dim']):
+            results = []
+            for size in options['sizes']:
+                results.extend(self._bench_size(size, options))
+            meta = environment_info()
+
+        meta.update({
+            'timestamp': timezone.now().isoformat(),
+            'sizes': options['sizes'],
+            'dim': options['dim'],
+            'queries': options['queries'],
+            'k': options['k'],
+            'seed': options['seed'],
+            'shards': options['shards'],
+        })
+        output = options['output'] or f"bench/vectors-{meta['db_vendor']}-{timezone.now():%Y%m%d-%H%M%S}.json"
+        write_json(output, {'meta': meta, 'results': results})
+        self.stdout.write(self.style.SUCCESS(f"\n결과 저장: {output}"))
+
+    def _bench_size(self, size, options):
+        Product.objects.all().delete()
+        started = time.perf_counter()
+        seed_products(size, options['seed'], dim=options['dim'])
+        invalidate_vector_index()
+        self.stdout.write(f"\n[{size}개] 카탈로그 준비 {time.perf_counter() - started:.1f}초")
+
+        truth = load_ground_truth_matrix()
+        rng = np.random.default_rng(options['seed'] + size)
+        queries = self._make_queries(truth, rng, options['queries'], options['dim'])
+
+        backends = vector_backends()
+        if options['backends']:
+            backends = {name: fn for name, fn in backends.items() if name in options['backends']}
+
+        sharded = None
+        if options['shards'] > 1 and (not options['backends'] or 'python_sharded' in options['backends']):
+            sharded = ShardedVectorIndex.from_index(PartitionedVectorIndex.build(), options['shards'],
+                                                    options['shard_by'])
+            sharded.search(queries['none'][0][0], options['k'])  # 샤드 프로세스 시작은 측정에서 제외
+            backends['python_sharded'] = (
+                lambda gen, q, k, ex, aff, cats: gen._hydrate(sharded.search(q, k, ex, aff, cats))
+            )
+
+        rows = []
+        generator = OpenAIEmbeddingGenerator()
+        try:
+            for name, search in backends.items():
+                rows.extend(self._bench_backend(name, search, generator, truth, queries, size, options))
+        finally:
+            if sharded is not None:
+                sharded.close()
+        return rows
+
+    @staticmethod
+    def _make_queries(truth, rng, count, dim):
+        """시나리오별 (쿼리 벡터, exclude_ids, affiliated_only, categories) 목록"""
+        ids, _, _, cats = truth
+        all_cats = sorted(set(cats))
+        vectors = random_unit_vectors(count, dim, rng)
+        queries = {}
+        for scenario in SCENARIOS:
+            items = []
+            for q in vectors:
+                exclude = rng.choice(ids, size=min(5, len(ids)), replace=False).tolist()
+                picked = rng.choice(all_cats, size=min(2, len(all_cats)), replace=False).tolist()
+                items.append({
+                    'none': (q, None, False, None),
+                    'affiliated_only': (q, None, True, None),
+                    'categories': (q, None, False, picked),
+                    'exclude_ids': (q, exclude, False, None),
+                    'combined': (q, exclude, True, picked),
+                }[scenario])
+            queries[scenario] = items
+        return queries
+
+    def _bench_backend(self, name, search, generator, truth, queries, size, options):
+        k = options['k']
+        memory = self._memory_footprint(name, search, generator, queries['none'][0], k)
+        deadline = time.perf_counter() + options['budget']
+        rows = []
+        for scenario, items in queries.items():
+            latencies, recalls = [], []
+            for q, exclude, aff, cats in items:
+                if time.perf_counter() > deadline:
+                    break
+                qlist = q.tolist()
+                started = time.perf_counter()
+                results = search(generator, qlist, k, exclude, aff, cats)
+                latencies.append(time.perf_counter() - started)
+                expected = brute_force_top_k(truth, q, k, exclude, aff, cats)
+                got = [r['id'] for r in results]
+                recalls.append(len(set(got) & set(expected)) / len(expected) if expected else 1.0)
+
+            row = {
+                'size': size,
+                'backend': name,
+                'scenario': scenario,
+                'recall_at_k': round(float(np.mean(recalls)), 4) if recalls else None,
+                'skipped': len(items) - len(latencies),
+                **summarize(latencies),
+                **memory,
+            }
+            rows.append(row)
+            self.stdout.write(
+                f"  {name:<15}{scenario:<16} p50 {row['p50_ms']:>9.2f}ms  p95 {row['p95_ms']:>9.2f}ms  "
+                f"recall@{k} {row['recall_at_k']}  peak {memory['peak_python_mb']}MB"
+                + (f"  (생략 {row['skipped']})" if row['skipped'] else '')
+            )
+        return rows
+
+    @staticmethod
+    def _memory_footprint(name, search, generator, first_query, k):
+        """쿼리 1회의 Python 힙 최대 사용량 + (PostgreSQL이면) 테이블/인덱스 크기"""
+        q, exclude, aff, cats = first_query
+        index_bytes = get_vector_index().nbytes() if name.startswith('python') else 0  # 인덱스 구성은 측정에서 제외
+        tracemalloc.start()
+        search(generator, q.tolist(), k, exclude, aff, cats)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        footprint = {'peak_python_mb': round(peak / 1024 / 1024, 2)}
+        if index_bytes:
+            footprint['index_mb'] = round(index_bytes / 1024 / 1024, 2)
+        if name == 'pgvector' and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_table_size('shop_product'), pg_indexes_size('shop_product')"
+                )
+                table_bytes, index_bytes = cursor.fetchone()
+            footprint['table_mb'] = round(table_bytes / 1024 / 1024, 2)
+            footprint['index_mb'] = round(index_bytes / 1024 / 1024, 2)
+        return footprint
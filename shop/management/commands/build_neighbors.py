@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shop.utils.db import DirectCommandMixin
+from shop.utils.neighbors import rebuild_neighbors, refresh_neighbors, stale_product_ids
+
+
+class Command(DirectCommandMixin, BaseCommand):
+    help = '저장된 임베딩으로 상품별 최근접 이웃 테이블을 계산합니다 (기본: 변경분만 증분 갱신)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='전체 상품의 이웃 목록을 다시 계산합니다 (제휴 여부가 바뀐 경우 등)',
+        )
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=10,
+            help='상품당 저장할 이웃 수 (기본값: 10)',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=512,
+            help='한 번에 행렬곱할 상품 수 (기본값: 512)',
+        )
+        parser.add_argument(
+            '--no-affiliated',
+            action='store_true',
+            help='제휴 상품 전용 이웃 목록을 만들지 않습니다',
+        )
+        parser.add_argument(
+            '--product-ids',
+            nargs='+',
+            type=int,
+            help='임베딩이 바뀐 상품 ID들을 직접 지정 (예: --product-ids 1 2 3)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        kwargs = {
+            'top_n': options['top_n'],
+            'block_size': options['block_size'],
+            'include_affiliated': not options['no_affiliated'],
+        }
+
+        if options['full']:
+            self.stdout.write("전체 이웃 목록 재계산 중...")
+            count = rebuild_neighbors(**kwargs)
+        else:
+            changed = options['product_ids'] or stale_product_ids()
+            if not changed:
+                self.stdout.write(self.style.WARNING("갱신할 상품이 없습니다."))
+                return
+            self.stdout.write(f"임베딩이 바뀐 상품 {len(changed)}개 기준 증분 갱신 중...")
+            count = refresh_neighbors(changed, **kwargs)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"이웃 목록 갱신 완료: {count}개 상품 ({elapsed:.2f}초)"))
@@ -0,0 +1,59 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shop.utils.carts import add_rates
+from shop.utils.export import open_output, parse_when
+
+
+class Command(BaseCommand):
+    help = '참여자 장바구니 담기 비율을 상품별, 담은 위치(source)×제휴 여부별로 집계합니다 (Cart/CartItem SQL 집계)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=str, help='동의 시각 시작 (포함, YYYY-MM-DD 또는 ISO 시각)')
+        parser.add_argument('--until', type=str, help='동의 시각 끝 (날짜만 주면 그날 포함)')
+        parser.add_argument('--top', type=int, default=20, help='출력할 상품 수 (담은 참여자 수 순, 기본값: 20)')
+        parser.add_argument('--format', choices=['table', 'json'], default='table', help='출력 형식 (기본값: table)')
+        parser.add_argument('--output', type=str, default='-', help="json 출력 경로 (기본 '-': 표준출력)")
+        parser.add_argument('--database', type=str,
+                            help='읽을 DB 별칭 (기본: direct가 있으면 direct)')
+
+    def handle(self, *args, **options):
+        database = options['database'] or ('direct' if 'direct' in settings.DATABASES else 'default')
+        stats = add_rates(
+            since=parse_when(options['since']), until=parse_when(options['until'], end=True),
+            top=max(1, options['top']), using=database,
+        )
+
+        if options['format'] == 'json':
+            with open_output(options['output'], stdout=self.stdout) as out:
+                out.write(json.dumps(stats, ensure_ascii=False, indent=2) + '\n')
+            if options['output'] != '-':
+                self.stdout.write(self.style.SUCCESS(f"장바구니 집계 저장 → {options['output']}"))
+            return
+
+        if not stats['participants']:
+            self.stdout.write(self.style.WARNING('기간 안에 참여자가 없습니다.'))
+            return
+        overall = stats['overall']
+        self.stdout.write(
+            f"참여자 {stats['participants']}명 중 담은 참여자 {overall['participants']}명 "
+            f"(담기 {overall['add_rate']:.1%}, 유지 {overall['keep_rate']:.1%})"
+        )
+        self.stdout.write('\n[담은 위치 × 제휴 여부]')
+        self.stdout.write(f"{'source':<16} {'제휴':<4} {'참여자':>6} {'담기율':>7} {'유지율':>7} {'수량':>6}")
+        for row in stats['arms']:
+            self.stdout.write(
+                f"{row['source'] or '-':<16} {'Y' if row['affiliated'] else 'N':<4} {row['participants']:>6} "
+                f"{row['add_rate']:>7.1%} {row['keep_rate']:>7.1%} {row['quantity']:>6}"
+            )
+        self.stdout.write(f"\n[상품별 상위 {len(stats['products'])}개]")
+        self.stdout.write(f"{'ID':>6} {'제휴':<4} {'참여자':>6} {'담기율':>7} {'유지율':>7} {'수량':>6}  상품명")
+        for row in stats['products']:
+            affiliated = '-' if row['if_affiliated'] is None else ('Y' if row['if_affiliated'] else 'N')
+            self.stdout.write(
+                f"{row['product_id']:>6} {affiliated:<4} {row['participants']:>6} "
+                f"{row['add_rate']:>7.1%} {row['keep_rate']:>7.1%} {row['quantity']:>6}  {row['name'] or '(삭제됨)'}"
+            )
+        self.stdout.write(self.style.SUCCESS('집계 완료'))
@@ -1,9 +1,10 @@
 from django.core.management.base import BaseCommand
 from shop.models import Product
 from shop.utils.embeddings import OpenAIEmbeddingGenerator
-import json
+from shop.utils.neighbors import refresh_neighbors
+from shop.utils.db import DirectCommandMixin
 
-class Command(BaseCommand):
+class Command(DirectCommandMixin, BaseCommand):
     help = '모든 상품에 대해 OpenAI 임베딩을 생성합니다'
     
     def add_arguments(self, parser):
@@ -24,6 +25,11 @@ class Command(BaseCommand):
             type=int,
             help='특정 상품 ID들만 처리 (예: --product-ids 1 2 3)',
         )
+        parser.add_argument(
+            '--skip-neighbors',
+            action='store_true',
+            help='임베딩 생성 후 이웃 테이블 증분 갱신을 건너뜁니다',
+        )
     
     def handle(self, *args, **options):
         generator = OpenAIEmbeddingGenerator()
@@ -51,6 +57,7 @@ class Command(BaseCommand):
         total = products.count()
         processed = 0
         failed = 0
+        updated_ids = []
         batch_size = options['batch_size']
         
         # 배치 처리
@@ -61,22 +68,10 @@ class Command(BaseCommand):
                 try:
                     self.stdout.write(f"[{processed + 1}/{total}] {product.name} 처리 중...")
                     
-                    name_embedding, description_embedding = generator.generate_product_embeddings(product)
-                    
-                    if name_embedding and description_embedding:
-                        # PostgreSQL의 경우 벡터로 저장, SQLite의 경우 JSON으로 저장
-                        try:
-                            # pgvector 사용 가능한지 확인
-                            from pgvector.django import VectorField
-                            product.name_embedding = name_embedding
-                            product.description_embedding = description_embedding
-                        except ImportError:
-                            # SQLite의 경우 JSON 문자열로 저장
-                            product.name_embedding = json.dumps(name_embedding)
-                            product.description_embedding = json.dumps(description_embedding)
-                        
-                        product.save(update_fields=['name_embedding', 'description_embedding'])
+                    # 명령으로 지정한 상품은 텍스트가 그대로여도 다시 생성
+                    if generator.update_product_embeddings(product, force=True) == 'updated':
                         processed += 1
+                        updated_ids.append(product.id)
                         
                         self.stdout.write(
                             self.style.SUCCESS(f"✓ {product.name} 완료")
@@ -107,6 +102,10 @@ class Command(BaseCommand):
         self.stdout.write(f"성공: {processed}개")
         self.stdout.write(f"실패: {failed}개")
         self.stdout.write(f"총계: {processed + failed}개")
+
+        if updated_ids and not options['skip_neighbors']:
+            count = refresh_neighbors(updated_ids)
+            self.stdout.write(f"이웃 테이블 증분 갱신: {count}개 상품")
         
         if processed > 0:
             self.stdout.write(
@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+from itertools import groupby
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from shop.models import Event
+from shop.utils.events import flush_events
+from shop.utils.export import parse_when
+
+# pyarrow가 있으면 columns 형식을 Parquet으로, 없으면 압축 .npz로 저장
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+COLUMNS = ('id', 'created_at', 'kind', 'product_id', 'source', 'rank', 'session_key', 'payload')
+
+
+class Command(BaseCommand):
+    help = '참여자별 이벤트 스트림을 압축 JSONL 또는 컬럼 파일(Parquet/npz)로 내보냅니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, help='출력 디렉터리 (기본: exports/events-<시각>)')
+        parser.add_argument('--format', choices=['jsonl', 'columns'], default='jsonl',
+                            help='jsonl: 참여자별 .jsonl.gz / columns: 참여자별 .parquet (pyarrow 없으면 .npz)')
+        parser.add_argument('--participants', nargs='+', type=int, help='내보낼 참여자 ID (기본: 전체)')
+        parser.add_argument('--kinds', nargs='+', help='이벤트 종류 필터 (예: cart_add reco_click)')
+        parser.add_argument('--since', type=str, help='시작 날짜/시각 (포함)')
+        parser.add_argument('--until', type=str, help='끝 날짜/시각 (날짜만 주면 그날 포함)')
+        parser.add_argument('--include-anonymous', action='store_true', help='참여자 없는 이벤트도 anonymous 파일로')
+
+    def handle(self, *args, **options):
+        # 이 프로세스 버퍼에 남은 이벤트 먼저 저장 (웹 워커의 버퍼는 각자 주기적으로 저장됨)
+        flush_events()
+
+        qs = Event.objects.all()
+        if not options['include_anonymous']:
+            qs = qs.filter(participant__isnull=False)
+        if options['participants']:
+            qs = qs.filter(participant_id__in=options['participants'])
+        if options['kinds']:
+            qs = qs.filter(kind__in=options['kinds'])
+        since, until = parse_when(options['since']), parse_when(options['until'], end=True)
+        if since:
+            qs = qs.filter(created_at__gte=since)
+        if until:
+            qs = qs.filter(created_at__lt=until)
+
+        output = options['output'] or f"exports/events-{timezone.now():%Y%m%d-%H%M%S}"
+        os.makedirs(output, exist_ok=True)
+
+        rows = (
+            qs.order_by('participant_id', 'created_at', 'id')
+            .values_list('participant_id', *COLUMNS)
+            .iterator(chunk_size=2000)
+        )
+        writer = self._write_jsonl if options['format'] == 'jsonl' else self._write_columns
+        participants = events = 0
+        for participant_id, group in groupby(rows, key=lambda r: r[0]):
+            name = f"participant-{participant_id}" if participant_id is not None else 'anonymous'
+            events += writer(os.path.join(output, name), (r[1:] for r in group))
+            participants += 1
+
+        if options['format'] == 'columns' and not PARQUET_AVAILABLE:
+            self.stdout.write(self.style.WARNING('pyarrow 미설치: 컬럼 파일을 .npz로 저장했습니다 (pip install pyarrow)'))
+        self.stdout.write(self.style.SUCCESS(f"내보내기 완료: 참여자 {participants}명, 이벤트 {events}건 → {output}"))
+
+    @staticmethod
+    def _write_jsonl(path, rows):
+        count = 0
+        with gzip.open(path + '.jsonl.gz', 'wt', encoding='utf-8') as f:
+            for row in rows:
+                record = dict(zip(COLUMNS, row))
+                record['created_at'] = record['created_at'].isoformat()
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+        return count
+
+    @staticmethod
+    def _write_columns(path, rows):
+        columns = {name: [] for name in COLUMNS}
+        for row in rows:
+            for name, value in zip(COLUMNS, row):
+                columns[name].append(value)
+        columns['payload'] = [json.dumps(p, ensure_ascii=False) for p in columns['payload']]
+        count = len(columns['id'])
+
+        if PARQUET_AVAILABLE:
+            pq.write_table(pa.table(columns), path + '.parquet', compression='zstd')
+            return count
+
+        np.savez_compressed(
+            path + '.npz',
+            id=np.asarray(columns['id'], dtype=np.int64),
+            # UTC 기준 naive 시각
+            created_at=np.asarray([dt.replace(tzinfo=None) for dt in columns['created_at']], dtype='datetime64[us]'),
+            kind=np.asarray(columns['kind'], dtype=str),
+            product_id=np.asarray([-1 if v is None else v for v in columns['product_id']], dtype=np.int64),
+            source=np.asarray(columns['source'], dtype=str),
+            rank=np.asarray([0 if v is None else v for v in columns['rank']], dtype=np.int16),
+            session_key=np.asarray(columns['session_key'], dtype=str),
+            payload=np.asarray(columns['payload'], dtype=str),
+        )
+        return count
@@ -0,0 +1,174 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+
+from shop.models import ArchivedCart, Cart, CartItem, Participant, Product
+from shop.utils.export import open_output, parse_when
+
+PARTICIPANT_FIELDS = (
+    'id', 'name', 'student_id', 'phone',
+    'consent_research', 'consent_data', 'consent_participation',
+    'user_agent', 'ip_address', 'created_at', 'session_key',
+)
+PII_FIELDS = {'name', 'student_id', 'phone', 'ip_address'}
+CART_FIELDS = ('cart_source', 'cart_items', 'cart_quantity', 'cart_total', 'cart_affiliated_quantity')
+
+
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class Command(BaseCommand):
+    help = '참여자/동의 정보와 장바구니 상태를 CSV/JSONL로 스트리밍 내보내기 (메모리 사용량 일정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default='-', help="출력 경로 (기본 '-': 표준출력, .gz면 압축)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help='출력 형식 (기본값: csv)')
+        parser.add_argument('--gzip', action='store_true', help='gzip 압축 (경로가 .gz로 끝나면 자동)')
+        parser.add_argument('--since', type=str, help='동의 시각 시작 (포함, YYYY-MM-DD 또는 ISO 시각)')
+        parser.add_argument('--until', type=str, help='동의 시각 끝 (날짜만 주면 그날 포함)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='DB에서 한 번에 가져올 행 수 (기본값: 2000)')
+        parser.add_argument('--no-pii', action='store_true', help='이름/학번/전화번호/IP 제외')
+        parser.add_argument('--database', type=str,
+                            help='읽을 DB 별칭 (기본: direct가 있으면 direct — pgbouncer 트랜잭션 풀링에서는 '
+                                 '서버 측 커서를 쓸 수 없음)')
+
+    def handle(self, *args, **options):
+        database = options['database'] or ('direct' if 'direct' in settings.DATABASES else 'default')
+        fields = [f for f in PARTICIPANT_FIELDS if not (options['no_pii'] and f in PII_FIELDS)]
+
+        qs = Participant.objects.using(database).order_by('id')
+        since, until = parse_when(options['since']), parse_when(options['until'], end=True)
+        if since:
+            qs = qs.filter(created_at__gte=since)
+        if until:
+            qs = qs.filter(created_at__lt=until)
+
+        # PostgreSQL에서는 iterator()가 서버 측 커서로 chunk_size씩 가져옴
+        rows = qs.values_list(*fields).iterator(chunk_size=options['chunk_size'])
+        count = 0
+        with open_output(options['output'], options['gzip'], stdout=self.stdout) as out:
+            write = self._csv_writer(out, fields) if options['format'] == 'csv' else self._jsonl_writer(out)
+            while True:
+                chunk = [dict(zip(fields, row)) for row in islice(rows, options['chunk_size'])]
+                if not chunk:
+                    break
+                for record in self._attach_carts(chunk, database):
+                    write(record)
+                count += len(chunk)
+
+        if options['output'] != '-':
+            self.stdout.write(self.style.SUCCESS(f"참여자 {count}명 내보내기 완료 → {options['output']}"))
+
+    @staticmethod
+    def _attach_carts(chunk, database):
+        """청크 단위로 장바구니/세션/상품을 한 번씩 조회해 장바구니 상태를 붙임
+        Cart 테이블(참여자의 마지막 장바구니) → 예전 세션 cart dict → ArchivedCart 순으로 사용
+        """
+        stored = {}
+        latest = {}
+        for participant_id, cart_id in Cart.objects.using(database) \
+                .filter(participant_id__in=[r['id'] for r in chunk]).values_list('participant_id', 'id'):
+            latest[participant_id] = max(cart_id, latest.get(participant_id, cart_id))
+        if latest:
+            stored = {participant_id: {} for participant_id in latest}
+            owner = {cart_id: participant_id for participant_id, cart_id in latest.items()}
+            for cart_id, pid, qty in CartItem.objects.using(database) \
+                    .filter(cart_id__in=owner, removed_at__isnull=True).order_by('added_at', 'id') \
+                    .values_list('cart_id', 'product_id', 'quantity'):
+                stored[owner[cart_id]][pid] = qty
+
+        keys = [r['session_key'] for r in chunk if r.get('session_key') and r['id'] not in stored]
+        sessions = dict(
+            Session.objects.using(database)
+            .filter(session_key__in=keys)
+            .values_list('session_key', 'session_data')
+        ) if keys else {}
+
+        store = SessionStore()
+        carts = {}
+        for key, data in sessions.items():
+            decoded = store.decode(data)
+            if 'cart' not in decoded:
+                continue
+            cart = decoded['cart'] or {}
+            items = {}
+            for pid, qty in cart.items():
+                try:
+                    items[int(pid)] = max(1, int(qty))
+                except (TypeError, ValueError):
+                    continue
+            carts[key] = items
+
+        # 만료로 정리된 세션은 purge_sessions가 보관한 최종 장바구니로 대체
+        archived = {}
+        missing = [r['id'] for r in chunk if r['id'] not in stored and r.get('session_key') not in carts]
+        if missing:
+            for participant_id, items in ArchivedCart.objects.using(database) \
+                    .filter(participant_id__in=missing).values_list('participant_id', 'items'):
+                archived[participant_id] = {int(pid): qty for pid, qty in items.items()}
+
+        product_ids = {pid for items in [*stored.values(), *carts.values(), *archived.values()] for pid in items}
+        products = Product.objects.using(database).only('id', 'name', 'brand', 'price', 'if_affiliated') \
+            .in_bulk(product_ids) if product_ids else {}
+
+        for record in chunk:
+            key = record.get('session_key')
+            items = stored.get(record['id'])
+            if items is not None:
+                record['cart_source'] = 'cart'
+            elif key and key in carts:
+                items = carts[key]
+                record['cart_source'] = 'session'
+            else:
+                items = archived.get(record['id'])
+                record['cart_source'] = 'archived' if items is not None else 'missing'
+            lines = []
+            for pid, qty in (items or {}).items():
+                product = products.get(pid)
+                lines.append({
+                    'product_id': pid,
+                    'quantity': qty,
+                    'name': product.name if product else None,
+                    'brand': product.brand if product else None,
+                    'price': product.price if product else None,
+                    'if_affiliated': product.if_affiliated if product else None,
+                })
+            record['cart_items'] = lines
+            record['cart_quantity'] = sum(line['quantity'] for line in lines)
+            record['cart_total'] = sum((line['price'] or 0) * line['quantity'] for line in lines)
+            record['cart_affiliated_quantity'] = sum(line['quantity'] for line in lines if line['if_affiliated'])
+            yield record
+
+    @staticmethod
+    def _csv_writer(out, fields):
+        writer = csv.writer(out)
+        writer.writerow(list(fields) + list(CART_FIELDS))
+        columns = list(fields) + list(CART_FIELDS)
+
+        def write(record):
+            row = []
+            for name in columns:
+                value = record.get(name)
+                if name == 'cart_items':
+                    value = json.dumps(value, ensure_ascii=False)
+                elif hasattr(value, 'isoformat'):
+                    value = value.isoformat()
+                row.append('' if value is None else value)
+            writer.writerow(row)
+
+        return write
+
+    @staticmethod
+    def _jsonl_writer(out):
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+
+        return write
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.models import Product
+from shop.utils.images import PIL_AVAILABLE, ImageFetchError, build_thumbnails
+
+
+class Command(BaseCommand):
+    help = '상품 이미지를 한 번씩 받아 로컬 썸네일(너비별 WebP/JPEG)을 MEDIA_ROOT/thumbs/에 저장합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product-ids',
+            nargs='+',
+            type=int,
+            help='처리할 상품 ID (기본: 이미지가 있는 전체 상품)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='이미 있는 썸네일도 다시 생성합니다',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='동시 다운로드 수 (기본값: 8)',
+        )
+
+    def handle(self, *args, **options):
+        if not PIL_AVAILABLE:
+            raise CommandError('Pillow가 설치되어 있지 않습니다 (pip install pillow)')
+
+        qs = Product.objects.exclude(img='').order_by('id')
+        if options['product_ids']:
+            qs = qs.filter(id__in=options['product_ids'])
+        products = list(qs.values_list('id', 'img'))
+        if not products:
+            self.stdout.write(self.style.WARNING("처리할 상품이 없습니다."))
+            return
+
+        self.stdout.write(f"상품 {len(products)}개 썸네일 생성 중...")
+        started = time.perf_counter()
+
+        def build(item):
+            pid, img = item
+            try:
+                return pid, build_thumbnails(pid, img, force=options['force']), None
+            except ImageFetchError as e:
+                return pid, 0, e
+
+        created = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for pid, count, error in pool.map(build, products):
+                if error is not None:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"  상품 {pid}: {error}"))
+                created += count
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"썸네일 생성 완료: 파일 {created}개, 실패 {failed}개 상품 ({elapsed:.2f}초)"
+        ))
@@ -1,6 +1,11 @@
 import csv
 from django.core.management.base import BaseCommand, CommandError
 from shop.models import Product
+from shop.utils.catalog import bump_catalog_version, catalog_import, next_catalog_version, record_deletions
+from shop.utils.db import DirectCommandMixin
+from shop.utils.jobs import enqueue_product_changes
+
+SYNC_COMPARE_FIELDS = ('classification', 'category', 'brand', 'name', 'price', 'img', 'if_affiliated', 'reviews')
 
 
 def _parse_price(value: str) -> int:
@@ -25,26 +30,37 @@ def _parse_bool(value) -> bool:
     s = str(value).strip().lower()
     return s in {"true", "1", "y", "yes"}
 
-class Command(BaseCommand):
+class Command(DirectCommandMixin, BaseCommand):
     help = 'CSV에서 상품 데이터를 임포트합니다.'
 
     def add_arguments(self, parser):
         parser.add_argument('--file', type=str, required=True, help='CSV 파일 경로')
         parser.add_argument('--truncate', action='store_true', help='기존 데이터를 비우고 재삽입')
 
+    @catalog_import()
     def handle(self, *args, **options):
         path = options['file']
         truncate = options['truncate']
 
         try:
+            # 이번 임포트에서 생성/변경된 상품에 기록할 카탈로그 버전 (동기화 API의 ?since= 기준)
+            version = next_catalog_version()
+            previous_ids = set()
             if truncate:
+                previous_ids = set(Product.objects.values_list('id', flat=True))
                 Product.objects.all().delete()
                 self.stdout.write(self.style.WARNING('기존 Product 데이터 삭제 완료'))
+            # 값이 그대로인 상품은 다시 쓰지 않음 (버전도 유지되어 동기화 대상에서 빠짐)
+            existing = {row['id']: row for row in Product.objects.values('id', *SYNC_COMPARE_FIELDS)}
+            imported_ids = set()
+            # update()는 post_save를 보내지 않으므로 재임베딩 대상은 직접 모아 등록
+            reembed_ids = []
 
             with open(path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 created_cnt = 0
                 updated_cnt = 0
+                unchanged_cnt = 0
                 skipped_cnt = 0
                 for row in reader:
                     try:
@@ -67,20 +83,29 @@ class Command(BaseCommand):
                             'reviews': row.get('reviews') or '',
                         }
 
-                        product, created = Product.objects.update_or_create(
-                            id=pid,
-                            defaults=defaults,
-                        )
-                        if created:
+                        imported_ids.add(pid)
+                        current = existing.get(pid)
+                        if current is None:
+                            Product.objects.create(id=pid, catalog_version=version, **defaults)
                             created_cnt += 1
-                        else:
+                        elif any(current[k] != v for k, v in defaults.items()):
+                            Product.objects.filter(id=pid).update(catalog_version=version, **defaults)
                             updated_cnt += 1
+                            if current['name'] != defaults['name'] or current['reviews'] != defaults['reviews']:
+                                reembed_ids.append(pid)
+                        else:
+                            unchanged_cnt += 1
                     except Exception as ie:
                         skipped_cnt += 1
                         self.stdout.write(self.style.ERROR(f"행 처리 오류: {ie} | 데이터: {row}"))
 
+            record_deletions(previous_ids - imported_ids, version)
+            # 변경분 공개 + 캐시된 상품 카드/상세 조각 무효화
+            bump_catalog_version()
+            enqueue_product_changes(reembed_ids)
             self.stdout.write(self.style.SUCCESS(
-                f"임포트 완료 - 생성: {created_cnt}개, 업데이트: {updated_cnt}개, 스킵: {skipped_cnt}개"
+                f"임포트 완료 - 생성: {created_cnt}개, 업데이트: {updated_cnt}개, 변경 없음: {unchanged_cnt}개, "
+                f"스킵: {skipped_cnt}개"
             ))
         except FileNotFoundError:
             raise CommandError(f"파일을 찾을 수 없습니다: {path}")
@@ -1,18 +1,23 @@
 import csv
 from django.core.management.base import BaseCommand
 from shop.models import Product
+from shop.utils.catalog import bump_catalog_version, catalog_import, next_catalog_version
+from shop.utils.db import DirectCommandMixin
 
 
-class Command(BaseCommand):
+class Command(DirectCommandMixin, BaseCommand):
     help = 'Import products from CSV file with new structure including classification field'
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='Path to the CSV file')
 
+    @catalog_import()
     def handle(self, *args, **options):
         csv_file_path = options['csv_file']
         
         try:
+            # 생성/변경된 상품에 기록할 카탈로그 버전 (동기화 API의 ?since= 기준)
+            version = next_catalog_version()
             with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
                 reader = csv.DictReader(csvfile)
                 
@@ -47,6 +52,7 @@ class Command(BaseCommand):
                             'img': img,
                             'if_affiliated': if_affiliated,
                             'reviews': reviews,
+                            'catalog_version': version,
                         }
                     )
                     
@@ -65,12 +71,15 @@ class Command(BaseCommand):
                         product.img = img
                         product.if_affiliated = if_affiliated
                         product.reviews = reviews
+                        product.catalog_version = version
                         product.save()
                         updated_count += 1
                         self.stdout.write(
                             self.style.WARNING(f'Updated product: {product.name}')
                         )
                 
+                # 변경분 공개 + 캐시된 상품 카드/상세 조각 무효화
+                bump_catalog_version()
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'Import completed! Created: {created_count}, Updated: {updated_count}'
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shop.utils.db import DirectCommandMixin
+from shop.utils.sessions import purge_expired_sessions, session_table_stats
+
+
+def _size(num_bytes):
+    if num_bytes is None:
+        return '알 수 없음'
+    return f"{num_bytes / 1024 / 1024:.1f}MB"
+
+
+class Command(DirectCommandMixin, BaseCommand):
+    help = '만료 세션을 작은 배치로 삭제하고, 삭제 전에 참여자별 최종 장바구니를 ArchivedCart에 보관합니다 (cron용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SESSION_PURGE_BATCH_SIZE,
+            help=f'한 트랜잭션에서 삭제할 세션 수 (기본값: {settings.SESSION_PURGE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='최대 배치 수 (기본: 만료 세션이 없을 때까지)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=settings.SESSION_PURGE_PAUSE_SECONDS,
+            help=f'배치 사이 대기(초, 기본값: {settings.SESSION_PURGE_PAUSE_SECONDS})',
+        )
+        parser.add_argument(
+            '--stats-only',
+            action='store_true',
+            help='삭제하지 않고 세션 테이블 상태만 출력합니다',
+        )
+
+    def handle(self, *args, **options):
+        before = session_table_stats()
+        self.stdout.write(
+            f"세션 {before['rows']}개 (만료 {before['expired']}개), 테이블 크기 {_size(before['bytes'])}"
+        )
+        if options['stats_only']:
+            return
+        if not before['expired']:
+            self.stdout.write(self.style.WARNING("만료된 세션이 없습니다."))
+            return
+
+        stats = purge_expired_sessions(
+            batch_size=max(1, options['batch_size']), max_batches=options['max_batches'], pause=options['sleep'],
+        )
+        after = session_table_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"정리 완료 - 삭제: {stats['deleted']}개 ({stats['batches']}배치, {stats['seconds']}초, "
+            f"{stats['rows_per_second']}행/초), 장바구니 보관: {stats['archived']}개, "
+            f"남은 세션: {after['rows']}개 (만료 {after['expired']}개)"
+        ))
@@ -0,0 +1,114 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from shop.utils import jobs
+from shop.utils.db import use_direct
+
+
+class Command(BaseCommand):
+    help = '백그라운드 작업 큐(재임베딩, 이웃 갱신, 세션 정리)를 처리합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='작업 처리 스레드 수 (기본값: 2, 종류별 상한은 JOB_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--kinds',
+            nargs='+',
+            help='처리할 작업 종류 (기본: 전체)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='지금 실행 가능한 작업을 모두 처리하고 종료합니다',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='대기열이 비었을 때 다시 확인할 간격(초, 기본값: 2)',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=7,
+            help='완료된 지 이 일수가 지난 작업을 시작 시 삭제 (0이면 삭제 안 함, 기본값: 7)',
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        worker = jobs.worker_name()
+        poll = max(0.1, options['poll_interval'])
+
+        with use_direct():
+            if options['purge_days'] > 0:
+                purged = jobs.purge_finished(options['purge_days'])
+                if purged:
+                    self.stdout.write(f"완료된 작업 {purged}개 삭제")
+            requeued = jobs.requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"중단된 작업 {requeued}개 재등록"))
+            # 상주 워커는 주기적 세션 정리 작업을 예약 (이미 예약돼 있으면 무시됨)
+            if not options['once'] and (not options['kinds'] or jobs.PURGE_SESSIONS in options['kinds']):
+                jobs.schedule_session_purge()
+
+        if not options['once']:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, lambda *_: stop.set())
+
+        counts = {'done': 0, 'retry': 0, 'failed': 0}
+        counts_lock = threading.Lock()
+
+        def loop(index):
+            name = f"{worker}/{index}"
+            try:
+                # ContextVar는 스레드에 전달되지 않으므로 스레드마다 직접 연결 사용
+                with use_direct():
+                    while not stop.is_set():
+                        job = jobs.claim(name, options['kinds'])
+                        if job is None:
+                            if options['once']:
+                                return
+                            stop.wait(poll)
+                            continue
+                        outcome = jobs.run_job(job)
+                        with counts_lock:
+                            counts[outcome] += 1
+                        if outcome != 'done':
+                            self.stdout.write(self.style.WARNING(f"  {job.key}: {outcome} ({job.attempts}회차)"))
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=loop, args=(i,), name=f'job-worker-{i}', daemon=True)
+            for i in range(max(1, options['concurrency']))
+        ]
+        self.stdout.write(f"워커 {worker} 시작 (스레드 {len(threads)}개)")
+        for thread in threads:
+            thread.start()
+
+        # 메인 스레드: 대기열 지표 갱신 + 멈춘 작업 재등록
+        last_check = time.monotonic()
+        with use_direct():
+            while any(thread.is_alive() for thread in threads):
+                if time.monotonic() - last_check >= 60:
+                    jobs.requeue_stale()
+                    last_check = time.monotonic()
+                jobs.update_queue_metrics()
+                stop.wait(poll)
+                if stop.is_set():
+                    break
+        for thread in threads:
+            thread.join()
+        connections.close_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"워커 종료 - 완료: {counts['done']}개, 재시도 예약: {counts['retry']}개, 실패: {counts['failed']}개"
+        ))
@@ -0,0 +1,88 @@
+# shop/middleware.py
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from .utils import metrics, profiling, warmup
+
+
+class RequestMetricsMiddleware:
+    """뷰별 처리 시간, DB 쿼리 수/시간을 기록하고 선택적으로 Server-Timing 헤더를 붙인다."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        try:
+            return self._measure(request)
+        finally:
+            warmup.observe_request()
+
+    def _measure(self, request):
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all(initialized_only=False):
+                    stack.enter_context(conn.execute_wrapper(metrics.db_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        metrics.REQUEST_DB_QUERIES.observe(stats.db_count, view=view)
+        metrics.REQUEST_DB_SECONDS.observe(stats.db_seconds, view=view)
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(stats, elapsed)
+        return response
+
+    @staticmethod
+    def server_timing(stats, elapsed):
+        parts = [
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_count} queries"',
+            f'total;dur={elapsed * 1000:.1f}',
+        ]
+        if stats.embedding_count:
+            parts.insert(1, f'emb;dur={stats.embedding_seconds * 1000:.1f};desc="{stats.embedding_count} calls"')
+        if stats.cache_hits or stats.cache_misses:
+            parts.insert(-1, f'cache;desc="{stats.cache_hits} hit / {stats.cache_misses} miss"')
+        return ', '.join(parts)
+
+
+class ProfilingMiddleware:
+    """서명 헤더/스태프 플래그/표본 추출로 선택된 요청만 프로파일링해 저장 (shop/utils/profiling.py)
+    request.user를 쓰므로 AuthenticationMiddleware 뒤에 둔다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+        try:
+            match = resolve(request.path_info)
+            view = match.url_name or match.view_name
+        except Resolver404:
+            view = 'unmatched'
+        trigger = profiling.trigger_for(request, view)
+        if trigger is None:
+            return self.get_response(request)
+
+        with profiling.RequestProfile(trigger) as profile:
+            response = self.get_response(request)
+        try:
+            path = profile.save(request, view, response.status_code)
+            response['X-Shop-Profile-Id'] = path.name[:-len(profiling.SUFFIX)]
+        except OSError:
+            profiling.logger.exception('프로파일 저장 실패')
+        return response
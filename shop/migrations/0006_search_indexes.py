@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# 하이브리드 검색 후보 탐색용 인덱스 (PostgreSQL 전용)
+# - pg_trgm GIN: name/brand/category ILIKE '%q%' 후보 탐색
+# - HNSW: name_embedding <-> query 근접 이웃 탐색
+SEARCH_INDEXES = [
+    ('shop_product_name_trgm', 'USING gin (name gin_trgm_ops)'),
+    ('shop_product_brand_trgm', 'USING gin (brand gin_trgm_ops)'),
+    ('shop_product_category_trgm', 'USING gin (category gin_trgm_ops)'),
+    ('shop_product_name_emb_hnsw', 'USING hnsw (name_embedding vector_l2_ops)'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    # PostgreSQL에서만 생성 (SQLite는 Python 경로로 검색)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        for name, method in SEARCH_INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON shop_product {method}")
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name, _ in SEARCH_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0005_enable_pgvector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_catalog_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(blank=True, max_length=40)),
+                ('kind', models.CharField(choices=[('cart_add', '장바구니 담기'), ('reco_impression', '추천 노출'), ('reco_click', '추천 클릭')], max_length=30)),
+                ('product_id', models.IntegerField(blank=True, null=True)),
+                ('source', models.CharField(blank=True, max_length=30)),
+                ('rank', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('participant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='shop.participant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['participant', 'created_at'], name='shop_event_partici_b5c588_idx'), models.Index(fields=['kind', 'created_at'], name='shop_event_kind_d66f3c_idx')],
+            },
+        ),
+    ]
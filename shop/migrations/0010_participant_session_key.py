@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='session_key',
+            field=models.CharField(blank=True, db_index=True, max_length=40),
+        ),
+    ]
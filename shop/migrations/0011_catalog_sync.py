@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_participant_session_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogTombstone',
+            fields=[
+                ('product_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(db_index=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='catalog_version',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
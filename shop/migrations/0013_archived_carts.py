@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCart',
+            fields=[
+                ('participant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archived_cart', serialize=False, to='shop.participant')),
+                ('session_key', models.CharField(max_length=40)),
+                ('items', models.JSONField(blank=True, default=dict)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('session_expired_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0013_archived_carts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('if_affiliated', True)), fields=['category', 'id'], include=('name', 'brand', 'price'), name='shop_prod_aff_cat_idx'),
+        ),
+    ]
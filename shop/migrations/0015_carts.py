@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_storefront_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(blank=True, max_length=40)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('participant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='carts', to='shop.participant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CartItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.IntegerField()),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('source', models.CharField(blank=True, max_length=30)),
+                ('affiliated', models.BooleanField(default=False)),
+                ('added_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('removed_at', models.DateTimeField(blank=True, null=True)),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='shop.cart')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product_id', 'cart'], name='shop_cartitem_product_idx'), models.Index(fields=['source', 'affiliated', 'cart'], name='shop_cartitem_arm_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cart', 'product_id'), name='shop_cartitem_cart_product_uniq')],
+            },
+        ),
+    ]
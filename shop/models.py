@@ -29,6 +29,12 @@ class Product(models.Model):
         # SQLite 호환용 (JSON 문자열로 저장)
         name_embedding = models.TextField(blank=True, null=True)
         description_embedding = models.TextField(blank=True, null=True)
+    # 임베딩 마지막 갱신 시각 (이웃 테이블 증분 갱신 기준)
+    embedding_updated_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    # 임베딩을 만들 때 쓴 텍스트의 해시 (내용이 그대로면 재임베딩 작업이 API를 호출하지 않음)
+    embedding_text_hash = models.CharField(max_length=40, blank=True)
+    # 이 상품이 마지막으로 바뀐 카탈로그 버전 (카탈로그 동기화 API의 ?since= 기준)
+    catalog_version = models.PositiveIntegerField(default=0, db_index=True)
 
     def __str__(self):
         return f"[{self.brand}] {self.name}"
@@ -47,9 +53,55 @@ class Product(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['brand']),
             models.Index(fields=['if_affiliated']),
+            # 장바구니/AI 대체 추천: 제휴 상품만 카테고리별로 (부분 인덱스, PostgreSQL은 카드 필드까지 포함)
+            models.Index(fields=['category', 'id'], condition=models.Q(if_affiliated=True),
+                         include=['name', 'brand', 'price'], name='shop_prod_aff_cat_idx'),
         ]
 
 
+class ProductNeighbor(models.Model):
+    """상품별 최근접 이웃 목록 (build_neighbors 명령으로 미리 계산)
+    - affiliated_only=True 목록은 제휴 상품만을 이웃 후보로 계산한 것
+    - (product, affiliated_only, rank) 유니크 인덱스로 상품당 한 번의 인덱스 조회
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='neighbor_of')
+    affiliated_only = models.BooleanField(default=False)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.neighbor_id} (#{self.rank})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'affiliated_only', 'rank'],
+                name='shop_neighbor_product_rank_uniq',
+            ),
+        ]
+
+
+class CatalogState(models.Model):
+    """카탈로그 버전 (단일 행). 상품 임포트/이웃 갱신 때마다 증가하며 렌더링 조각 캐시 키에 쓰인다."""
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"catalog v{self.version}"
+
+
+class CatalogTombstone(models.Model):
+    """삭제된 상품 기록 (카탈로그 동기화 API가 클라이언트 캐시에서 지울 ID를 알려주는 데 사용)"""
+    product_id = models.IntegerField(primary_key=True)
+    version = models.PositiveIntegerField(db_index=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"deleted {self.product_id} (v{self.version})"
+
+
 class Participant(models.Model):
     """연구 참여자 정보 및 동의 상태 기록"""
     name = models.CharField(max_length=100)
@@ -62,7 +114,132 @@ class Participant(models.Model):
 
     user_agent = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
+    # 동의 직후 새로 시작한 세션 키 (내보내기 시 장바구니 상태와 연결)
+    session_key = models.CharField(max_length=40, blank=True, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} ({self.student_id})"
+
+
+class ArchivedCart(models.Model):
+    """만료 세션을 지우기 전에 남기는 참여자별 최종 장바구니 (shop/utils/sessions.py)
+    items: {"상품 ID": 수량}. 같은 참여자의 세션이 다시 정리되면 최신 내용으로 덮어씀
+    """
+    participant = models.OneToOneField(Participant, on_delete=models.CASCADE, primary_key=True,
+                                       related_name='archived_cart')
+    session_key = models.CharField(max_length=40)
+    items = models.JSONField(default=dict, blank=True)
+    quantity = models.PositiveIntegerField(default=0)
+    session_expired_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.participant_id} ({self.quantity}개)"
+
+
+class Cart(models.Model):
+    """참여자 장바구니 (세션에는 cart_id만 저장, shop/utils/carts.py)"""
+    participant = models.ForeignKey(Participant, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='carts')
+    session_key = models.CharField(max_length=40, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"cart {self.id} ({self.participant_id})"
+
+
+class CartItem(models.Model):
+    """장바구니 상품. 수량을 0으로 바꾸거나 비우면 행을 지우지 않고 removed_at을 기록해
+    "담았다가 뺀" 상품도 집계할 수 있게 한다 (다시 담으면 removed_at을 지움)
+    """
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
+    product_id = models.IntegerField()  # 상품 삭제/재임포트와 무관하게 원본 ID 보존 (Event와 같음)
+    quantity = models.PositiveIntegerField(default=1)
+    source = models.CharField(max_length=30, blank=True)  # 처음 담은 위치 (ai_reco, product_list, product_detail 등)
+    affiliated = models.BooleanField(default=False)  # 처음 담을 때의 제휴 여부
+    added_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+    removed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.cart_id}: {self.product_id} x{self.quantity}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product_id'], name='shop_cartitem_cart_product_uniq'),
+        ]
+        indexes = [
+            # cart_stats 집계: 상품별 / (담은 위치, 제휴 여부)별 참여자 수 (cart_id까지 인덱스에서 읽음)
+            models.Index(fields=['product_id', 'cart'], name='shop_cartitem_product_idx'),
+            models.Index(fields=['source', 'affiliated', 'cart'], name='shop_cartitem_arm_idx'),
+        ]
+
+
+class Event(models.Model):
+    """참여자 행동 로그 (장바구니 담기, 추천 노출/클릭 등)
+    요청 경로에서는 메모리 버퍼에만 쌓이고 백그라운드 플러셔가 bulk_create로 묶어서 저장한다 (shop/utils/events.py)
+    """
+    KIND_CHOICES = [
+        ('cart_add', '장바구니 담기'),
+        ('reco_impression', '추천 노출'),
+        ('reco_click', '추천 클릭'),
+    ]
+
+    participant = models.ForeignKey(Participant, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='events')
+    session_key = models.CharField(max_length=40, blank=True)
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    product_id = models.IntegerField(null=True, blank=True)  # 상품 삭제/재임포트와 무관하게 원본 ID 보존
+    source = models.CharField(max_length=30, blank=True)  # 발생 위치 (ai_reco, product_list, product_detail 등)
+    rank = models.PositiveSmallIntegerField(null=True, blank=True)  # 추천 목록 내 순위 (1부터)
+    payload = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.name} ({self.student_id})"
\ No newline at end of file
+        return f"{self.participant_id} {self.kind} {self.product_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['participant', 'created_at']),
+            models.Index(fields=['kind', 'created_at']),
+        ]
+
+
+class Job(models.Model):
+    """DB 기반 백그라운드 작업 큐 (run_worker 명령이 처리, shop/utils/jobs.py)
+    같은 key의 대기 중(queued) 작업은 하나만 존재하므로 같은 상품을 여러 번 등록해도 한 번만 실행된다.
+    """
+    STATUS_CHOICES = [
+        ('queued', '대기'),
+        ('running', '실행 중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    key = models.CharField(max_length=100)  # 중복 제거 키 (예: embed_product:42)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)  # 재시도 백오프
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status='queued'),
+                name='shop_job_queued_key_uniq',
+            ),
+        ]
@@ -0,0 +1,46 @@
+# shop/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Product
+from .utils.catalog import bump_catalog_version, importing, next_catalog_version, record_deletions
+from .utils.jobs import enqueue_product_changes
+
+# 임베딩 작업/임포트가 스스로 갱신하는 필드만 바뀐 저장은 다시 등록하지 않음
+DERIVED_FIELDS = {'name_embedding', 'description_embedding', 'embedding_text_hash', 'embedding_updated_at',
+                  'catalog_version'}
+
+
+@receiver(post_save, sender=Product, dispatch_uid='shop_product_enqueue_embedding')
+def enqueue_embedding(sender, instance, raw=False, update_fields=None, **kwargs):
+    """상품이 저장되면 재임베딩 작업 등록 (요청 안에서는 작업 행 INSERT만, 임베딩은 run_worker가 처리)"""
+    if raw:
+        return  # loaddata
+    if update_fields is not None and set(update_fields) <= DERIVED_FIELDS:
+        return
+    enqueue_product_changes([instance.pk])
+
+
+@receiver(post_save, sender=Product, dispatch_uid='shop_product_catalog_version')
+def stamp_catalog_version(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    """관리자 수정 등 개별 저장: 다음 버전을 기록하고 커밋 후 공개
+    (가격/제휴/카테고리만 바뀌면 재임베딩도 이웃 갱신도 없으므로 여기서 올려야 조각 캐시·패싯·동기화 API에 반영됨)
+    """
+    if raw or importing():
+        return  # loaddata, 임포트 (임포트가 직접 기록/공개)
+    if update_fields is not None and set(update_fields) <= DERIVED_FIELDS:
+        return
+    version = next_catalog_version()
+    Product.objects.using(using).filter(pk=instance.pk).update(catalog_version=version)
+    instance.catalog_version = version
+    transaction.on_commit(bump_catalog_version, using=using)
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='shop_product_tombstone')
+def record_product_deletion(sender, instance, using=None, **kwargs):
+    """관리자 삭제: 삭제 기록을 남겨 동기화 클라이언트 캐시에서도 지우고 커밋 후 공개"""
+    if importing():
+        return
+    record_deletions([instance.pk], next_catalog_version())
+    transaction.on_commit(bump_catalog_version, using=using)
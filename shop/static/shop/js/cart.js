@@ -0,0 +1,209 @@
+// API 주소와 CSRF 토큰은 템플릿의 #cartApi 데이터 속성에서 읽음
+const cartApi = document.getElementById('cartApi').dataset;
+
+(function(){
+    const status = document.getElementById('ai-reco-status');
+    const grid = document.getElementById('ai-recommended');
+    if (!grid) return;
+
+    function render(items){
+        grid.innerHTML = '';
+        if (!items || !items.length){
+            grid.innerHTML = '<div style="color:#666; font-size:14px;">추천 결과가 없습니다.</div>';
+            return;
+        }
+        items.forEach((p, i) => {
+            const card = document.createElement('div');
+            card.className = 'recommended-product';
+            if (p.id != null) card.dataset.id = String(p.id);
+            card.dataset.rank = String(i + 1);
+            card.innerHTML = `
+                <img src="${p.thumb || p.img || ''}" alt="${p.name || ''}" class="recommended-image">
+                <div class="recommended-info">
+                    <div class="recommended-brand">${p.brand || ''}</div>
+                    <div class="recommended-name">${p.name || ''}</div>
+                    <div class="recommended-price">${(p.price||0).toLocaleString()}원</div>
+                    <button class="select-btn" data-id="${p.id}">선택하기</button>
+                </div>`;
+            grid.appendChild(card);
+        });
+    }
+
+    // 추천 클릭 기록: 페이지 이동 중에도 전송되도록 sendBeacon 사용
+    function logRecoClick(cardEl){
+        const data = new FormData();
+        data.append('csrfmiddlewaretoken', cartApi.csrfToken || getCookie('csrftoken') || '');
+        data.append('kind', 'reco_click');
+        data.append('product_id', cardEl.dataset.id || '');
+        data.append('rank', cardEl.dataset.rank || '');
+        data.append('source', 'ai_reco');
+        navigator.sendBeacon(cartApi.eventsUrl, data);
+    }
+
+    async function loadRecommendations(){
+        if (status) status.style.display = 'inline';
+        try {
+            const res = await fetch(cartApi.recoUrl);
+            const data = await res.json();
+            if (data.ok){
+                render(data.results);
+            } else {
+                render([]);
+            }
+        } catch (e){
+            render([]);
+        } finally {
+            if (status) status.style.display = 'none';
+        }
+    }
+
+    // 페이지 로드시 자동 로드
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', loadRecommendations);
+    } else {
+        loadRecommendations();
+    }
+
+    // 델리게이션:
+    // 1) 선택하기 버튼 → 장바구니 담기
+    // 2) 카드 영역 클릭 → 상품 상세 페이지로 이동
+    grid?.addEventListener('click', async (e) => {
+        const selectBtn = e.target.closest('.select-btn');
+        if (selectBtn){
+            const pid = selectBtn.getAttribute('data-id');
+            if (!pid) return;
+            const formData = new FormData();
+            formData.append('product_id', pid);
+            formData.append('quantity', '1');
+            formData.append('source', 'ai_reco');
+            const csrf = cartApi.csrfToken || getCookie('csrftoken') || '';
+            const res = await fetch(cartApi.addUrl, {
+                method: 'POST',
+                headers: { 'X-CSRFToken': csrf },
+                body: formData
+            });
+            if (res.ok){
+                selectBtn.textContent = '담김!';
+                selectBtn.disabled = true;
+            }
+            return; // 버튼 클릭일 때는 여기서 종료
+        }
+
+        const cardEl = e.target.closest('.recommended-product');
+        if (cardEl && cardEl.dataset.id){
+            const pid = cardEl.dataset.id;
+            logRecoClick(cardEl);
+            window.location.href = `/shop/product/${pid}/`;
+        }
+    });
+})();
+
+// 수량/삭제/합계 갱신 스크립트
+function fmt(n){ try { return Number(n).toLocaleString() + '원'; } catch { return String(n) + '원'; } }
+
+function applySummary(sum){
+    const s1 = document.getElementById('sum-subtotal');
+    const s2 = document.getElementById('sum-shipping');
+    const s3 = document.getElementById('sum-total');
+    if (s1) s1.textContent = fmt(sum?.subtotal || 0);
+    if (s2) s2.textContent = fmt(sum?.shipping || 0);
+    if (s3) s3.textContent = fmt(sum?.total || 0);
+}
+
+async function updateCartApi(productId, quantity){
+    const res = await fetch(cartApi.updateUrl, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken') || '',
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+        },
+        body: new URLSearchParams({ product_id: String(productId), quantity: String(quantity) })
+    });
+    const data = await res.json();
+    if (!res.ok || !data.ok) throw new Error(data.error || 'update-failed');
+    return data.summary;
+}
+
+async function clearCart(){
+    const res = await fetch(cartApi.clearUrl, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': getCookie('csrftoken') || '' }
+    });
+    const data = await res.json();
+    if (!res.ok || !data.ok) throw new Error('clear-failed');
+    return data.summary;
+}
+
+// 초기 수량 반영
+document.addEventListener('DOMContentLoaded', () => {
+    try {
+        const txt = document.getElementById('cart-quantities')?.textContent || '{}';
+        const qmap = JSON.parse(txt);
+        document.querySelectorAll('.cart-item').forEach(row => {
+            const pid = row.getAttribute('data-id');
+            const input = row.querySelector('.quantity-input');
+            if (qmap && pid && input && qmap[pid] != null){
+                input.value = String(qmap[pid]);
+            }
+        });
+    } catch(e) { /* noop */ }
+});
+
+// 이벤트 델리게이션: 수량 증감/삭제/비우기
+document.addEventListener('click', async (e) => {
+    // 전체 비우기
+    if (e.target.matches('#btn-clear-cart')){
+        try {
+            const sum = await clearCart();
+            applySummary(sum);
+            document.querySelectorAll('.cart-item').forEach(el => el.remove());
+        } catch(err){ console.error(err); alert('장바구니 비우기에 실패했습니다.'); }
+        return;
+    }
+
+    const item = e.target.closest('.cart-item');
+    if (!item) return;
+    const pid = item.getAttribute('data-id');
+
+    // 수량 버튼
+    if (e.target.matches('.quantity-btn')){
+        const delta = parseInt(e.target.getAttribute('data-delta') || '0', 10);
+        const input = item.querySelector('.quantity-input');
+        let val = parseInt(input.value || '1', 10) + delta;
+        if (val < 0) val = 0;
+        input.value = String(val);
+        try {
+            const sum = await updateCartApi(pid, val);
+            applySummary(sum);
+            if (val === 0) item.remove();
+        } catch(err){ console.error(err); alert('장바구니 업데이트에 실패했습니다.'); }
+        return;
+    }
+
+    // 삭제 버튼
+    if (e.target.matches('.remove-btn')){
+        try {
+            const sum = await updateCartApi(pid, 0);
+            applySummary(sum);
+            item.remove();
+        } catch(err){ console.error(err); alert('삭제에 실패했습니다.'); }
+        return;
+    }
+});
+
+// 수량 입력 수동 변경 반영
+document.addEventListener('change', async (e) => {
+    const input = e.target.closest('.quantity-input');
+    if (!input) return;
+    const item = e.target.closest('.cart-item');
+    if (!item) return;
+    const pid = item.getAttribute('data-id');
+    let val = parseInt(input.value || '1', 10);
+    if (isNaN(val) || val < 0) val = 0;
+    input.value = String(val);
+    try {
+        const sum = await updateCartApi(pid, val);
+        applySummary(sum);
+        if (val === 0) item.remove();
+    } catch(err){ console.error(err); alert('장바구니 업데이트에 실패했습니다.'); }
+});
@@ -0,0 +1,104 @@
+// 카탈로그 로컬 캐시: /shop/api/catalog/의 변경분(?since=<version>)만 받아 IndexedDB에 보관하고
+// 자동완성 등은 서버 요청 없이 로컬에서 처리한다. IndexedDB를 쓸 수 없으면 suggest()가 null을 돌려주므로
+// 호출 측은 기존 API로 대체한다.
+(function () {
+  const script = document.currentScript;
+  const API_URL = script ? script.dataset.url : '/shop/api/catalog/';
+  const FIELDS = 'name,brand,category,classification,price,if_affiliated,thumb';
+  const DB_NAME = 'roopang-catalog';
+  const SYNC_INTERVAL_MS = 60 * 1000;  // 같은 브라우저에서 이 간격 안의 재동기화는 생략
+
+  let dbPromise = null;
+  let ready = null;
+
+  function openDb() {
+    if (!('indexedDB' in window)) return Promise.reject(new Error('indexedDB unavailable'));
+    if (!dbPromise) {
+      dbPromise = new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => {
+          req.result.createObjectStore('products', { keyPath: 'id' });
+          req.result.createObjectStore('meta');
+        };
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+      });
+    }
+    return dbPromise;
+  }
+
+  function done(tx) {
+    return new Promise((resolve, reject) => {
+      tx.oncomplete = () => resolve();
+      tx.onerror = tx.onabort = () => reject(tx.error);
+    });
+  }
+
+  function request(req) {
+    return new Promise((resolve, reject) => {
+      req.onsuccess = () => resolve(req.result);
+      req.onerror = () => reject(req.error);
+    });
+  }
+
+  async function readMeta(db) {
+    const tx = db.transaction('meta', 'readonly');
+    return (await request(tx.objectStore('meta').get('sync'))) || null;
+  }
+
+  async function sync() {
+    const db = await openDb();
+    const meta = await readMeta(db);
+    if (meta && meta.fields === FIELDS && Date.now() - meta.syncedAt < SYNC_INTERVAL_MS) return meta.version;
+
+    const params = new URLSearchParams({ fields: FIELDS });
+    if (meta && meta.fields === FIELDS) params.set('since', meta.version);
+    const res = await fetch(API_URL + '?' + params.toString());
+    if (!res.ok) throw new Error('catalog sync failed: ' + res.status);
+    const data = await res.json();
+
+    const tx = db.transaction(['products', 'meta'], 'readwrite');
+    const store = tx.objectStore('products');
+    if (data.full) store.clear();
+    data.products.forEach(row => {
+      const item = {};
+      data.fields.forEach((f, i) => { item[f] = row[i]; });
+      store.put(item);
+    });
+    data.deleted.forEach(id => store.delete(id));
+    tx.objectStore('meta').put({ version: data.version, fields: FIELDS, syncedAt: Date.now() }, 'sync');
+    await done(tx);
+    return data.version;
+  }
+
+  async function all() {
+    await ready;
+    const db = await openDb();
+    const items = await request(db.transaction('products', 'readonly').objectStore('products').getAll());
+    return items.sort((a, b) => a.id - b.id);
+  }
+
+  // 서버 _suggest_from_products와 같은 규칙: 이름 > 브랜드 > 카테고리, 부분 일치, 중복 제거
+  async function suggest(query, limit = 8) {
+    const q = (query || '').trim().toLowerCase();
+    if (!q) return [];
+    let items;
+    try {
+      items = await all();
+    } catch (e) {
+      return null;
+    }
+    if (!items.length) return null;
+    const match = key => items.filter(p => (p[key] || '').toLowerCase().includes(q)).slice(0, limit).map(p => p[key]);
+    const seen = new Set();
+    const out = [];
+    for (const s of [...match('name'), ...match('brand'), ...match('category')]) {
+      if (s && !seen.has(s)) { seen.add(s); out.push(s); }
+      if (out.length >= limit) break;
+    }
+    return out;
+  }
+
+  ready = sync().catch(() => null);
+  window.RoopangCatalog = { sync, all, suggest };
+})();
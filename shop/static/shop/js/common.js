@@ -0,0 +1,8 @@
+// 여러 페이지 번들 앞에 붙는 공용 함수 (STATIC_BUNDLES 참고)
+
+// CSRF 토큰 쿠키에서 읽기
+function getCookie(name) {
+    const value = `; ${document.cookie}`;
+    const parts = value.split(`; ${name}=`);
+    if (parts.length === 2) return parts.pop().split(';').shift();
+}
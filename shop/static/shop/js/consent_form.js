@@ -0,0 +1,23 @@
+// 모든 체크박스 + 필수 입력값이 유효할 때만 동의 버튼 활성화
+const checkboxes = document.querySelectorAll('.consent-checkboxes input[type="checkbox"]');
+const agreeBtn = document.getElementById('agreeBtn');
+const nameInput = document.getElementById('name');
+const studentInput = document.getElementById('student_id');
+const phoneInput = document.getElementById('phone');
+
+function validInputs() {
+    const nameOk = nameInput && nameInput.value.trim().length > 0;
+    const sidOk = studentInput && studentInput.value.trim().length > 0;
+    const phoneOk = phoneInput && phoneInput.checkValidity();
+    return nameOk && sidOk && phoneOk;
+}
+
+function updateButtonState() {
+    const allChecked = Array.from(checkboxes).every(cb => cb.checked);
+    agreeBtn.disabled = !(allChecked && validInputs());
+}
+
+[...checkboxes, nameInput, studentInput, phoneInput].forEach(el => {
+    if (el) el.addEventListener('input', updateButtonState);
+    if (el) el.addEventListener('change', updateButtonState);
+});
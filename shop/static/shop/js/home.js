@@ -0,0 +1,55 @@
+// API 주소는 템플릿의 #searchApi 데이터 속성에서 읽음
+const searchApi = document.getElementById('searchApi').dataset;
+
+function submitSearch(e){
+  const v = document.getElementById('search-input').value.trim();
+  if (!v) { e.preventDefault(); return false; }
+  return true;
+}
+function gotoCategory(cat){
+  const url = new URL(searchApi.listUrl, location.origin);
+  url.searchParams.set('q', cat);
+  location.href = url.toString();
+}
+
+// 자동완성 & 트렌딩 (자동완성은 로컬 카탈로그 캐시 우선, 없으면 서버 API)
+const box = document.getElementById('auto-box');
+const input = document.getElementById('search-input');
+let acTimer = null;
+input.addEventListener('input', () => {
+  const q = input.value.trim();
+  clearTimeout(acTimer);
+  if (!q) { box.style.display='none'; box.innerHTML=''; return; }
+  acTimer = setTimeout(async () => {
+    const local = window.RoopangCatalog ? await RoopangCatalog.suggest(q) : null;
+    if (local) { renderSuggest(local); return; }
+    const res = await fetch(searchApi.suggestUrl + '?q=' + encodeURIComponent(q));
+    const data = await res.json();
+    if (data.ok) renderSuggest(data.suggestions);
+  }, 150);
+});
+input.addEventListener('focus', () => { if (box.innerHTML) box.style.display='block'; });
+document.addEventListener('click', (e)=>{ if(!e.target.closest('.search')){ box.style.display='none'; }});
+
+function renderSuggest(items){
+  if (!items || !items.length){ box.style.display='none'; box.innerHTML=''; return; }
+  box.innerHTML = items.map(s => `<div class="auto-item" data-v="${s}">${s}</div>`).join('');
+  box.style.display = 'block';
+  box.querySelectorAll('.auto-item').forEach(el => el.addEventListener('click', ()=>{
+    input.value = el.dataset.v; box.style.display='none';
+    const f = el.closest('.search').querySelector('form'); f.submit();
+  }));
+}
+
+async function loadTrending(){
+  const res = await fetch(searchApi.trendingUrl);
+  const data = await res.json();
+  const list = document.getElementById('trend-list');
+  if (!data.ok) { list.innerHTML = '<div>데이터 없음</div>'; return; }
+  list.innerHTML = data.trending.map(t => `
+    <div class="trend-item">
+      <span>${t.rank}. ${t.term}</span>
+      <span style="color:${t.delta==='▲'?'#dc2626':t.delta==='▼'?'#2563eb':'#6b7280'}">${t.delta}</span>
+    </div>`).join('');
+}
+loadTrending();
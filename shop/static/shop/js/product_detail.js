@@ -0,0 +1,71 @@
+// 가격 값을 DOM 데이터셋에서 안전하게 읽어옴 (템플릿 코드를 JS에 직접 주입하지 않음)
+const basePrice = Number(document.getElementById('productData').dataset.price || 0);
+
+function increaseQuantity() {
+    const quantityInput = document.getElementById('quantity');
+    quantityInput.value = (parseInt(quantityInput.value, 10) || 1) + 1;
+    updateTotalPrice();
+}
+
+function decreaseQuantity() {
+    const quantityInput = document.getElementById('quantity');
+    const current = parseInt(quantityInput.value, 10) || 1;
+    if (current > 1) {
+        quantityInput.value = current - 1;
+        updateTotalPrice();
+    }
+}
+
+function updateTotalPrice() {
+    const quantity = parseInt(document.getElementById('quantity').value, 10) || 1;
+    const totalPrice = basePrice * quantity;
+    const el = document.getElementById('totalPrice');
+    if (el) el.textContent = totalPrice.toLocaleString();
+}
+
+async function addToCart() {
+    const quantity = parseInt(document.getElementById('quantity').value, 10) || 1;
+    const productId = Number(document.getElementById('productData').dataset.pid || 0);
+    try {
+        const addUrl = (document.getElementById('cartApi')?.dataset.addUrl) || '/shop/api/cart/add/';
+        const res = await fetch(addUrl, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken') || '',
+                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            },
+            body: new URLSearchParams({ product_id: String(productId), quantity: String(quantity), source: 'product_detail' })
+        });
+        const data = await res.json();
+        if (!res.ok || !data.ok) throw new Error(data.error || 'add-failed');
+        alert('장바구니에 추가되었습니다!');
+    } catch (err) {
+        console.error(err);
+        alert('장바구니 담기 중 오류가 발생했습니다.');
+    }
+}
+
+function showTab(tabName, evt) {
+    // 모든 탭 비활성화
+    document.querySelectorAll('.tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // 모든 탭 콘텐츠 숨기기
+    const reviews = document.getElementById('reviews-tab');
+    const info = document.getElementById('info-tab');
+    if (reviews) reviews.style.display = 'none';
+    if (info) info.style.display = 'none';
+
+    // 선택된 탭 활성화
+    if (evt && evt.target) evt.target.classList.add('active');
+    const target = document.getElementById(`${tabName}-tab`);
+    if (target) target.style.display = 'block';
+}
+
+// 초기 바인딩
+document.addEventListener('DOMContentLoaded', () => {
+    const qty = document.getElementById('quantity');
+    if (qty) qty.addEventListener('input', updateTotalPrice);
+    updateTotalPrice();
+});
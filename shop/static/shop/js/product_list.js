@@ -0,0 +1,85 @@
+// 간단 자동완성
+const listInput = document.getElementById('list-search');
+const listBox = document.getElementById('list-auto');
+let listTimer = null;
+const listSuggestUrl = (document.getElementById('searchApi')?.dataset.suggestUrl) || '/shop/api/search/suggest/';
+if (listInput){
+    listInput.addEventListener('input', () => {
+        clearTimeout(listTimer);
+        const q = listInput.value.trim();
+        if (!q){ listBox.style.display='none'; listBox.innerHTML=''; return; }
+        listTimer = setTimeout(async () => {
+            // 로컬 카탈로그 캐시 우선, 없으면 서버 API
+            let suggestions = window.RoopangCatalog ? await RoopangCatalog.suggest(q) : null;
+            if (!suggestions) {
+                const res = await fetch(listSuggestUrl + '?q=' + encodeURIComponent(q));
+                const data = await res.json();
+                suggestions = data.ok ? data.suggestions : [];
+            }
+            if (!suggestions.length){ listBox.style.display='none'; listBox.innerHTML=''; return; }
+            listBox.innerHTML = suggestions.map(s => `<div class=\"auto-item\" data-v=\"${s}\" style=\"padding:10px 12px;font-size:14px;cursor:pointer;\">${s}</div>`).join('');
+            listBox.style.display = 'block';
+            listBox.querySelectorAll('.auto-item').forEach(el => el.addEventListener('click', ()=>{
+                listInput.value = el.dataset.v; listBox.style.display='none';
+                el.closest('form').submit();
+            }));
+        }, 150);
+    });
+    document.addEventListener('click', (e)=>{ if(!e.target.closest('.search-bar')){ listBox.style.display='none'; }});
+}
+async function addToCart(productId, quantity = 1) {
+    const addUrl = (document.getElementById('cartApi')?.dataset.addUrl) || '/shop/api/cart/add/';
+    try {
+        const res = await fetch(addUrl, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken') || '',
+                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            },
+            body: new URLSearchParams({ product_id: String(productId), quantity: String(quantity), source: 'product_list' })
+        });
+        const data = await res.json();
+        if (!res.ok || !data.ok) throw new Error(data.error || 'add-failed');
+        alert('장바구니에 추가되었습니다!');
+    } catch (err) {
+        console.error(err);
+        alert('장바구니 담기 중 오류가 발생했어요. 잠시 후 다시 시도해주세요.');
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('.cart-btn-product').forEach(btn => {
+        btn.addEventListener('click', (e) => {
+            e.stopPropagation();
+            e.preventDefault();
+            const id = btn.dataset.productId;
+            addToCart(id);
+        });
+    });
+    // 필터 버튼: 클릭 시 q 파라미터로 이동
+    document.querySelectorAll('.filter-btn').forEach(btn => {
+        btn.addEventListener('click', () => {
+            const url = new URL(window.location.href);
+            url.searchParams.delete('page');
+            // 분류 탭 클릭일 경우: cls만 변경하고 q는 제거
+            if (btn.classList.contains('cls-btn')) {
+                const cls = btn.dataset.cls || '';
+                if (cls) url.searchParams.set('cls', cls); else url.searchParams.delete('cls');
+                url.searchParams.delete('q');
+            } else {
+                // 소카테고리 필터
+                const q = btn.dataset.q || '';
+                if (q) {
+                    url.searchParams.set('q', q);
+                } else {
+                    url.searchParams.delete('q');
+                }
+                // cls는 유지
+                const currentCls = document.querySelector('.cls-btn.active')?.dataset.cls;
+                if (currentCls) url.searchParams.set('cls', currentCls);
+            }
+            const next = url.pathname + (url.searchParams.toString() ? ('?' + url.searchParams.toString()) : '');
+            window.location.href = next;
+        });
+    });
+});
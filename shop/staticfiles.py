@@ -0,0 +1,42 @@
+"""정적 파일 파인더/스토리지 (settings.STATICFILES_FINDERS, settings.STORAGES)"""
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from shop.utils import bundles
+
+
+class BundleFinder(BaseFinder):
+    """STATIC_BUNDLES 번들을 필요할 때 만들어 정적 파일로 제공 (shop/utils/bundles.py)"""
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        if path not in settings.STATIC_BUNDLES:
+            return [] if find_all else None
+        built = str(bundles.build(path))
+        return [built] if find_all else built
+
+    def list(self, ignore_patterns):
+        storage = FileSystemStorage(location=settings.STATIC_BUNDLE_DIR)
+        for name in settings.STATIC_BUNDLES:
+            bundles.build(name)
+            yield name, storage
+
+
+class ShopStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """collectstatic 전(매니페스트 없음)에는 해시 없는 이름을 그대로 사용
+
+    로컬 실행과 테스트는 collectstatic 없이도 {% static %}이 동작하고, 매니페스트가 있는 배포에서는
+    빠진 항목이 있으면 기존처럼 오류를 낸다.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if self.hashed_files:
+                raise
+            return name
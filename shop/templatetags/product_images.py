@@ -0,0 +1,42 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+from shop.utils.images import available_widths, request_thumbnails, srcset, thumb_url, thumbnails_enabled
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 600px) 50vw, 240px'
+
+
+@register.simple_tag
+def product_image(product, sizes=DEFAULT_SIZES, css_class='', loading='lazy', width=320):
+    """로컬 썸네일 srcset을 가진 <picture> (WebP 우선, JPEG 대체). 썸네일을 쓸 수 없으면 원본 <img>
+    이미 만들어진 변형만 srcset에 넣고, 없는 변형은 작업 큐에 생성을 등록한다 (만들어지기 전까지 원본 URL 사용).
+    사용: {% load product_images %}{% product_image p css_class="product-image" %}
+    """
+    img = product.img or ''
+    original = format_html('<img src="{}" alt="{}" class="{}" loading="{}">', img, product.name, css_class, loading)
+    if not img or not thumbnails_enabled() or 'jpeg' not in settings.THUMBNAIL_FORMATS:
+        return original
+
+    widths = {fmt: available_widths(product.id, img, fmt) for fmt in settings.THUMBNAIL_FORMATS}
+    if any(len(found) < len(settings.THUMBNAIL_WIDTHS) for found in widths.values()):
+        request_thumbnails(product.id, img)
+    jpeg = widths['jpeg']
+    if not jpeg:
+        return original
+
+    webp = ''
+    if widths.get('webp'):
+        webp = format_html('<source type="image/webp" srcset="{}" sizes="{}">',
+                           srcset(product.id, img, 'webp', widths['webp']), sizes)
+    # src: 요청한 너비 이하 중 가장 큰 변형 (없으면 가장 작은 것)
+    src_width = max((w for w in jpeg if w <= width), default=min(jpeg))
+    # display:contents: <picture>가 레이아웃에 끼지 않아 기존 img CSS가 그대로 적용됨
+    return format_html(
+        '<picture style="display:contents">{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}">'
+        '</picture>',
+        webp, thumb_url(product.id, img, src_width), srcset(product.id, img, 'jpeg', jpeg), sizes, product.name,
+        css_class, loading,
+    )
@@ -1,3 +1,1205 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.template import Context, Template
+from django.urls import reverse
+from django.utils import timezone
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .db_routers import CatalogReplicaRouter, PrimaryDirectRouter
+from .management.commands import bench_vectors
+from .models import ArchivedCart, CartItem, Event, Job, Participant, Product, ProductNeighbor
+from .utils import (
+    bundles, carts, db as shop_db, events, images, jobs, profiling, query_plans, resilience, vector_index,
+    vector_shards, warmup,
+)
+from .utils.bench import FLOW_STEPS, run_flow, seed_products, stub_embeddings
+from .utils.catalog import bump_catalog_version
+from .utils.embeddings import OpenAIEmbeddingGenerator, pgvector_enabled
+from .utils.events import flush_events
+from .utils.neighbors import rebuild_neighbors, recommend_from_neighbors, refresh_neighbors, related_products
+from .utils.search import hybrid_search, reciprocal_rank_fusion
+
+
+class ParticipantFlowTests(TransactionTestCase):
+    """동의 → 홈 → 검색 → 상세 → 담기 → 장바구니 → AI 추천 전체 흐름 (bench_flow와 같은 경로)"""
+
+    def test_flow_runs_without_errors(self):
+        seed_products(20, dim=8)
+        with stub_embeddings(dim=8):
+            result = run_flow(users=1, iterations=2)
+        self.assertEqual(set(result['endpoints']), set(FLOW_STEPS))
+        for name, summary in result['endpoints'].items():
+            self.assertEqual(summary['count'], 2, name)
+            self.assertEqual(summary['errors'], 0, name)
+        # 담기/추천 노출 이벤트가 버퍼를 거쳐 저장됨
+        self.assertEqual(Event.objects.filter(kind='cart_add', source='').count(), 2)
+        self.assertTrue(Event.objects.filter(kind='reco_impression', source='ai_reco', rank=1).exists())
+
+
+class BenchVectorsTests(TransactionTestCase):
+    """bench_vectors 측정 루프를 작은 합성 카탈로그로 실행 (벤치용 DB 생성은 건너뛰고 테스트 DB 사용)"""
+
+    def test_bench_size_reports_every_scenario(self):
+        self.addCleanup(vector_index.invalidate_vector_index)
+        options = {'seed': 0, 'dim': 8, 'queries': 2, 'k': 3, 'backends': None, 'budget': 30.0,
+                   'shards': 0, 'shard_by': 'id'}
+        command = bench_vectors.Command(stdout=io.StringIO())
+        with stub_embeddings(dim=8):
+            rows = command._bench_size(40, options)
+        self.assertEqual(Product.objects.count(), 40)
+        self.assertEqual([row['scenario'] for row in rows if row['backend'] == 'python'], list(bench_vectors.SCENARIOS))
+        for row in rows:
+            self.assertEqual((row['size'], row['skipped']), (40, 0))
+            self.assertIn('p95_ms', row)
+            if row['backend'] == 'python':
+                self.assertEqual(row['recall_at_k'], 1.0)  # 정확 검색
+
+
+class HybridSearchTests(TransactionTestCase):
+    """문자열 후보 + 벡터 후보를 RRF로 합치고 제휴 가산점으로 정렬"""
+
+    def test_rrf_order_and_affiliated_boost(self):
+        scores = reciprocal_rank_fusion([([1, 2], 1.0), ([3, 1], 0.5)], k=60)
+        self.assertAlmostEqual(scores[1], 1 / 61 + 0.5 / 62)
+        self.assertEqual(sorted(scores, key=scores.get, reverse=True), [1, 2, 3])
+
+        for pid, name, affiliated in [(1, '연필', False), (2, '연필깎이', True), (3, '노트', False), (4, '지우개', True)]:
+            Product.objects.create(id=pid, category='필기구', brand='A', name=name, price=1000, if_affiliated=affiliated)
+        generator = mock.Mock()
+        generator.get_query_embedding.return_value = [0.1] * 8
+        generator.search_by_embedding.return_value = [{'id': 3}, {'id': 1}]  # 벡터로만 찾은 노트 포함
+
+        # 문자열: 1(완전일치), 2(접두) / 벡터: 3, 1
+        with self.settings(SEARCH_AFFILIATED_BOOST=0.0):
+            self.assertEqual([p.id for p in hybrid_search('연필', generator=generator)], [1, 3, 2])
+        # 가산점이 RRF 최대값보다 크면 제휴 상품이 먼저
+        with self.settings(SEARCH_AFFILIATED_BOOST=1.0):
+            self.assertEqual([p.id for p in hybrid_search('연필', generator=generator)], [2, 1, 3])
+
+        # 임베딩을 못 만들면 문자열 후보만
+        generator.get_query_embedding.return_value = None
+        with self.settings(SEARCH_AFFILIATED_BOOST=0.0):
+            self.assertEqual([p.id for p in hybrid_search('연필', generator=generator)], [1, 2])
+
+
+class PrimaryDirectRouterTests(SimpleTestCase):
+    """use_direct() 블록 안에서만, 그리고 direct가 설정된 경우에만 직접 연결로 보냄"""
+
+    def setUp(self):
+        self.router = PrimaryDirectRouter()
+
+    def test_default_route_outside_block(self):
+        with mock.patch.object(shop_db, 'has_direct', return_value=True):
+            self.assertIsNone(self.router.db_for_read(Product))
+            self.assertIsNone(self.router.db_for_write(Product))
+
+    def test_direct_route_inside_block(self):
+        with mock.patch.object(shop_db, 'has_direct', return_value=True), shop_db.use_direct():
+            self.assertEqual(self.router.db_for_read(Product), 'direct')
+            self.assertEqual(self.router.db_for_write(Product), 'direct')
+            self.assertEqual(shop_db.direct_alias(), 'direct')
+
+    def test_falls_back_without_direct_alias(self):
+        with mock.patch.object(shop_db, 'has_direct', return_value=False), shop_db.use_direct():
+            self.assertIsNone(self.router.db_for_read(Product))
+            self.assertEqual(shop_db.direct_alias(), 'default')
+
+
+class CatalogReplicaRouterTests(SimpleTestCase):
+    """카탈로그 조회만 복제본으로, 가중치 비율대로 고르게, 쓰기 직후에는 primary로"""
+
+    def setUp(self):
+        self.router = CatalogReplicaRouter()
+        self.replicas = shop_db.ReplicaSet({'replica1': 3, 'replica2': 1})
+        self.replicas._healthy = {'replica1', 'replica2'}
+        patches = [
+            mock.patch.object(shop_db, 'get_replicas', return_value=self.replicas),
+            mock.patch.object(shop_db.ReplicaSet, '_maybe_check'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        shop_db.pin_primary(0)
+
+    def test_smooth_weighted_round_robin(self):
+        picks = [self.replicas.choose() for _ in range(8)]
+        self.assertEqual(picks.count('replica1'), 6)
+        self.assertEqual(picks.count('replica2'), 2)
+        # 같은 복제본이 가중치만큼 연달아 몰리지 않고 섞여서 나옴
+        self.assertNotEqual(picks[:3], ['replica1'] * 3)
+
+    def test_only_catalog_models_use_replicas(self):
+        self.assertIn(self.router.db_for_read(Product), {'replica1', 'replica2'})
+        self.assertIsNone(self.router.db_for_read(Participant))
+
+    def test_unhealthy_replicas_fall_back_to_primary(self):
+        self.replicas._healthy = {'replica2'}
+        self.assertEqual({self.router.db_for_read(Product) for _ in range(4)}, {'replica2'})
+        self.replicas._healthy = set()
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_catalog_write_pins_primary(self):
+        self.router.db_for_write(Product)
+        self.assertIsNone(self.router.db_for_read(Product))
+        shop_db.pin_primary(0)
+        self.assertIsNotNone(self.router.db_for_read(Product))
+
+    def test_direct_block_defers_to_direct_router(self):
+        with mock.patch.object(shop_db, 'has_direct', return_value=True):
+            with shop_db.use_direct():
+                self.assertIsNone(self.router.db_for_read(Product))
+                self.assertEqual(PrimaryDirectRouter().db_for_read(Product), 'direct')
+            with shop_db.use_direct(read_only=True):
+                self.assertIn(shop_db.direct_alias(), {'replica1', 'replica2'})
+                self.assertEqual(PrimaryDirectRouter().db_for_write(Product), 'direct')
+
+
+class WorkerStartupTests(TransactionTestCase):
+    def test_views_import_without_openai_sdk(self):
+        # 새 인터프리터에서 확인 (테스트 러너에는 이미 import돼 있을 수 있음)
+        code = (
+            "import os, sys, django; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings'); "
+            "django.setup(); import shop.views; print('openai' in sys.modules)"
+        )
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), 'False')
+
+    def test_warmup_builds_shared_state(self):
+        seed_products(20, dim=16)
+        vector_index.invalidate_vector_index()
+        timings = warmup.warmup()
+        self.assertEqual(set(timings), set(warmup.PHASES))
+        self.assertEqual(vector_index.get_vector_index().size, 20)
+
+    def test_vector_index_rebuilds_on_bucket_change(self):
+        ids = seed_products(20, dim=16)
+        vector_index.invalidate_vector_index()
+        query = np.ones(16, dtype=np.float32)
+        affiliated = [pid for pid, _ in vector_index.get_vector_index().search(query, 20, affiliated_only=True)]
+        self.assertTrue(affiliated)
+
+        # 임베딩은 그대로 두고 제휴 여부/카테고리만 변경 (관리자 수정, 재임포트)
+        Product.objects.filter(id=affiliated[0]).update(if_affiliated=False)
+        Product.objects.filter(id__in=ids).update(category='새카테고리')
+        bump_catalog_version()
+        vector_index.invalidate_vector_index()
+        index = vector_index.get_vector_index()
+        hits = [pid for pid, _ in index.search(query, 20, affiliated_only=True)]
+        self.assertEqual(hits, [pid for pid in affiliated if pid != affiliated[0]])
+        self.assertEqual(index.count(categories=['새카테고리']), 20)
+
+
+class MetricsEndpointTests(TransactionTestCase):
+    """/metrics: 운영에서는 METRICS_TOKEN 없이는 열리지 않음"""
+
+    def test_requires_token_in_production(self):
+        with self.settings(DEBUG=False, METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=False, METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer nope').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'shop_', response.content)
+
+
+class ResilienceTests(SimpleTestCase):
+    def test_breaker_opens_then_probes_once(self):
+        breaker = resilience.CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+        self.enterContext(self.assertLogs(resilience.logger, 'WARNING'))
+        with mock.patch.object(resilience.time, 'monotonic', return_value=100.0):
+            breaker.record_failure()
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, breaker.OPEN)
+            self.assertFalse(breaker.allow())
+        with mock.patch.object(resilience.time, 'monotonic', return_value=131.0):
+            self.assertTrue(breaker.allow())  # 반열림: 시험 호출 1건
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, breaker.OPEN)
+        with mock.patch.object(resilience.time, 'monotonic', return_value=162.0):
+            self.assertTrue(breaker.allow())
+            breaker.record_success()
+            self.assertEqual(breaker.state, breaker.CLOSED)
+
+    def test_hedged_falls_back_on_timeout_and_degraded(self):
+        result, outcome = resilience.hedged('test', lambda: time.sleep(0.5) or ['slow'], lambda: ['sql'], 0.05)
+        self.assertEqual((result, outcome), (['sql'], 'timeout'))
+
+        def no_embedding():
+            resilience.mark_degraded()
+            return []
+
+        self.assertEqual(resilience.hedged('test', no_embedding, lambda: ['sql'], 1), (['sql'], 'degraded'))
+        self.assertEqual(resilience.hedged('test', lambda: [], lambda: ['sql'], 1), ([], 'primary'))
+
+    def test_embedding_skipped_when_budget_spent(self):
+        from .utils.embeddings import OpenAIEmbeddingGenerator
+
+        gen = OpenAIEmbeddingGenerator()
+        gen._client = mock.Mock()
+        with resilience.latency_budget(0):
+            self.assertIsNone(gen.get_embedding('연필'))
+        gen._client.embeddings.create.assert_not_called()
+
+
+class CatalogSyncTests(TransactionTestCase):
+    """임포트가 바꾼 상품/삭제한 상품만 ?since= 응답에 포함"""
+
+    HEADER = 'product_id,classification,category,brand,name,price,img,if_affilated,reviews\n'
+
+    def _import(self, rows, truncate=False):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as f:
+            f.write(self.HEADER + ''.join(rows))
+        self.addCleanup(os.remove, f.name)
+        call_command('import_csv_products', file=f.name, truncate=truncate, stdout=io.StringIO())
+
+    def _get(self, **params):
+        response = self.client.get(reverse('api_catalog'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_delta_since_version(self):
+        pen = '1,문구,필기구,A,연필,1000,https://example.com/1.jpg,TRUE,\n'
+        note = '2,문구,노트,B,노트,2000,https://example.com/2.jpg,FALSE,\n'
+        eraser = '3,문구,필기구,C,지우개,500,https://example.com/3.jpg,FALSE,\n'
+        self._import([pen, note, eraser])
+        full = self._get(fields='name,price')
+        self.assertTrue(full['full'])
+        self.assertEqual(full['fields'], ['id', 'name', 'price'])
+        self.assertEqual(full['products'], [[1, '연필', 1000], [2, '노트', 2000], [3, '지우개', 500]])
+
+        self._import([pen, note.replace('2000', '2500')], truncate=True)
+        delta = self._get(since=full['version'], fields='price')
+        self.assertGreater(delta['version'], full['version'])
+        self.assertEqual(delta['products'], [[1, 1000], [2, 2500]])  # truncate로 다시 만든 상품 포함
+        self.assertEqual(delta['deleted'], [3])
+
+        self._import([pen, note.replace('2000', '2500')])
+        self.assertEqual(self._get(since=delta['version'])['products'], [])  # 값이 같으면 버전 유지
+
+    def test_admin_edits_publish_new_version(self):
+        self._import(['1,문구,필기구,A,연필,1000,,TRUE,\n', '2,문구,노트,B,노트,2000,,FALSE,\n'])
+        before = self._get(fields='price')
+        pen = Product.objects.get(id=1)
+        pen.price, pen.if_affiliated = 1200, False  # 임베딩 텍스트는 그대로
+        pen.save()
+        delta = self._get(since=before['version'], fields='price,if_affiliated')
+        self.assertGreater(delta['version'], before['version'])
+        self.assertEqual(delta['products'], [[1, 1200, False]])
+
+        Product.objects.get(id=2).delete()
+        deleted = self._get(since=delta['version'])
+        self.assertEqual((deleted['products'], deleted['deleted']), ([], [2]))
+
+    def test_rejects_unknown_fields(self):
+        response = self.client.get(reverse('api_catalog'), {'fields': 'reviews'})
+        self.assertEqual(response.status_code, 400)
+
+
+class EventBufferTests(TransactionTestCase):
+    """이벤트 링 버퍼: 용량 초과 시 오래된 것부터 버리고, 저장 실패분은 재시도 후 문제 있는 이벤트만 버림"""
+
+    def setUp(self):
+        # 플러셔 스레드 없이 flush()를 직접 호출
+        self.enterContext(mock.patch.object(events.EventBuffer, '_ensure_thread'))
+
+    def _event(self, product_id, participant_id=None, rank=None):
+        return {'participant_id': participant_id, 'kind': 'cart_add', 'product_id': product_id, 'source': 'test',
+                'rank': rank}
+
+    def test_overflow_and_flush(self):
+        buffer = events.EventBuffer(capacity=3, batch_size=100, interval=60)
+        for pid in range(1, 6):
+            buffer.append(self._event(pid))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(sorted(Event.objects.values_list('product_id', flat=True)), [3, 4, 5])
+
+    def test_stale_participant_is_cleared(self):
+        buffer = events.EventBuffer(capacity=10, batch_size=100, interval=60)
+        participant = Participant.objects.create(name='참여자', student_id='S1', phone='010')
+        buffer.append(self._event(1, participant_id=participant.id))
+        buffer.append(self._event(2, participant_id=999))  # 지워진 참여자
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(dict(Event.objects.values_list('product_id', 'participant_id')), {1: participant.id, 2: None})
+
+    def test_failed_batch_drops_only_bad_rows(self):
+        buffer = events.EventBuffer(capacity=10, batch_size=100, interval=60)
+        buffer.append(self._event(1))
+        buffer.append(self._event(2, rank=-1))  # 컬럼 범위 밖 → 배치 저장 실패
+        buffer.append(self._event(3))
+        with self.assertLogs(events.logger, 'ERROR'):
+            for attempt in range(1, events.MAX_FLUSH_RETRIES):
+                self.assertEqual(buffer.flush(), 0)
+                self.assertEqual(len(buffer), 3)
+            self.assertEqual(buffer.flush(), 2)  # 마지막 시도는 한 건씩 저장
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(sorted(Event.objects.values_list('product_id', flat=True)), [1, 3])
+
+    def test_api_rejects_out_of_range_values(self):
+        url = reverse('api_events')
+        for params in [{'rank': '-1'}, {'rank': '0'}, {'rank': '40000'}, {'product_id': str(2 ** 31)},
+                       {'product_id': '0'}, {'rank': 'x'}]:
+            response = self.client.post(url, {'kind': 'reco_click', 'product_id': '1', **params})
+            self.assertEqual(response.status_code, 400, params)
+        response = self.client.post(url, {'kind': 'reco_click', 'product_id': '1', 'rank': '3'})
+        self.assertEqual(response.status_code, 200)
+        flush_events()
+        self.assertEqual(list(Event.objects.values_list('kind', 'rank')), [('reco_click', 3)])
+
+
+class CatalogHttpCacheTests(TransactionTestCase):
+    """카탈로그 파생 API: 같은 버전이면 If-None-Match에 304, 버전/회전 구간이 바뀌면 새 ETag"""
+
+    def setUp(self):
+        Product.objects.create(name='연필', category='필기구', brand='A', price=1000)
+        bump_catalog_version()
+
+    def test_not_modified_round_trip(self):
+        url = reverse('api_search_suggest')
+        first = self.client.get(url, {'q': '연'})
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('public', first['Cache-Control'])
+        self.assertNotIn('Set-Cookie', str(first.cookies))
+        with CaptureQueriesContext(connection) as queries:
+            again = self.client.get(url, {'q': '연'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertFalse([q for q in queries.captured_queries if 'shop_product' in q['sql']])  # 뷰 실행 안 함
+        self.assertNotEqual(self.client.get(url, {'q': '노'})['ETag'], first['ETag'])  # 쿼리 파라미터별
+
+        bump_catalog_version()
+        changed = self.client.get(url, {'q': '연'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_trending_max_age_ends_with_rotation(self):
+        url = reverse('api_search_trending')
+        rotate = settings.TRENDING_ROTATE_SECONDS  # 데코레이터가 임포트 때 읽은 값
+        bucket_end = rotate * 100
+        with self.settings(API_CACHE_MAX_AGE=rotate * 10), \
+                mock.patch('shop.utils.http_cache.time.time', return_value=bucket_end - 10):
+            first = self.client.get(url)
+            self.assertIn('max-age=10', first['Cache-Control'])  # 구간 끝까지 남은 시간
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        with mock.patch('shop.utils.http_cache.time.time', return_value=bucket_end):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+
+class FragmentCacheTests(TransactionTestCase):
+    """상품 카드/상세 조각: 같은 카탈로그 버전이면 캐시에서 렌더링(쿼리 없음), 버전이 오르면 다시 렌더링"""
+
+    def setUp(self):
+        cache.clear()
+        self.pen = Product.objects.create(name='연필', classification='생활용품', category='필기구', brand='A',
+                                          price=1000, reviews=json.dumps([{'text': '좋아요'}]))
+        Product.objects.create(name='볼펜', classification='생활용품', category='필기구', brand='B', price=1500)
+        bump_catalog_version()
+        session = self.client.session
+        session['experiment_consent'] = True
+        session.save()
+
+    def _render(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode(), [q['sql'] for q in queries.captured_queries]
+
+    def test_detail_fragment_skips_related_queries(self):
+        url = reverse('product_detail', args=[self.pen.id])
+        first, first_queries = self._render(url)
+        self.assertIn('볼펜', first)  # 같은 카테고리 상품으로 채운 관련 상품
+        self.assertTrue([q for q in first_queries if 'shop_productneighbor' in q])
+
+        Product.objects.filter(id=self.pen.id).update(brand='바뀐브랜드')  # signal 없이 변경 → 버전 그대로
+        second, second_queries = self._render(url)
+        self.assertFalse([q for q in second_queries if 'shop_productneighbor' in q])
+        self.assertLess(len(second_queries), len(first_queries))
+        self.assertNotIn('바뀐브랜드', second)  # 조각은 캐시에서
+
+        bump_catalog_version()
+        third, third_queries = self._render(url)
+        self.assertEqual(len(third_queries), len(first_queries))
+        self.assertIn('바뀐브랜드', third)
+
+    def test_product_cards_follow_catalog_version(self):
+        url = reverse('product_list')
+        first, first_queries = self._render(url)
+        self.assertIn('연필', first)
+
+        Product.objects.filter(id=self.pen.id).update(name='새 연필')
+        second, second_queries = self._render(url)
+        self.assertLessEqual(len(second_queries), len(first_queries))  # 캐시된 카드는 쿼리를 더하지 않음
+        self.assertNotIn('새 연필', second)
+
+        bump_catalog_version()
+        self.assertIn('새 연필', self._render(url)[0])
+
+
+class JobQueueTests(TransactionTestCase):
+    """상품 저장 → 재임베딩 작업 등록(중복 없음) → run_worker가 임베딩과 이웃 갱신 처리"""
+
+    def _run_worker(self):
+        call_command('run_worker', once=True, concurrency=1, poll_interval=0.1, stdout=io.StringIO())
+
+    def test_save_enqueues_and_worker_embeds(self):
+        product = Product.objects.create(name='연필', category='필기구', price=1000)
+        product.name = '연필 세트'
+        product.save()
+        product.save(update_fields=['embedding_text_hash'])  # 임베딩 결과 저장은 다시 등록하지 않음
+        self.assertEqual(list(Job.objects.values_list('key', 'status')), [(f'embed_product:{product.id}', 'queued')])
+
+        with stub_embeddings(dim=8), self.settings(JOB_NEIGHBOR_DELAY_SECONDS=0):
+            self._run_worker()
+            product.refresh_from_db()
+            self.assertEqual(len(product.name_embedding), 8)
+            self.assertTrue(product.embedding_text_hash)
+            self.assertEqual(
+                sorted(Job.objects.values_list('kind', 'status')),
+                [('embed_product', 'done'), ('refresh_neighbors', 'done')],
+            )
+
+            # 내용이 그대로면 다시 임베딩하지 않음 (이웃 갱신도 등록 안 함)
+            product.save()
+            self._run_worker()
+            self.assertEqual(Job.objects.filter(kind='refresh_neighbors').count(), 1)
+
+    def test_claim_checks_running_count_when_claiming(self):
+        jobs.enqueue(jobs.PURGE_SESSIONS, key='purge:a')
+        jobs.enqueue(jobs.PURGE_SESSIONS, key='purge:b')
+        with self.settings(JOB_CONCURRENCY={jobs.PURGE_SESSIONS: 1}):
+            first = jobs.claim('w1')
+            self.assertEqual(first.key, 'purge:a')
+            # 다른 워커가 방금 가져간 작업을 미리 센 개수에서 못 본 경우에도 UPDATE에서 막힘
+            with mock.patch.object(jobs, '_count_by_kind', return_value={}):
+                self.assertIsNone(jobs.claim('w2'))
+            Job.objects.filter(id=first.id).update(status='done')
+            self.assertEqual(jobs.claim('w2').key, 'purge:b')
+
+    def test_failure_retries_with_backoff(self):
+        product = Product.objects.create(name='노트', category='노트', price=2000)
+        failing = mock.patch.object(OpenAIEmbeddingGenerator, 'get_embedding', lambda self, text: None)
+        with failing, self.settings(JOB_RETRY_BASE_SECONDS=60, JOB_MAX_ATTEMPTS=2), self.assertLogs(jobs.logger):
+            self._run_worker()
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts), ('queued', 1))
+            self.assertGreater((job.run_after - job.created_at).total_seconds(), 50)
+            self.assertIn('EmbeddingUnavailable', job.last_error)
+
+            Job.objects.filter(id=job.id).update(run_after=job.created_at)
+            self._run_worker()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNone(Product.objects.get(id=product.id).name_embedding)
+
+
+class NeighborTableTests(TransactionTestCase):
+    """이웃 테이블: 블록 단위 상위 N(전체/제휴 전용), 바뀐 상품 기준 증분 갱신, 이웃 합산 추천, 관련 상품 채우기"""
+
+    # 이름: (임베딩, 제휴 여부, 카테고리) — 노트/필기구 묶음은 앞 두 축, 다과류 묶음은 뒤 두 축에만 값이 있음
+    SPECS = {
+        'a': ([1.0, 0.0, 0.0, 0.0], False, '노트'),
+        'b': ([0.9, 0.1, 0.0, 0.0], False, '노트'),
+        'c': ([0.6, 0.4, 0.0, 0.0], True, '노트'),
+        'd': ([0.1, 0.9, 0.0, 0.0], True, '필기구'),
+        'e': ([0.0, 1.0, 0.0, 0.0], False, '필기구'),
+        'f': ([0.0, 0.0, 1.0, 0.0], False, '과자'),
+        'g': ([0.0, 0.0, 1.0, 0.1], False, '과자'),
+        'h': ([0.0, 0.0, 1.0, 0.3], False, '과자'),
+    }
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.products = {
+            name: Product.objects.create(
+                name=name, category=category, brand='A', price=1000, if_affiliated=affiliated,
+                name_embedding=vec, embedding_updated_at=now,
+            )
+            for name, (vec, affiliated, category) in self.SPECS.items()
+        }
+        self.names = {p.id: name for name, p in self.products.items()}
+
+    def _lists(self, affiliated_only=False):
+        lists = {}
+        rows = ProductNeighbor.objects.filter(affiliated_only=affiliated_only).order_by('product_id', 'rank')
+        for product_id, neighbor_id, rank in rows.values_list('product_id', 'neighbor_id', 'rank'):
+            lists.setdefault(self.names[product_id], []).append(self.names[neighbor_id])
+            self.assertEqual(rank, len(lists[self.names[product_id]]))
+        return lists
+
+    def test_rebuild_ranks_and_affiliated_lists(self):
+        self.assertEqual(rebuild_neighbors(top_n=2, block_size=3), len(self.SPECS))
+        lists = self._lists()
+        self.assertEqual({name: lists[name] for name in 'abcde'}, {
+            'a': ['b', 'c'], 'b': ['a', 'c'], 'c': ['b', 'a'], 'd': ['e', 'c'], 'e': ['d', 'c'],
+        })
+        self.assertEqual({name: lists[name] for name in 'fgh'}, {'f': ['g', 'h'], 'g': ['f', 'h'], 'h': ['g', 'f']})
+        affiliated = self._lists(affiliated_only=True)
+        self.assertEqual({name: affiliated[name] for name in 'abcde'}, {
+            'a': ['c', 'd'], 'b': ['c', 'd'], 'c': ['d'], 'd': ['c'], 'e': ['d', 'c'],
+        })
+
+        a = self.products['a']
+        self.assertEqual([p.name for p in related_products(a.id)], ['b', 'c'])
+        self.assertEqual([p.name for p in related_products(a.id, affiliated_only=True)], ['c', 'd'])
+
+    def test_recommend_sums_neighbor_scores(self):
+        rebuild_neighbors(top_n=2)
+        cart = [self.products['a'].id, self.products['b'].id]
+        recommended = recommend_from_neighbors(cart, use_categories=False)
+        self.assertEqual([r['name'] for r in recommended], ['c', 'd'])
+        self.assertGreater(recommended[0]['similarity_score'], recommended[1]['similarity_score'])
+        # 카테고리 제한: 장바구니(노트)와 같은 카테고리만
+        self.assertEqual([r['name'] for r in recommend_from_neighbors(cart)], ['c'])
+        self.assertEqual([r['name'] for r in recommend_from_neighbors(cart, affiliated_only=False)], ['c'])
+
+    def test_refresh_recomputes_only_affected_lists(self):
+        rebuild_neighbors(top_n=2, include_affiliated=False)
+        before = dict(ProductNeighbor.objects.values_list('product_id', 'computed_at').distinct())
+        Product.objects.filter(id=self.products['b'].id).update(
+            name_embedding=[0.5, 0.5, 0.0, 0.0], embedding_updated_at=timezone.now(),
+        )
+
+        refreshed = refresh_neighbors(top_n=2, include_affiliated=False)
+        self.assertLess(refreshed, len(self.SPECS))
+        after = dict(ProductNeighbor.objects.values_list('product_id', 'computed_at').distinct())
+        for name in 'fgh':  # 바뀐 상품과 무관한 묶음은 다시 쓰지 않음
+            self.assertEqual(after[self.products[name].id], before[self.products[name].id])
+        self.assertNotEqual(after[self.products['b'].id], before[self.products['b'].id])
+
+        incremental = self._lists()
+        rebuild_neighbors(top_n=2, include_affiliated=False)
+        self.assertEqual(incremental, self._lists())
+        self.assertEqual(incremental['b'], ['c', 'd'])
+
+    def test_detail_tops_up_related_from_category(self):
+        rebuild_neighbors(top_n=2)
+        Product.objects.create(name='i', category='노트', brand='A', price=1000)
+        Product.objects.create(name='j', category='노트', brand='A', price=1000)
+        session = self.client.session
+        session['experiment_consent'] = True
+        session.save()
+
+        response = self.client.get(reverse('product_detail', args=[self.products['a'].id]))
+        related = [p.name for p in response.context['related_products']]
+        self.assertEqual(related[:2], ['b', 'c'])  # 이웃 목록 먼저
+        self.assertEqual(sorted(related[2:]), ['i', 'j'])  # 모자란 자리는 같은 카테고리에서
+
+
+class SessionPurgeTests(TransactionTestCase):
+    """만료 세션은 배치로 삭제되고 참여자 장바구니는 ArchivedCart로 남아 내보내기에 쓰임"""
+
+    def _session(self, data, expired):
+        store = SessionStore()
+        store.update(data)
+        store.set_expiry(-60 if expired else 3600)
+        store.create()
+        return store.session_key
+
+    def test_purge_archives_participant_carts(self):
+        product = Product.objects.create(name='연필', category='필기구', price=1000)
+        participant = Participant.objects.create(name='참여자', student_id='S1', phone='010')
+        key = self._session({'participant_id': participant.id, 'cart': {str(product.id): 2}}, expired=True)
+        Participant.objects.filter(id=participant.id).update(session_key=key)
+        self._session({'cart': {}}, expired=True)  # 동의 전 세션
+        self._session({'participant_id': 999, 'cart': {'1': 1}}, expired=True)  # 참여자 행이 없음
+        live = self._session({'participant_id': participant.id, 'cart': {}}, expired=False)
+
+        out = io.StringIO()
+        call_command('purge_sessions', batch_size=2, sleep=0, stdout=out)
+        self.assertIn('삭제: 3개 (2배치', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [live])
+        cart = ArchivedCart.objects.get()
+        self.assertEqual((cart.participant_id, cart.items, cart.quantity), (participant.id, {str(product.id): 2}, 2))
+
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'participants.jsonl')
+        call_command('export_experiment', format='jsonl', output=path, stdout=io.StringIO())
+        with open(path, encoding='utf-8') as f:
+            record = json.loads(f.read())
+        self.assertEqual((record['cart_source'], record['cart_total']), ('archived', 2000))
+
+
+class ExportExperimentTests(TransactionTestCase):
+    """export_experiment: 기간 필터, 개인정보 제외, CSV/JSONL(.gz) 출력과 표준출력"""
+
+    def setUp(self):
+        self.pen = Product.objects.create(name='연필', category='필기구', brand='A', price=1000, if_affiliated=True)
+        self.participant = Participant.objects.create(name='참여자', student_id='S1', phone='010')
+        ArchivedCart.objects.create(participant=self.participant, items={str(self.pen.id): 3}, quantity=3,
+                                    session_expired_at=timezone.now())
+        old = Participant.objects.create(name='이전', student_id='S0', phone='010')
+        Participant.objects.filter(id=old.id).update(created_at='2020-01-01T00:00:00Z')
+
+    def test_csv_gzip_and_stdout(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'participants.csv.gz')
+        call_command('export_experiment', output=path, since='2021-01-01', no_pii=True, stdout=io.StringIO())
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertNotIn('name', rows[0])
+        self.assertEqual((rows[0]['cart_source'], rows[0]['cart_quantity'], rows[0]['cart_total']),
+                         ('archived', '3', '3000'))
+        self.assertEqual(json.loads(rows[0]['cart_items'])[0]['if_affiliated'], True)
+
+        out = io.StringIO()
+        call_command('export_experiment', format='jsonl', until='2020-01-01', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(r['name'], r['cart_source']) for r in records], [('이전', 'missing')])
+        with self.assertRaises(CommandError):
+            call_command('export_experiment', output='-', gzip=True, stdout=io.StringIO())
+
+
+class CartPersistenceTests(TransactionTestCase):
+    """장바구니는 CartItem에 쌓이고(세션에는 cart_id만) cart_stats가 SQL 집계로 담기 비율을 계산"""
+
+    def _join(self, name):
+        self.client.post(reverse('consent_form'), {
+            'consent_research': 'on', 'consent_data': 'on', 'consent_participation': 'on',
+            'name': name, 'student_id': name, 'phone': '010',
+        })
+        return Participant.objects.get(name=name)
+
+    def tearDown(self):
+        flush_events()  # 참여자 행이 지워지기 전에 담기 이벤트 저장 (다음 테스트의 버퍼에 남지 않게)
+
+    def test_cart_rows_and_add_rates(self):
+        pen = Product.objects.create(name='볼펜', category='필기구', price=1000, if_affiliated=True)
+        note = Product.objects.create(name='노트', category='노트', price=2000)
+        Participant.objects.create(name='담지 않음', student_id='S0', phone='010')
+        first = self._join('S1')
+        self.client.post(reverse('add_to_cart'), {'product_id': pen.id, 'source': 'ai_reco'})
+        self.client.post(reverse('add_to_cart'), {'product_id': pen.id, 'quantity': 2})
+        response = self.client.post(reverse('add_to_cart'), {'product_id': note.id, 'source': 'product_list'})
+        self.assertEqual(response.json()['cart'], {str(pen.id): 3, str(note.id): 1})
+        summary = self.client.post(reverse('update_cart'), {'product_id': note.id, 'quantity': 0}).json()['summary']
+        self.assertEqual((summary['count'], summary['subtotal']), (3, 3000))
+        self.assertEqual(set(self.client.session.keys()), {'experiment_consent', 'participant_id', 'cart_id'})
+        self.assertEqual(
+            sorted((i.product_id, i.quantity, i.source, i.affiliated, i.removed_at is None)
+                   for i in CartItem.objects.all()),
+            sorted([(pen.id, 3, 'ai_reco', True, True), (note.id, 1, 'product_list', False, False)]),
+        )
+
+        self._join('S2')
+        self.client.post(reverse('add_to_cart'), {'product_id': pen.id, 'source': 'ai_reco'})
+        self.client.post(reverse('clear_cart'))
+        self.assertEqual(self.client.get(reverse('cart_view')).context['cart_quantities'], {})
+
+        out = io.StringIO()
+        call_command('cart_stats', format='json', stdout=out)
+        stats = json.loads(out.getvalue())
+        self.assertEqual((stats['participants'], stats['overall']['add_rate']), (3, 0.6667))
+        top = stats['products'][0]
+        self.assertEqual((top['product_id'], top['participants'], top['kept_participants'], top['quantity']),
+                         (pen.id, 2, 1, 3))
+        self.assertEqual(
+            [(a['source'], a['affiliated'], a['add_rate'], a['keep_rate']) for a in stats['arms']],
+            [('ai_reco', True, 0.6667, 0.3333), ('product_list', False, 0.3333, 0.0)],
+        )
+
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'participants.jsonl')
+        call_command('export_experiment', format='jsonl', output=path, stdout=io.StringIO())
+        with open(path, encoding='utf-8') as f:
+            records = {r['id']: r for r in map(json.loads, f)}
+        self.assertEqual((records[first.id]['cart_source'], records[first.id]['cart_total']), ('cart', 3000))
+
+    def test_quantity_is_clamped(self):
+        pen = Product.objects.create(name='볼펜', category='필기구', price=1000)
+        self._join('S1')
+        huge = str(2 ** 40)
+        self.client.post(reverse('add_to_cart'), {'product_id': pen.id, 'quantity': huge})
+        response = self.client.post(reverse('add_to_cart'), {'product_id': pen.id, 'quantity': '5'})
+        self.assertEqual(response.json()['cart'], {str(pen.id): carts.MAX_QUANTITY})  # 누적도 상한에서 멈춤
+        response = self.client.post(reverse('update_cart'), {'product_id': pen.id, 'quantity': huge})
+        self.assertEqual(response.json()['cart'], {str(pen.id): carts.MAX_QUANTITY})
+        response = self.client.post(reverse('update_cart'), {'product_id': pen.id, 'quantity': '3'})
+        self.assertEqual(response.json()['cart'], {str(pen.id): 3})
+
+
+class FacetFilterTests(TransactionTestCase):
+    """패싯 결과/건수는 인메모리 비트셋으로 계산하고 상품 테이블은 현재 페이지만 조회"""
+
+    def setUp(self):
+        rows = [
+            ('A', 3000, True), ('A', 12000, False), ('B', 8000, True), ('B', 60000, True), ('C', 4000, False),
+        ]
+        for i, (brand, price, affiliated) in enumerate(rows, start=1):
+            Product.objects.create(id=i, classification='생활용품', category='필기구', brand=brand,
+                                   name=f'{brand} 펜 {i}', price=price, if_affiliated=affiliated)
+        Product.objects.create(id=9, classification='다과류', category='과자', brand='A', name='A 과자', price=2000)
+        bump_catalog_version()
+        session = self.client.session
+        session['experiment_consent'] = True
+        session.save()
+
+    def _list(self, **params):
+        response = self.client.get(reverse('product_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_facets_intersect_and_count(self):
+        self._list()  # 인덱스 구성
+        with CaptureQueriesContext(connection) as queries:
+            response = self._list(brand=['A', 'B'], price='0-5000', aff='1')
+        self.assertEqual([p.id for p in response.context['products']], [1])
+        self.assertEqual(sum('shop_product' in q['sql'] for q in queries.captured_queries), 1)
+
+        facets = {g['name']: {o['label']: o['count'] for o in g['options']} for g in response.context['facets']}
+        self.assertEqual(facets['brand'], {'A': 1, 'B': 0})  # 가격대/제휴는 유지하고 브랜드만 바꿨을 때 (선택값은 0이어도 표시)
+        self.assertEqual(facets['price'], {'5,000원 미만': 1, '5,000~10,000원': 1, '50,000원 이상': 1})
+        self.assertEqual(response.context['categories'], ['필기구'])
+
+        # 검색어는 제휴 우선 정렬, 페이지 나눔
+        with self.settings(PRODUCT_LIST_PAGE_SIZE=2):
+            response = self._list(q='펜', page=2)
+        self.assertEqual([p.id for p in response.context['products']], [4, 2])
+
+    def test_hybrid_counts_follow_ranked_results(self):
+        # 벡터로만 찾은 상품(9, 이름에 '펜' 없음) 포함, 문자열로 맞는 1/2/4/5는 순위 밖
+        ranked = list(Product.objects.in_bulk([9, 3]).values())
+        with mock.patch('shop.views.hybrid_search', return_value=ranked):
+            response = self._list(q='펜', mode='hybrid', brand='A')
+        self.assertEqual([p.id for p in response.context['products']], [9])
+        facets = {g['name']: {o['label']: o['count'] for o in g['options']} for g in response.context['facets']}
+        self.assertEqual(facets['brand'], {'A': 1, 'B': 1})
+        self.assertEqual(facets['price'], {'5,000원 미만': 1})
+
+    def test_rebuilds_when_catalog_version_changes(self):
+        self.assertEqual(self._list(brand='C').context['page_obj'].paginator.count, 1)
+        Product.objects.create(id=6, classification='생활용품', category='필기구', brand='C', name='C 펜', price=100)
+        bump_catalog_version()
+        self.assertEqual(self._list(brand='C').context['page_obj'].paginator.count, 2)
+
+
+class QueryPlanTests(TransactionTestCase):
+    """스토어프런트 쿼리가 상품 테이블을 순차/전체 인덱스 스캔하지 않는지 (SQLite/PostgreSQL 실행 계획)"""
+
+    def test_storefront_queries_use_indexes(self):
+        if connection.vendor not in query_plans.SUPPORTED_VENDORS:
+            self.skipTest(f'{connection.vendor}: 실행 계획 검사 미지원')
+        for name, queryset in query_plans.storefront_queries().items():
+            with self.subTest(query=name):
+                plan = query_plans.explain(queryset)
+                self.assertEqual(query_plans.full_scans(plan, connection.vendor), [], f'{name}\n{plan}')
+
+    def test_home_reads_categories_from_facet_index(self):
+        Product.objects.create(name='연필', category='필기구', price=1000, if_affiliated=True)
+        session = self.client.session
+        session['experiment_consent'] = True
+        session.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['categories'], ['필기구'])
+        product_queries = [q['sql'] for q in queries.captured_queries if 'shop_product' in q['sql']]
+        self.assertFalse([sql for sql in product_queries if 'DISTINCT' in sql])
+
+
+class StaticBundleTests(TransactionTestCase):
+    """페이지 CSS/JS는 최소화한 정적 번들로 제공하고 HTML에는 인라인으로 넣지 않음"""
+
+    def setUp(self):
+        self.enterContext(self.settings(STATIC_BUNDLE_DIR=self.enterContext(tempfile.TemporaryDirectory())))
+
+    def test_bundles_are_minified(self):
+        for name, (source_bytes, bundle_bytes) in bundles.build_all().items():
+            self.assertLess(bundle_bytes, source_bytes, name)
+        css = bundles.build('shop/bundles/cart.css').read_text(encoding='utf-8')
+        self.assertTrue(css.startswith('*{margin:0;padding:0;box-sizing:border-box}'))
+        self.assertNotIn('/*', css)
+        js = bundles.bundle_path('shop/bundles/cart.js').read_text(encoding='utf-8')
+        self.assertEqual(js.count('function getCookie'), 1)
+        self.assertNotIn('{%', js)
+        # 개발 서버/collectstatic은 파인더로 번들을 찾음
+        self.assertEqual(finders.find('shop/bundles/cart.js'), str(bundles.bundle_path('shop/bundles/cart.js')))
+
+    def _assert_bundled(self, page, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '<style>')
+        self.assertContains(response, f'/static/shop/bundles/{page}.css')
+        self.assertContains(response, f'/static/shop/bundles/{page}.js')
+
+    def test_pages_reference_bundles(self):
+        self._assert_bundled('consent_form', self.client.get(reverse('consent_form')))
+        product = Product.objects.create(classification='생활용품', category='필기구', brand='A', name='펜', price=1000)
+        session = self.client.session
+        session['experiment_consent'] = True
+        session.save()
+        pages = {
+            'home': reverse('home'), 'product_list': reverse('product_list'),
+            'product_detail': reverse('product_detail', args=[product.id]), 'cart': reverse('cart_view'),
+        }
+        for page, url in pages.items():
+            with self.subTest(page=page):
+                self._assert_bundled(page, self.client.get(url))
+
+
+class RequestProfilingTests(TransactionTestCase):
+    """서명 헤더가 있는 요청만 프로파일을 저장하고 관리자 페이지에서 조회"""
+
+    def setUp(self):
+        self.profile_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(PROFILE_DIR=self.profile_dir, PROFILE_MAX_FILES=2))
+        Product.objects.create(name='연필', category='필기구', price=1000)
+        session = self.client.session
+        session.update({'experiment_consent': True, 'cart': {'1': 1}})
+        session.save()
+
+    def test_signed_header_profiles_request(self):
+        self.assertNotIn('X-Shop-Profile-Id', self.client.get(reverse('cart_view')))
+        forged = self.client.get(reverse('cart_view'), HTTP_X_SHOP_PROFILE='profile:forged:sig')
+        self.assertNotIn('X-Shop-Profile-Id', forged)
+
+        for _ in range(3):
+            response = self.client.get(reverse('cart_view'), HTTP_X_SHOP_PROFILE=profiling.make_token())
+        name = response['X-Shop-Profile-Id']
+        data = profiling.load_profile(name)
+        self.assertEqual((data['view'], data['trigger'], data['status']), ('cart_view', 'header', 200))
+        self.assertTrue(any('shop_product' in q['sql'] for q in data['queries']))
+        self.assertEqual(len(profiling.list_profiles()), 2)  # PROFILE_MAX_FILES 초과분 삭제
+
+        data['stacks'] = {'main;view;query': 3, 'main;view': 1}
+        self.assertEqual(
+            [(r['depth'], r['label'], r['width']) for r in profiling.flame_rects(data['stacks'])],
+            [(0, 'main', 100.0), (1, 'view', 100.0), (2, 'query', 75.0)],
+        )
+
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        listing = self.client.get(reverse('admin_profiles'))
+        self.assertContains(listing, name)
+        self.assertContains(self.client.get(reverse('admin_profile_detail', args=[name])), 'shop_product')
+        self.assertEqual(self.client.get(reverse('admin_profile_detail', args=['..'])).status_code, 404)
+        staff = self.client.get(reverse('cart_view'), {'_profile': '1'})
+        self.assertEqual(profiling.load_profile(staff['X-Shop-Profile-Id'])['trigger'], 'staff')
+
+
+class ShardedVectorSearchTests(SimpleTestCase):
+    """프로세스 샤드 scatter-gather 결과는 단일 인덱스와 같고, 샤드 프로세스가 실패하면 부모에서 계산"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        buckets = {}
+        for pid in rng.permutation(np.arange(1, 301)):
+            key = (['생활용품', '다과류', '전자기기'][pid % 3], f'카테고리{pid % 5}', bool(pid % 2))
+            buckets.setdefault(key, []).append(int(pid))
+        partitions = {}
+        for key, ids in buckets.items():
+            ids = np.sort(np.asarray(ids, dtype=np.int64))
+            names, descs = rng.normal(size=(2, len(ids), 16)).astype(np.float32)
+            names /= np.linalg.norm(names, axis=1, keepdims=True)
+            descs /= np.linalg.norm(descs, axis=1, keepdims=True)
+            partitions[key] = (ids, names, descs)
+        self.index = vector_index.PartitionedVectorIndex.from_partitions(partitions)
+        self.queries = rng.normal(size=(4, 16)).astype(np.float32)
+
+    def _sharded(self, by):
+        sharded = vector_shards.ShardedVectorIndex.from_index(self.index, 3, by)
+        self.addCleanup(sharded.close)
+        return sharded
+
+    def assertSameHits(self, hits, expected):
+        # 행렬 크기가 다르면 BLAS 합산 순서가 달라 점수 끝자리만 다를 수 있음
+        self.assertEqual([pid for pid, _ in hits], [pid for pid, _ in expected])
+        np.testing.assert_allclose([s for _, s in hits], [s for _, s in expected], rtol=1e-5)
+
+    def test_matches_single_index(self):
+        cases = [
+            {}, {'affiliated_only': True}, {'categories': ['카테고리1', '카테고리2']},
+            {'classification': '다과류', 'exclude_ids': [3, 6, 9]},
+        ]
+        for by in vector_shards.SHARD_BY:
+            sharded = self._sharded(by)
+            self.assertEqual(sharded.size, self.index.size)
+            for case in cases:
+                with self.subTest(by=by, **case):
+                    self.assertSameHits(sharded.search(self.queries[0], 7, **case),
+                                        self.index.search(self.queries[0], 7, **case))
+                    batch = sharded.search_batch(self.queries, 5, **case)
+                    for hits, expected in zip(batch, self.index.search_batch(self.queries, 5, **case), strict=True):
+                        self.assertSameHits(hits, expected)
+            self.assertSameHits(
+                sharded.search(self.queries[1], 5, description_query=self.queries[2], weights=(0.6, 0.4)),
+                self.index.search(self.queries[1], 5, description_query=self.queries[2], weights=(0.6, 0.4)),
+            )
+        # 분류 단위로 나누면 분류 필터 검색은 한 샤드에만 보냄
+        by_class = self._sharded('classification')
+        self.assertEqual(sum(bool(shard.select(classification='다과류')) for shard in by_class.shards), 1)
+
+    def test_falls_back_to_parent_when_shard_fails(self):
+        sharded = self._sharded('id')
+        for pool in sharded._executors():
+            pool.shutdown()
+        with self.assertLogs(vector_shards.logger, 'WARNING'):
+            hits = sharded.search(self.queries[0], 6)
+        self.assertSameHits(hits, self.index.search(self.queries[0], 6))
+        self.assertIsNone(sharded._pools)  # 다음 검색 때 다시 띄움
+
+    def test_closed_index_does_not_restart_pools(self):
+        # 교체된 인덱스를 아직 들고 있던 요청: 부모에서 계산하고 새 프로세스를 띄우지 않음
+        sharded = self._sharded('id')
+        sharded.close()
+        self.assertSameHits(sharded.search(self.queries[0], 6), self.index.search(self.queries[0], 6))
+        self.assertIsNone(sharded._pools)
+
+
+@unittest.skipUnless(images.PIL_AVAILABLE, 'Pillow 필요')
+class ProductThumbnailTests(TransactionTestCase):
+    """로컬 HTTP 서버의 원본 이미지로 썸네일 생성/서빙 확인 (외부 네트워크 없음)
+    요청 경로는 원본을 받지 않고 build_thumbnails 작업만 등록함
+    """
+
+    def setUp(self):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new('RGB', (800, 600), (200, 30, 30)).save(buf, format='PNG')
+        body = buf.getvalue()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/photo.png':
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base = f'http://127.0.0.1:{self.server.server_port}'
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = Path(media.name)
+        override = self.settings(MEDIA_ROOT=self.media_root, THUMBNAILS_ENABLED=True,
+                                 THUMBNAIL_WIDTHS=[160, 320, 1024], THUMBNAIL_FORMATS=['webp', 'jpeg'])
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.product = Product.objects.create(name='빨간 노트', brand='B', category='노트', classification='문구',
+                                              price=1000, img=f'{base}/photo.png')
+        self.missing = Product.objects.create(name='없는 사진', brand='B', category='노트', classification='문구',
+                                              price=1000, img=f'{base}/missing.png')
+        Job.objects.all().delete()  # 상품 저장으로 등록된 임베딩 작업
+        cache.clear()
+
+    def _thumbnail_jobs(self):
+        return sorted(Job.objects.filter(kind=jobs.BUILD_THUMBNAILS).values_list('key', flat=True))
+
+    def _run_thumbnail_jobs(self):
+        while (job := jobs.claim('test', kinds=[jobs.BUILD_THUMBNAILS])) is not None:
+            jobs.run_job(job)
+
+    def test_command_builds_all_variants(self):
+        from PIL import Image
+
+        call_command('fetch_product_images', product_ids=[self.product.id, self.missing.id], stdout=io.StringIO())
+        for width, expected in ((160, 160), (320, 320), (1024, 800)):  # 원본보다 크게 만들지 않음
+            for fmt in ('webp', 'jpeg'):
+                path = self.media_root / images.thumb_name(self.product.id, self.product.img, width, fmt)
+                with Image.open(path) as thumb:
+                    self.assertEqual((thumb.format.lower(), thumb.width), (fmt, expected))
+        self.assertEqual(list((self.media_root / 'thumbs' / str(self.missing.id)).glob('*.jpg')), [])
+        self.assertTrue(images.recently_failed(self.missing.id, self.missing.img))
+
+    def test_view_queues_missing_variant_and_redirects(self):
+        url = images.thumb_url(self.product.id, self.product.img, 320, 'webp')
+        with mock.patch.object(images, 'fetch_image') as fetch:
+            self.assertRedirects(self.client.get(url), self.product.img, fetch_redirect_response=False)
+            self.client.get(url)
+        fetch.assert_not_called()  # 요청 경로에서는 원본을 받지 않음
+        self.assertEqual(self._thumbnail_jobs(), [f'build_thumbnails:{self.product.id}'])
+
+        self._run_thumbnail_jobs()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+        self.assertTrue(Job.objects.filter(kind=jobs.PUBLISH_THUMBNAILS).exists())  # 조각 캐시 갱신 예약
+
+    def test_failed_fetch_is_not_retried_until_expiry(self):
+        url = images.thumb_url(self.missing.id, self.missing.img, 320)
+        self.client.get(url)
+        with self.assertLogs(jobs.logger, 'WARNING'):
+            self._run_thumbnail_jobs()
+        self.assertTrue(images.recently_failed(self.missing.id, self.missing.img))
+
+        cache.clear()
+        self.assertRedirects(self.client.get(url), self.missing.img, fetch_redirect_response=False)
+        self.assertFalse(Job.objects.filter(kind=jobs.BUILD_THUMBNAILS, status='queued').exists())
+        with self.settings(THUMBNAIL_RETRY_SECONDS=0):  # 만료 후에는 다시 등록
+            self.client.get(url)
+        self.assertTrue(Job.objects.filter(kind=jobs.BUILD_THUMBNAILS, status='queued').exists())
+
+    def test_template_tag_emits_only_built_variants(self):
+        template = Template('{% load product_images %}{% product_image p %}')
+        html = template.render(Context({'p': self.product}))
+        self.assertNotIn('<picture', html)
+        self.assertIn(f'src="{self.product.img}"', html)
+        self.assertEqual(self._thumbnail_jobs(), [f'build_thumbnails:{self.product.id}'])
+
+        self._run_thumbnail_jobs()
+        html = template.render(Context({'p': self.product}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(images.thumb_url(self.product.id, self.product.img, 160, 'jpeg') + ' 160w', html)
+        self.assertIn(f'src="{images.thumb_url(self.product.id, self.product.img, 320)}"', html)
+
+
+class MultiVectorWeightTests(TransactionTestCase):
+    """장바구니 추천 멀티 벡터 점수: 정규화 평균 쿼리 + name/description 가중합 (가중치에 따라 순서가 바뀜)"""
+    databases = {'default', 'direct'} if 'direct' in connections else {'default'}
+
+    @staticmethod
+    def _vec(*values):
+        return list(values) + [0.0] * (1536 - len(values))  # pgvector 열 차원에 맞춤
+
+    def setUp(self):
+        cache.clear()
+        specs = {  # 이름: (name 임베딩, description 임베딩)
+            '장바구니 1': (self._vec(1.0, 0.0), self._vec(0.0, 0.0, 1.0)),
+            '장바구니 2': (self._vec(0.0, 2.0), self._vec(0.0, 0.0, 3.0)),  # 길이가 달라도 평균에 같은 비중
+            '이름 일치': (self._vec(1.0, 1.0), self._vec(0.0, 0.0, 0.0, 1.0)),
+            '설명 일치': (self._vec(0.0, 0.0, 0.0, 1.0), self._vec(0.0, 0.0, 1.0)),
+            '절반씩': (self._vec(0.0, 1.0), self._vec(0.0, 0.0, 1.0, 1.0)),
+        }
+        self.products = {
+            name: Product.objects.create(name=name, category='노트', price=1000, if_affiliated=True,
+                                         name_embedding=name_vec, description_embedding=desc_vec)
+            for name, (name_vec, desc_vec) in specs.items()
+        }
+        vector_index.invalidate_vector_index()
+        self.addCleanup(vector_index.invalidate_vector_index)  # 다음 테스트가 이 상품들의 인덱스를 쓰지 않게
+
+    def _recommend(self, weights):
+        cart = [self.products['장바구니 1'].id, self.products['장바구니 2'].id]
+        results = OpenAIEmbeddingGenerator().recommend_for_products(cart, weights=weights)
+        return [(r['name'], round(r['similarity_score'], 4)) for r in results]
+
+    def test_weights_change_order(self):
+        half = round(np.sqrt(0.5), 4)
+        self.assertEqual(self._recommend((0.9, 0.1)), [('이름 일치', 0.9), ('절반씩', half), ('설명 일치', 0.1)])
+        self.assertEqual(self._recommend((0.1, 0.9)), [('설명 일치', 0.9), ('절반씩', half), ('이름 일치', 0.1)])
+
+    def test_default_weights_from_settings(self):
+        with self.settings(RECOMMEND_NAME_WEIGHT=0.2, RECOMMEND_DESCRIPTION_WEIGHT=0.8):
+            self.assertEqual([name for name, _ in self._recommend(None)], ['설명 일치', '절반씩', '이름 일치'])
+
+
+@unittest.skipUnless(pgvector_enabled(), 'PostgreSQL + pgvector 필요 (docker-compose.bench.yml 참고)')
+class PgvectorMultiSearchTests(TransactionTestCase):
+    """추천(멀티 벡터) 검색: HNSW 후보를 가중합으로 재정렬한 결과가 정확 검색/NumPy 계산과 같은지"""
+    databases = {'default', 'direct'} if 'direct' in connections else {'default'}
+
+    def setUp(self):
+        cache.clear()  # 필터 선택도 버킷 캐시
+        rng = np.random.default_rng(7)
+        self.vectors = {}
+        for i in range(40):
+            name_vec, desc_vec = rng.normal(size=(2, 1536))
+            product = Product.objects.create(
+                name=f'상품 {i}', category='노트' if i % 2 else '필기구', price=1000, if_affiliated=i % 3 == 0,
+                name_embedding=name_vec.tolist(), description_embedding=desc_vec.tolist(),
+            )
+            self.vectors[product.id] = (product, name_vec, desc_vec)
+        self.name_q, self.desc_q = rng.normal(size=(2, 1536))
+
+    def _expected(self, limit, weights, exclude_ids=(), categories=None):
+        def cosine(a, b):
+            return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+        scores = {
+            pid: weights[0] * cosine(self.name_q, name_vec) + weights[1] * cosine(self.desc_q, desc_vec)
+            for pid, (product, name_vec, desc_vec) in self.vectors.items()
+            if pid not in exclude_ids and (categories is None or product.category in categories)
+        }
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def _search(self, **filters):
+        generator = OpenAIEmbeddingGenerator()
+        return [r['id'] for r in generator.search_by_embedding(
+            self.name_q, limit=5, description_embedding=self.desc_q, weights=(0.3, 0.7), **filters,
+        )]
+
+    def test_filtered_rescore_matches_exact(self):
+        exclude = list(self.vectors)[:3]
+        filters = {'exclude_ids': exclude, 'categories': ['노트']}
+        expected = self._expected(5, (0.3, 0.7), exclude, ['노트'])
+        with self.settings(VECTOR_EXACT_SCAN_THRESHOLD=10 ** 6):
+            self.assertEqual(self._search(**filters), expected)  # 정확 검색 경로
+
+        ann = mock.patch.object(OpenAIEmbeddingGenerator, '_pgvector_filtered_ann', autospec=True,
+                                side_effect=OpenAIEmbeddingGenerator._pgvector_filtered_ann)
+        with self.settings(VECTOR_EXACT_SCAN_THRESHOLD=0, VECTOR_RESCORE_FACTOR=10), ann as filtered_ann:
+            self.assertEqual(self._search(**filters), expected)
+        filtered_ann.assert_called_once()
+
+    def test_unfiltered_rescore_uses_ann_candidates(self):
+        ann = mock.patch.object(OpenAIEmbeddingGenerator, '_pgvector_ann', autospec=True,
+                                side_effect=OpenAIEmbeddingGenerator._pgvector_ann)
+        with self.settings(VECTOR_RESCORE_FACTOR=10), ann as unfiltered_ann:
+            self.assertEqual(self._search(), self._expected(5, (0.3, 0.7)))
+        unfiltered_ann.assert_called_once()
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql' and 'pool' in connection.settings_dict['OPTIONS'],
+                     'PostgreSQL 연결 풀 설정 필요 (docker-compose.bench.yml 참고)')
+class PostgresPoolTests(TransactionTestCase):
+    """로컬 PostgreSQL 컨테이너 대상 (README의 테스트 항목 참고)"""
+    databases = {'default', 'direct'} if 'direct' in connections else {'default'}
+
+    def test_pool_serves_queries_and_reports_stats(self):
+        for _ in range(5):
+            Product.objects.count()
+        stats = shop_db.pool_stats()['default']
+        self.assertGreaterEqual(stats['pool_size'], 1)
+        self.assertLessEqual(stats['pool_size'], stats['pool_max'])
+
+    def test_vector_search_uses_direct_route(self):
+        from .utils.embeddings import OpenAIEmbeddingGenerator
+
+        seed_products(10, dim=1536)
+        expected = shop_db.DIRECT_DB_ALIAS if shop_db.has_direct() else 'default'
+        aliases = []
+
+        def capture(execute, sql, params, many, context):
+            aliases.append(context['connection'].alias)
+            return execute(sql, params, many, context)
+
+        with connections[expected].execute_wrapper(capture):
+            results = OpenAIEmbeddingGenerator().search_by_embedding([0.1] * 1536, limit=3)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(aliases)
+        self.assertEqual(set(aliases), {expected})
@@ -15,7 +15,11 @@ urlpatterns = [
     path('api/cart/update/', views.update_cart, name='update_cart'),
     path('api/cart/clear/', views.clear_cart, name='clear_cart'),
     path('api/recommend/ai/', views.api_ai_recommendations, name='api_ai_recommendations'),
+    # 참여자 이벤트 (추천 클릭 등)
+    path('api/events/', views.api_events, name='api_events'),
     # 자동완성 & 트렌딩
     path('api/search/suggest/', views.api_search_suggest, name='api_search_suggest'),
     path('api/search/trending/', views.api_search_trending, name='api_search_trending'),
+    # 카탈로그 동기화 (?since=<version>이면 변경분만)
+    path('api/catalog/', views.api_catalog, name='api_catalog'),
 ]
\ No newline at end of file
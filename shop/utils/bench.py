@@ -0,0 +1,327 @@
+import csv
+import hashlib
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+DEFAULT_CSV = "쇼핑몰 상품데이터 팀 공용 - 쇼핑몰 상품데 - stationery_products_final_korean (1).csv (1).csv"
+
+# CSV가 없을 때 사용할 최소 스키마 샘플
+FALLBACK_ROWS = [
+    {'classification': '생활용품', 'category': '필통', 'brand': '벤치문구', 'name': '데일리 필통', 'price': '5900'},
+    {'classification': '생활용품', 'category': '노트', 'brand': '벤치문구', 'name': '스프링 노트', 'price': '3200'},
+    {'classification': '생활용품', 'category': '스티커', 'brand': '벤치상사', 'name': '다꾸 스티커', 'price': '2500'},
+    {'classification': '다과류', 'category': '과자', 'brand': '벤치제과', 'name': '종합 간식 세트', 'price': '15000'},
+]
+
+
+def percentile(values, p):
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies, elapsed=None, errors=0):
+    """지연 시간(초) 목록 → ms 단위 요약"""
+    summary = {
+        'count': len(latencies),
+        'errors': errors,
+        'mean_ms': round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(1000 * percentile(latencies, 50), 3),
+        'p95_ms': round(1000 * percentile(latencies, 95), 3),
+        'p99_ms': round(1000 * percentile(latencies, 99), 3),
+        'max_ms': round(1000 * max(latencies), 3) if latencies else 0.0,
+    }
+    if elapsed:
+        summary['throughput_rps'] = round(len(latencies) / elapsed, 2)
+    return summary
+
+
+def random_unit_vectors(n, dim, rng):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def fake_embedding(text, dim=1536):
+    """텍스트 해시 기반 결정적 단위 벡터 (OpenAI 호출 대체)"""
+    seed = int.from_bytes(hashlib.sha1((text or '').encode('utf-8')).digest()[:8], 'little')
+    return random_unit_vectors(1, dim, np.random.default_rng(seed))[0].tolist()
+
+
+def load_template_rows(csv_path=None):
+    """상품 CSV를 합성 상품의 템플릿으로 읽는다 (없으면 내장 샘플)"""
+    path = Path(csv_path) if csv_path else Path(settings.BASE_DIR) / DEFAULT_CSV
+    if not path.exists():
+        return FALLBACK_ROWS
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = [r for r in csv.DictReader(f) if r.get('name')]
+    return rows or FALLBACK_ROWS
+
+
+def seed_products(n, seed=0, csv_path=None, dim=1536, batch_size=1000):
+    """CSV 스키마를 따르는 합성 상품 n개 + 가짜 임베딩 생성. 생성된 상품 ID 리스트 반환
+    (벡터는 batch_size 단위로 만들어 대용량 카탈로그에서도 메모리를 일정하게 유지)
+    """
+    from django.utils import timezone
+    from shop.models import Product
+    from shop.management.commands.import_csv_products import _parse_bool, _parse_price
+    from .catalog import bump_catalog_version
+
+    rng = np.random.default_rng(seed)
+    templates = load_template_rows(csv_path)
+    now = timezone.now()
+
+    ids = []
+    for start in range(0, n, batch_size):
+        size = min(batch_size, n - start)
+        name_vecs = random_unit_vectors(size, dim, rng)
+        desc_vecs = random_unit_vectors(size, dim, rng)
+        objs = []
+        for j in range(size):
+            i = start + j
+            row = templates[i % len(templates)]
+            objs.append(Product(
+                classification=row.get('classification') or '생활용품',
+                category=(row.get('category') or '').strip(),
+                brand=(row.get('brand') or '').strip(),
+                name=f"{(row.get('name') or '').strip()} #{i + 1}",
+                price=max(100, int(_parse_price(row.get('price')) * rng.uniform(0.7, 1.3))),
+                img=(row.get('img') or '').strip(),
+                if_affiliated=_parse_bool(row.get('if_affilated')) or bool(rng.random() < 0.3),
+                reviews=row.get('reviews') or '',
+                name_embedding=name_vecs[j].tolist(),
+                description_embedding=desc_vecs[j].tolist(),
+                embedding_updated_at=now,
+            ))
+        ids.extend(p.id for p in Product.objects.bulk_create(objs))
+    # 카탈로그 버전 기준 캐시(상품 카드 조각, 패싯 인덱스)가 새 상품을 보도록
+    bump_catalog_version()
+    return ids
+
+
+@contextmanager
+def bench_database():
+    """실제 DB를 건드리지 않도록 테스트 DB(test_<이름>)를 만들어 사용 후 삭제"""
+    from django.db import connection, connections
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    tmpdir = None
+    if connection.vendor == 'sqlite':
+        # 메모리 공유 캐시 DB는 테이블 잠금으로 동시 쓰기가 실패하므로 파일 DB 사용
+        tmpdir = tempfile.mkdtemp(prefix='bench_')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    # 직접 연결(direct)도 같은 테스트 DB를 보도록 (테스트 러너의 TEST MIRROR와 같은 처리)
+    mirrors = [connections[alias] for alias in connections if alias != connection.alias]
+    saved = [conn.settings_dict['NAME'] for conn in mirrors]
+    for conn in mirrors:
+        conn.close()
+        conn.settings_dict['NAME'] = connection.settings_dict['NAME']
+    try:
+        yield connection
+    finally:
+        for conn, name in zip(mirrors, saved):
+            conn.close()
+            conn.settings_dict['NAME'] = name
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def environment_info():
+    from django.db import connection
+    import django
+
+    return {
+        'git_commit': git_commit(),
+        'db_vendor': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': platform.machine(),
+    }
+
+
+def compare_results(current, baseline, metric='p95_ms', threshold=0.10):
+    """두 결과 JSON의 엔드포인트별 지표 비교. [(이름, 이전, 현재, 변화율, 회귀여부)] 반환"""
+    rows = []
+    for name, cur in current.get('endpoints', {}).items():
+        base = baseline.get('endpoints', {}).get(name)
+        if not base or not base.get(metric):
+            continue
+        change = (cur[metric] - base[metric]) / base[metric]
+        rows.append((name, base[metric], cur[metric], change, change > threshold))
+    return rows
+
+
+def write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def stub_embeddings(dim=1536):
+    """임베딩 API 호출을 결정적 가짜 벡터로 대체하는 컨텍스트 매니저 (네트워크 비용 제외)"""
+    from unittest import mock
+    from .embeddings import OpenAIEmbeddingGenerator
+
+    return mock.patch.object(OpenAIEmbeddingGenerator, 'get_embedding', lambda self, text: fake_embedding(text, dim))
+
+
+FLOW_STEPS = (
+    'consent_form', 'consent_submit', 'home', 'product_list_search',
+    'product_detail', 'add_to_cart', 'cart', 'ai_recommendations',
+)
+
+
+def _participant_flow(client, rng, products, record):
+    """동의 → 홈 → 검색 → 상세 → 담기 → 장바구니 → AI 추천 한 바퀴"""
+    from django.urls import reverse
+
+    product_id, category = products[int(rng.integers(len(products)))]
+    steps = [
+        ('consent_form', 'get', reverse('consent_form'), None, 200),
+        ('consent_submit', 'post', reverse('consent_form'), {
+            'consent_research': 'on', 'consent_data': 'on', 'consent_participation': 'on',
+            'name': '벤치', 'student_id': f"B{int(rng.integers(1_000_000))}", 'phone': '010-0000-0000',
+        }, 302),
+        ('home', 'get', reverse('home'), None, 200),
+        ('product_list_search', 'get', reverse('product_list'), {'q': category}, 200),
+        ('product_detail', 'get', reverse('product_detail', args=[product_id]), None, 200),
+        ('add_to_cart', 'post', reverse('add_to_cart'), {'product_id': product_id, 'quantity': 1}, 200),
+        ('cart', 'get', reverse('cart_view'), None, 200),
+        ('ai_recommendations', 'get', reverse('api_ai_recommendations'), None, 200),
+    ]
+    for name, method, url, data, expected in steps:
+        started = time.perf_counter()
+        try:
+            response = getattr(client, method)(url, data)
+            ok = response.status_code == expected
+        except Exception:
+            ok = False
+        record(name, time.perf_counter() - started, ok)
+
+
+def run_flow(users=4, iterations=5, seed=0):
+    """참여자 흐름을 users개 스레드에서 동시에 iterations회씩 실행.
+    반환: {'elapsed_s', 'flows', 'endpoints': {step: 요약}}
+    """
+    from django.db import connections
+    from django.test import Client
+    from shop.models import Product
+    from shop.utils.events import flush_events
+
+    products = list(Product.objects.values_list('id', 'category'))
+    if not products:
+        raise ValueError('상품이 없습니다. seed_products()로 먼저 상품을 만드세요.')
+
+    lock = threading.Lock()
+    latencies = {name: [] for name in FLOW_STEPS}
+    errors = {name: 0 for name in FLOW_STEPS}
+
+    def record(name, seconds, ok):
+        with lock:
+            latencies[name].append(seconds)
+            if not ok:
+                errors[name] += 1
+
+    def worker(index):
+        rng = np.random.default_rng(seed + index)
+        try:
+            for _ in range(iterations):
+                _participant_flow(Client(), rng, products, record)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(worker, range(users)))
+    # 버퍼에 남은 참여자 이벤트까지 저장해야 흐름 1회의 쓰기 부하가 모두 포함됨
+    flush_events()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'flows': users * iterations,
+        'flows_per_s': round(users * iterations / elapsed, 2),
+        'endpoints': {
+            name: summarize(latencies[name], elapsed, errors[name]) for name in FLOW_STEPS
+        },
+    }
+
+
+def vector_backends():
+    """벤치마크 대상 벡터 검색 백엔드 {이름: search(generator, query, k, exclude_ids, affiliated_only, categories)}
+    현재 DB에서 사용할 수 없는 백엔드는 제외된다.
+    """
+    from .embeddings import pgvector_enabled
+
+    backends = {
+        'python': lambda gen, q, k, ex, aff, cats: gen._search_with_python(q, k, ex, aff, cats),
+    }
+    if pgvector_enabled():
+        backends['pgvector'] = lambda gen, q, k, ex, aff, cats: gen._search_with_pgvector(q, k, ex, aff, cats)
+    return backends
+
+
+def load_ground_truth_matrix():
+    """brute-force 정답 계산용 (ids, 정규화 name 행렬, 제휴 마스크, 카테고리 배열)"""
+    from shop.models import Product
+    from .embeddings import to_vector
+
+    ids, vectors, affiliated, categories = [], [], [], []
+    rows = Product.objects.exclude(name_embedding__isnull=True).values_list(
+        'id', 'name_embedding', 'if_affiliated', 'category',
+    )
+    for pid, emb, aff, cat in rows.iterator(chunk_size=2000):
+        ids.append(pid)
+        vectors.append(to_vector(emb))
+        affiliated.append(aff)
+        categories.append(cat)
+    matrix = np.vstack(vectors).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.asarray(ids), matrix, np.asarray(affiliated, dtype=bool), np.asarray(categories, dtype=object)
+
+
+def brute_force_top_k(truth, query, k, exclude_ids=None, affiliated_only=False, categories=None):
+    """필터를 적용한 정확한 top-k 상품 ID"""
+    ids, matrix, affiliated, cats = truth
+    mask = np.ones(len(ids), dtype=bool)
+    if affiliated_only:
+        mask &= affiliated
+    if categories:
+        mask &= np.isin(cats, list(categories))
+    if exclude_ids:
+        mask &= ~np.isin(ids, list(exclude_ids))
+    candidates = np.flatnonzero(mask)
+    if not len(candidates):
+        return []
+    scores = matrix[candidates] @ (np.asarray(query, dtype=np.float32) / np.linalg.norm(query))
+    top = candidates[np.argsort(-scores)[:k]]
+    return ids[top].tolist()
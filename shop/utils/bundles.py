@@ -0,0 +1,91 @@
+"""정적 파일 번들 (템플릿 인라인 <style>/<script> 대신)
+
+STATIC_BUNDLES {번들 이름: [원본 정적 파일 경로]}의 원본을 순서대로 이어 붙이고 최소화해
+STATIC_BUNDLE_DIR/<번들 이름>에 쓴다. shop.staticfiles.BundleFinder가 번들을 일반 정적 파일처럼 내놓으므로
+- 개발 서버(DEBUG): 요청 때마다 원본이 더 최근에 바뀌었으면 다시 만들어 제공
+- collectstatic: 번들을 만들어 STATIC_ROOT로 복사하고, 스토리지가 내용 해시 이름(cart.3f2a9c81d0e4.css)과
+  .gz/.br 사전 압축본을 만든다 (WhiteNoise와 nginx gzip_static이 그대로 제공)
+
+최소화는 원본 손글씨 코드에 맞춘 보수적인 규칙만 쓴다.
+- CSS: 주석 제거, 공백 압축, { } ; , 주변과 속성 콜론 뒤 공백 제거
+- JS: 줄 앞뒤 공백, 빈 줄, 한 줄 전체가 // 주석인 줄만 제거 (줄바꿈은 유지해 자동 세미콜론 삽입에 영향 없음)
+"""
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r'\s*([{};,])\s*')
+CSS_COLON = re.compile(r':\s+')
+
+
+def minify_css(text):
+    text = CSS_COMMENT.sub('', text)
+    text = CSS_SPACE.sub(' ', text)
+    text = CSS_PUNCTUATION.sub(r'\1', text)
+    text = CSS_COLON.sub(':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+# 앞 파일이 세미콜론 없이 끝나도 다음 파일의 첫 문장과 이어지지 않도록
+SEPARATORS = {'.css': '\n', '.js': ';\n'}
+
+
+def bundle_path(name):
+    return Path(settings.STATIC_BUNDLE_DIR) / name
+
+
+def source_paths(name):
+    """번들 원본의 절대 경로 목록 (정적 파일 파인더로 찾음)"""
+    from django.contrib.staticfiles import finders
+
+    paths = []
+    for source in settings.STATIC_BUNDLES[name]:
+        path = finders.find(source)
+        if path is None:
+            raise ImproperlyConfigured(f"STATIC_BUNDLES['{name}']의 원본 '{source}'을(를) 찾을 수 없습니다")
+        paths.append(Path(path))
+    return paths
+
+
+def render(name):
+    """번들 내용 (원본을 이어 붙여 최소화한 문자열)"""
+    suffix = Path(name).suffix
+    if suffix not in MINIFIERS:
+        raise ImproperlyConfigured(f"번들 '{name}': .css/.js만 지원합니다")
+    minify = MINIFIERS[suffix]
+    return SEPARATORS[suffix].join(minify(path.read_text(encoding='utf-8')) for path in source_paths(name)) + '\n'
+
+
+def build(name, force=False):
+    """번들 파일을 만들고 경로 반환. 원본보다 최근에 만든 파일이 있으면 그대로 사용"""
+    target = bundle_path(name)
+    sources = source_paths(name)
+    if not force and target.exists():
+        built_at = target.stat().st_mtime
+        if all(path.stat().st_mtime <= built_at for path in sources):
+            return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f'.{target.name}.tmp')
+    tmp.write_text(render(name), encoding='utf-8')
+    os.replace(tmp, target)
+    return target
+
+
+def build_all(force=False):
+    """{번들 이름: (원본 바이트 합, 번들 바이트)}"""
+    sizes = {}
+    for name in settings.STATIC_BUNDLES:
+        target = build(name, force=force)
+        sizes[name] = (sum(path.stat().st_size for path in source_paths(name)), target.stat().st_size)
+    return sizes
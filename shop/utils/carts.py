@@ -0,0 +1,181 @@
+"""참여자 장바구니 저장 (Cart/CartItem 테이블)
+
+세션에는 cart_id만 두고 담은 상품은 CartItem 행으로 저장한다. 세션 dict로 들고 있을 때는 담기/수량 변경마다
+세션 전체를 다시 직렬화해 저장했고, 만료 세션이 지워지면 장바구니도 사라져 집계에 쓸 수 없었다.
+- 담기: 이미 있는 상품은 UPDATE 한 번으로 수량을 더하고(뺐던 상품이면 되살림), 없을 때만 INSERT
+- 수량 0 이하/비우기: 행을 지우지 않고 removed_at 기록 → cart_stats가 "담았다가 뺀" 상품까지 SQL로 집계
+- 수량은 MAX_QUANTITY개까지 (담기를 반복해도 PositiveIntegerField가 넘치지 않게 UPDATE 안에서 자름)
+- 예전 세션의 cart dict({상품 ID: 수량})는 처음 접근할 때 CartItem으로 옮기고 세션에서 지움
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+SESSION_KEY = 'cart_id'
+LEGACY_SESSION_KEY = 'cart'
+MAX_QUANTITY = 99  # 상품당 최대 수량
+
+
+def create_cart(request, participant_id=None):
+    """새 장바구니를 만들고 세션에 cart_id 저장"""
+    from shop.models import Cart, Participant
+
+    if participant_id is None:
+        participant_id = request.session.get('participant_id')
+        # 세션에 남은 참여자 ID가 지워진 참여자일 수 있음
+        if participant_id is not None and not Participant.objects.filter(id=participant_id).exists():
+            participant_id = None
+    cart = Cart.objects.create(participant_id=participant_id, session_key=request.session.session_key or '')
+    request.session[SESSION_KEY] = cart.id
+    return cart.id
+
+
+def _import_legacy(cart_id, legacy):
+    """세션 cart dict를 CartItem으로 옮김 (잘못된 값은 건너뜀)"""
+    from shop.models import CartItem, Product
+
+    quantities = {}
+    for pid, qty in legacy.items():
+        try:
+            quantities[int(pid)] = min(max(1, int(qty)), MAX_QUANTITY)
+        except (TypeError, ValueError):
+            continue
+    affiliated = dict(Product.objects.filter(id__in=quantities).values_list('id', 'if_affiliated'))
+    CartItem.objects.bulk_create(
+        [CartItem(cart_id=cart_id, product_id=pid, quantity=qty, affiliated=affiliated.get(pid, False))
+         for pid, qty in quantities.items()],
+        ignore_conflicts=True,
+    )
+
+
+def get_cart_id(request, create=False):
+    """세션의 cart_id (없으면 None, create=True면 새로 만듦)"""
+    cart_id = request.session.get(SESSION_KEY)
+    legacy = request.session.pop(LEGACY_SESSION_KEY, None)
+    if cart_id is None and (create or legacy):
+        cart_id = create_cart(request)
+    if legacy:
+        _import_legacy(cart_id, legacy)
+    return cart_id
+
+
+def cart_contents(request):
+    """{str(상품 ID): 수량} — 담은 순서, 뺀 상품 제외 (예전 세션 cart dict와 같은 모양)"""
+    from shop.models import CartItem
+
+    cart_id = get_cart_id(request)
+    if cart_id is None:
+        return {}
+    rows = (
+        CartItem.objects.filter(cart_id=cart_id, removed_at__isnull=True)
+        .order_by('added_at', 'id')
+        .values_list('product_id', 'quantity')
+    )
+    return {str(pid): qty for pid, qty in rows}
+
+
+def add_item(request, product, quantity=1, source=''):
+    """상품을 quantity개 담음. source/affiliated는 처음 담을 때 값을 유지"""
+    from shop.models import CartItem
+
+    quantity = min(max(1, quantity), MAX_QUANTITY)
+    cart_id = get_cart_id(request, create=True)
+    now = timezone.now()
+    items = CartItem.objects.filter(cart_id=cart_id, product_id=product.id)
+    added = Least(F('quantity') + quantity, Value(MAX_QUANTITY))
+    updated = items.update(
+        quantity=Case(When(removed_at__isnull=True, then=added), default=Value(quantity)),
+        removed_at=None,
+        updated_at=now,
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic(using=items.db):
+            CartItem.objects.create(
+                cart_id=cart_id, product_id=product.id, quantity=quantity, source=source,
+                affiliated=product.if_affiliated, added_at=now, updated_at=now,
+            )
+    except IntegrityError:
+        # 같은 상품을 동시에 담아 다른 요청이 먼저 INSERT한 경우
+        items.update(quantity=added, updated_at=now)
+
+
+def set_quantity(request, product, quantity):
+    """수량 변경 (0 이하면 뺀 상품으로 표시, MAX_QUANTITY를 넘으면 MAX_QUANTITY)"""
+    from shop.models import CartItem
+
+    quantity = min(quantity, MAX_QUANTITY)
+    now = timezone.now()
+    if quantity <= 0:
+        cart_id = get_cart_id(request)
+        if cart_id is not None:
+            CartItem.objects.filter(cart_id=cart_id, product_id=product.id, removed_at__isnull=True) \
+                .update(removed_at=now, updated_at=now)
+        return
+    cart_id = get_cart_id(request, create=True)
+    updated = CartItem.objects.filter(cart_id=cart_id, product_id=product.id) \
+        .update(quantity=quantity, removed_at=None, updated_at=now)
+    if not updated:
+        add_item(request, product, quantity)
+
+
+def clear_cart(request):
+    """담은 상품을 모두 뺀 상품으로 표시"""
+    from shop.models import CartItem
+
+    cart_id = get_cart_id(request)
+    if cart_id is not None:
+        now = timezone.now()
+        CartItem.objects.filter(cart_id=cart_id, removed_at__isnull=True).update(removed_at=now, updated_at=now)
+
+
+def add_rates(since=None, until=None, top=None, using=None):
+    """참여자 장바구니 담기 집계 (상품별, 담은 위치×제휴 여부별)
+
+    집계마다 GROUP BY 쿼리 한 번 (CartItem의 (product_id, cart), (source, affiliated, cart) 인덱스 사용).
+    비율의 분모는 기간(동의 시각 기준) 안의 참여자 수.
+    - participants: 한 번이라도 담은 참여자 수, kept_participants: 지금도 담고 있는 참여자 수
+    - quantity: 지금 담겨 있는 수량 합
+    """
+    from shop.models import CartItem, Participant, Product
+
+    participants = Participant.objects.using(using)
+    items = CartItem.objects.using(using).filter(cart__participant__isnull=False)
+    if since:
+        participants = participants.filter(created_at__gte=since)
+        items = items.filter(cart__participant__created_at__gte=since)
+    if until:
+        participants = participants.filter(created_at__lt=until)
+        items = items.filter(cart__participant__created_at__lt=until)
+
+    kept = Q(removed_at__isnull=True)
+    measures = {
+        'participants': Count('cart__participant', distinct=True),
+        'kept_participants': Count('cart__participant', distinct=True, filter=kept),
+        'quantity': Sum('quantity', filter=kept, default=0),
+    }
+    total = participants.count()
+    products = list(
+        items.values('product_id').annotate(**measures).order_by('-participants', 'product_id')[:top]
+    )
+    arms = list(items.values('source', 'affiliated').annotate(**measures).order_by('source', 'affiliated'))
+    overall = items.aggregate(**measures)
+
+    def rate(count):
+        return round(count / total, 4) if total else 0.0
+
+    names = Product.objects.using(using).only('id', 'name', 'brand', 'if_affiliated') \
+        .in_bulk([row['product_id'] for row in products])
+    for row in products:
+        product = names.get(row['product_id'])
+        row.update({
+            'name': product.name if product else None,
+            'brand': product.brand if product else None,
+            'if_affiliated': product.if_affiliated if product else None,
+        })
+    for row in [overall, *products, *arms]:
+        row['add_rate'] = rate(row['participants'])
+        row['keep_rate'] = rate(row['kept_participants'])
+    return {'participants': total, 'overall': overall, 'products': products, 'arms': arms}
@@ -0,0 +1,112 @@
+"""카탈로그 버전 관리 (렌더링 조각 캐시 무효화용)
+
+상품 데이터가 바뀌면(임포트, 이웃 갱신, 관리자 수정/삭제 — shop/signals.py) 버전을 올리고 캐시 키에 버전을 넣어
+이전 조각이 자연스럽게 만료되도록 한다. 버전 조회는 프로세스마다 CATALOG_VERSION_TTL초 동안 재사용한다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+_lock = threading.Lock()
+_state = None
+_checked_at = 0.0
+_importing = ContextVar('shop_catalog_importing', default=False)
+
+
+def catalog_state():
+    """(현재 카탈로그 버전, 마지막 변경 시각). TTL 동안 프로세스 내 캐시"""
+    global _state, _checked_at
+    now = time.monotonic()
+    if _state is not None and now - _checked_at < settings.CATALOG_VERSION_TTL:
+        return _state
+    from shop.models import CatalogState
+
+    with _lock:
+        row = CatalogState.objects.filter(pk=1).values_list('version', 'updated_at').first()
+        _state = row or (0, None)
+        _checked_at = now
+    return _state
+
+
+def catalog_version():
+    """현재 카탈로그 버전"""
+    return catalog_state()[0]
+
+
+def bump_catalog_version():
+    """카탈로그 버전 증가 (상품 데이터 변경 후 호출). 새 버전 반환"""
+    global _checked_at
+    from shop.models import CatalogState
+
+    updated = CatalogState.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogState.objects.get_or_create(pk=1)
+    _checked_at = 0.0
+    return catalog_version()
+
+
+# 카탈로그 동기화 API에서 내려줄 수 있는 필드 (리뷰/임베딩처럼 큰 필드는 제외)
+SYNC_FIELDS = ('id', 'classification', 'category', 'brand', 'name', 'price', 'img', 'if_affiliated')
+
+
+def next_catalog_version():
+    """임포트 중 바뀐 상품에 기록할 버전 (현재 버전 + 1). 임포트 끝의 bump_catalog_version()으로 공개된다"""
+    from shop.models import CatalogState
+
+    current = CatalogState.objects.filter(pk=1).values_list('version', flat=True).first()
+    return (current or 0) + 1
+
+
+@contextmanager
+def catalog_import():
+    """임포트 구간 (데코레이터로도 사용). 임포트는 버전 기록/삭제 기록/공개를 직접 하므로
+    그 사이 상품 저장/삭제 signal이 상품마다 버전을 올려 진행 중인 변경을 공개하지 않게 한다
+    """
+    token = _importing.set(True)
+    try:
+        yield
+    finally:
+        _importing.reset(token)
+
+
+def importing():
+    return _importing.get()
+
+
+def record_deletions(product_ids, version):
+    """삭제된 상품 ID를 기록 (다음 동기화 때 클라이언트 캐시에서 제거)"""
+    from shop.models import CatalogTombstone
+
+    now = timezone.now()
+    CatalogTombstone.objects.bulk_create(
+        [CatalogTombstone(product_id=pid, version=version, deleted_at=now) for pid in product_ids],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['product_id'],
+        update_fields=['version', 'deleted_at'],
+    )
+
+
+def catalog_delta(since=None, fields=SYNC_FIELDS):
+    """(버전, 상품 행 목록, 삭제된 ID 목록)
+    since가 없으면 전체, 있으면 since 이후 바뀐 상품과 삭제된 ID만. 진행 중인 임포트(아직 공개되지 않은 버전)는 제외
+    """
+    from shop.models import CatalogTombstone, Product
+
+    version = catalog_version()
+    qs = Product.objects.filter(catalog_version__lte=version)
+    deleted = []
+    if since is not None:
+        qs = qs.filter(catalog_version__gt=since)
+        deleted = list(
+            CatalogTombstone.objects.filter(version__gt=since, version__lte=version)
+            .exclude(product_id__in=Product.objects.values('id'))
+            .order_by('product_id')
+            .values_list('product_id', flat=True)
+        )
+    return version, list(qs.order_by('id').values_list(*fields)), deleted
@@ -0,0 +1,207 @@
+"""DB 연결 경로 선택 (풀러 경유 default / 직접 연결 direct / 읽기 복제본)과 연결 풀 상태 메트릭
+
+- use_direct(): 블록 안의 ORM 조회/쓰기를 direct로 보냄 (shop.db_routers.PrimaryDirectRouter)
+- use_direct(read_only=True): 조회는 사용 가능한 복제본으로, 없으면 direct로 (벡터 검색)
+- direct_alias(): raw SQL용 별칭 (현재 블록의 조회 경로, 블록 밖이면 default)
+- 블록 밖의 카탈로그 조회는 복제본으로 분산 (shop.db_routers.CatalogReplicaRouter)
+direct/복제본이 없으면(SQLite, DIRECT_URL 미설정) 모두 default를 사용한다.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DIRECT_DB_ALIAS = 'direct'
+
+_route = ContextVar('shop_db_route', default=None)  # (조회 별칭, 쓰기 별칭) 또는 None
+
+POOL_STAT = metrics.gauge('shop_db_pool', 'psycopg 연결 풀 상태 (stat=pool_size|pool_available|requests_waiting|...)')
+
+
+def has_direct():
+    return DIRECT_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_direct(read_only=False):
+    """벡터 검색/대량 임포트처럼 무겁거나 긴 작업을 직접 연결로 실행
+    read_only=True면 블록 진입 시 복제본 하나를 골라 블록 안의 조회에 사용
+    """
+    direct = DIRECT_DB_ALIAS if has_direct() else None
+    read = (replica_for_read() if read_only else None) or direct
+    token = _route.set((read, direct))
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def in_route_block():
+    return _route.get() is not None
+
+
+def current_route(write=False):
+    """use_direct() 블록의 조회(또는 쓰기) 별칭. 블록 밖이거나 해당 경로가 없으면 None"""
+    route = _route.get()
+    if route is None:
+        return None
+    return route[1] if write else route[0]
+
+
+def direct_alias():
+    return current_route() or DEFAULT_DB_ALIAS
+
+
+def pool_stats():
+    """{별칭: psycopg_pool 통계}. 풀을 쓰는 PostgreSQL 연결만 포함"""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def update_pool_metrics():
+    """/metrics 렌더링 직전에 풀 통계를 게이지로 반영"""
+    for alias, stats in pool_stats().items():
+        for stat, value in stats.items():
+            POOL_STAT.set(value, alias=alias, stat=stat)
+
+
+class DirectCommandMixin:
+    """관리 명령 전체를 use_direct() 안에서 실행 (대량 임포트/임베딩/이웃 계산)"""
+
+    def execute(self, *args, **options):
+        with use_direct():
+            return super().execute(*args, **options)
+
+
+# --- 읽기 복제본 -----------------------------------------------------------------
+
+REPLICA_HEALTHY = metrics.gauge('shop_db_replica_healthy', '복제본 상태 (1=사용 가능, 0=제외)')
+REPLICA_READS = metrics.counter('shop_db_catalog_reads_total', '카탈로그 조회 라우팅 수 (alias별)')
+
+_pinned_until = ContextVar('shop_db_pinned_until', default=0.0)
+
+
+def pin_primary(seconds=None):
+    """카탈로그 쓰기 직후 잠시 동안(REPLICA_PIN_SECONDS) 같은 실행 흐름의 조회를 primary로 고정"""
+    seconds = settings.REPLICA_PIN_SECONDS if seconds is None else seconds
+    _pinned_until.set(time.monotonic() + seconds)
+
+
+def primary_pinned():
+    return time.monotonic() < _pinned_until.get()
+
+
+class ReplicaSet:
+    """가중 라운드로빈(smooth weighted round-robin) + 주기적 상태 확인
+    상태 확인: 연결 가능, 복제 지연 REPLICA_MAX_LAG_SECONDS 이하, 카탈로그 버전이 primary와 같음
+    (임포트 직후 아직 따라오지 못한 복제본은 버전이 낮으므로 제외되고 조회는 primary로 감)
+    """
+
+    def __init__(self, weights):
+        self.weights = {alias: w for alias, w in weights.items() if w > 0}
+        self._current = {alias: 0 for alias in self.weights}
+        self._healthy = set(self.weights)
+        self._checked_at = 0.0
+        self._expected = None
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """다음 복제본 별칭. 사용 가능한 복제본이 없으면 None"""
+        self._maybe_check()
+        with self._lock:
+            healthy = [alias for alias in self.weights if alias in self._healthy]
+            if not healthy:
+                return None
+            total = 0
+            for alias in healthy:
+                self._current[alias] += self.weights[alias]
+                total += self.weights[alias]
+            best = max(healthy, key=lambda a: self._current[a])
+            self._current[best] -= total
+            return best
+
+    def _maybe_check(self):
+        """REPLICA_HEALTH_INTERVAL마다, 또는 카탈로그 버전이 바뀌면(임포트 직후) 바로 다시 확인"""
+        from .catalog import catalog_version
+
+        version = catalog_version()
+        now = time.monotonic()
+        if version == self._expected and now - self._checked_at < settings.REPLICA_HEALTH_INTERVAL:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # 다른 스레드가 확인 중이면 기존 상태 사용
+        try:
+            self._checked_at = now
+            self._expected = version
+        finally:
+            self._lock.release()
+        self.check(version)
+
+    def check(self, expected):
+        """모든 복제본 상태 확인 (expected: primary의 카탈로그 버전)"""
+        healthy = set()
+        for alias in self.weights:
+            ok = self._check_one(alias, expected)
+            REPLICA_HEALTHY.set(1 if ok else 0, alias=alias)
+            if ok:
+                healthy.add(alias)
+        with self._lock:
+            self._healthy = healthy
+        return healthy
+
+    @staticmethod
+    def _check_one(alias, expected_version):
+        conn = connections[alias]
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                    END
+                """)
+                lag = float(cursor.fetchone()[0])
+                cursor.execute("SELECT version FROM shop_catalogstate WHERE id = 1")
+                row = cursor.fetchone()
+        except Exception:
+            logger.warning('복제본 %s 상태 확인 실패', alias, exc_info=True)
+            conn.close()
+            return False
+        max_lag = settings.REPLICA_MAX_LAG_SECONDS
+        if max_lag and lag > max_lag:
+            return False
+        return (row[0] if row else 0) >= expected_version
+
+
+_replicas = None
+
+
+def get_replicas():
+    """설정된 복제본이 없으면 None"""
+    global _replicas
+    if _replicas is None and settings.DATABASE_REPLICAS:
+        _replicas = ReplicaSet(settings.DATABASE_REPLICAS)
+    return _replicas
+
+
+def replica_for_read():
+    """카탈로그 조회에 쓸 복제본 별칭 (없거나 primary 고정 중이면 None)"""
+    replicas = get_replicas()
+    if replicas is None:
+        return None
+    alias = None if primary_pinned() else replicas.choose()
+    REPLICA_READS.inc(alias=alias or DEFAULT_DB_ALIAS)
+    return alias
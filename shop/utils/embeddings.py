@@ -1,42 +1,162 @@
 import os
 import json
+import hashlib
+import math
 import numpy as np
-from django.db import connection
-from openai import OpenAI
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from . import metrics, resilience
+from .db import direct_alias, use_direct
+
+
+def pgvector_enabled():
+    """pgvector 검색 경로 사용 가능 여부 (PostgreSQL + pgvector 패키지 모두 필요)"""
+    if connection.vendor != 'postgresql':
+        return False
+    try:
+        from pgvector.django import VectorField  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pgvector_version(cursor):
+    """설치된 pgvector 확장 버전 (프로세스당 한 번 조회)"""
+    global _PGVECTOR_VERSION
+    if _PGVECTOR_VERSION is None:
+        cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        row = cursor.fetchone()
+        try:
+            _PGVECTOR_VERSION = tuple(int(x) for x in row[0].split('.')[:2]) if row else (0, 0)
+        except ValueError:
+            _PGVECTOR_VERSION = (0, 0)
+    return _PGVECTOR_VERSION
+
+
+_PGVECTOR_VERSION = None
+
+
+def to_vector(value):
+    """DB에서 읽은 임베딩(JSON 문자열/리스트/ndarray)을 float32 ndarray로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if not value:
+            return None
+        value = json.loads(value)
+    arr = np.asarray(value, dtype=np.float32)
+    return arr if arr.size else None
+
 
 class OpenAIEmbeddingGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self._client = None
         self.model = "text-embedding-3-small"  # 1536차원, 저렴한 비용
+
+    @property
+    def client(self):
+        """OpenAI 클라이언트는 실제 API 호출 시점에 생성 (키가 없어도 검색 경로는 동작)"""
+        if self._client is None:
+            # openai SDK(httpx, pydantic 포함)는 무거우므로 첫 API 호출 때 import
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=settings.EMBEDDING_MAX_RETRIES)
+        return self._client
     
     def get_embedding(self, text):
-        """텍스트를 임베딩 벡터로 변환"""
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text.strip()
-            )
+        """텍스트를 임베딩 벡터로 변환
+        - 지연 예산(resilience.latency_budget) 안이면 남은 시간만큼만 기다림
+        - 연속 실패로 브레이커가 열려 있으면 호출하지 않고 None
+        """
+        timeout = settings.EMBEDDING_TIMEOUT_SECONDS
+        left = resilience.remaining()
+        if left is not None:
+            if left <= 0:
+                resilience.mark_degraded()
+                return None
+            timeout = min(timeout, left)
+        breaker = resilience.get_breaker('openai_embedding')
+        if not breaker.allow():
+            resilience.mark_degraded()
+            return None
+
+        with metrics.embedding_call() as outcome:
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=text.strip(),
+                    timeout=timeout,
+                )
+            except Exception as e:
+                outcome['status'] = 'error'
+                breaker.record_failure()
+                resilience.mark_degraded()
+                print(f"임베딩 생성 오류: {e}")
+                return None
+            breaker.record_success()
             return response.data[0].embedding
-        except Exception as e:
-            print(f"임베딩 생성 오류: {e}")
+
+    def get_query_embedding(self, text, timeout=60 * 60):
+        """검색어 임베딩 (캐시 우선). 같은 검색어에 대해 API를 반복 호출하지 않는다."""
+        text = (text or '').strip()
+        if not text:
             return None
+        key = 'emb:q:' + hashlib.sha1(f"{self.model}:{text}".encode('utf-8')).hexdigest()
+        embedding = cache.get(key)
+        metrics.record_cache('query_embedding', embedding is not None)
+        if embedding is None:
+            embedding = self.get_embedding(text)
+            if embedding:
+                cache.set(key, embedding, timeout)
+        return embedding
     
-    def generate_product_embeddings(self, product):
-        """상품 정보로부터 임베딩 생성"""
-        # 상품명 + 브랜드 + 카테고리 조합
+    @staticmethod
+    def embedding_texts(product):
+        """임베딩 입력 텍스트: (상품명 + 브랜드 + 카테고리, 리뷰 요약)"""
         name_text = f"{product.name} {product.brand} {product.category}"
-        
-        # 리뷰 요약 텍스트
         reviews = product.get_reviews_list()
         review_comments = [r.get('comment', '') for r in reviews[:5]]  # 상위 5개 리뷰
         review_text = " ".join(review_comments) if review_comments else name_text
-        
-        # 임베딩 생성
+        return name_text, review_text
+
+    def generate_product_embeddings(self, product):
+        """상품 정보로부터 임베딩 생성"""
+        name_text, review_text = self.embedding_texts(product)
         name_embedding = self.get_embedding(name_text)
         description_embedding = self.get_embedding(review_text)
-        
         return name_embedding, description_embedding
-    
+
+    def update_product_embeddings(self, product, force=False):
+        """상품 임베딩을 생성해 저장. 'updated' | 'unchanged' | 'failed' 반환
+        force가 아니면 입력 텍스트가 지난번과 같고 임베딩이 있을 때 API를 호출하지 않음
+        """
+        from shop.models import VECTOR_AVAILABLE
+
+        name_text, review_text = self.embedding_texts(product)
+        text_hash = hashlib.sha1(f"{self.model}\n{name_text}\n{review_text}".encode('utf-8')).hexdigest()
+        if not force and product.embedding_text_hash == text_hash and product.name_embedding is not None:
+            return 'unchanged'
+
+        name_embedding = self.get_embedding(name_text)
+        description_embedding = self.get_embedding(review_text)
+        if not (name_embedding and description_embedding):
+            return 'failed'
+        if VECTOR_AVAILABLE:
+            product.name_embedding = name_embedding
+            product.description_embedding = description_embedding
+        else:
+            # SQLite의 경우 JSON 문자열로 저장
+            product.name_embedding = json.dumps(name_embedding)
+            product.description_embedding = json.dumps(description_embedding)
+        product.embedding_text_hash = text_hash
+        product.embedding_updated_at = timezone.now()
+        product.save(update_fields=['name_embedding', 'description_embedding', 'embedding_text_hash',
+                                    'embedding_updated_at'])
+        return 'updated'
+
     def cosine_similarity(self, vec1, vec2):
         """코사인 유사도 계산"""
         if isinstance(vec1, str):
@@ -49,95 +169,190 @@ class OpenAIEmbeddingGenerator:
         
         return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
     
-    def search_similar_products(self, query, limit=5, exclude_ids=None, affiliated_only=False, categories=None):
+    def search_similar_products(self, query, limit=5, exclude_ids=None, affiliated_only=False, categories=None,
+                                classification=None):
         """벡터 유사도 기반 상품 검색
         - affiliated_only: 제휴 상품만
         - categories: 카테고리 제한(list[str])
+        - classification: 상위 분류 제한
         """
-        from shop.models import Product
-        
-        query_embedding = self.get_embedding(query)
+        query_embedding = self.get_query_embedding(query)
         if not query_embedding:
             return []
-        
-        # PostgreSQL + pgvector 사용 여부 확인
-        try:
-            from pgvector.django import VectorField
-            return self._search_with_pgvector(query_embedding, limit, exclude_ids, affiliated_only, categories)
-        except ImportError:
-            return self._search_with_python(query_embedding, limit, exclude_ids, affiliated_only, categories)
+        return self.search_by_embedding(query_embedding, limit, exclude_ids, affiliated_only, categories, classification)
+
+    def search_by_embedding(self, query_embedding, limit=5, exclude_ids=None, affiliated_only=False, categories=None,
+                            classification=None, description_embedding=None, weights=None):
+        """이미 계산된 임베딩으로 검색 (PostgreSQL + pgvector 사용 가능 시 DB에서, 아니면 Python에서)
+        - description_embedding이 주어지면 name/description 두 벡터의 가중합으로 점수화(멀티 벡터)
+        - weights: (name 가중치, description 가중치), 기본값은 RECOMMEND_*_WEIGHT 설정
+        - 읽기 복제본이 있으면 복제본에서, 없으면 직접 연결(direct)에서 실행 (풀러 경유 X)
+        """
+        with use_direct(read_only=True):
+            if description_embedding is not None:
+                weights = weights or (settings.RECOMMEND_NAME_WEIGHT, settings.RECOMMEND_DESCRIPTION_WEIGHT)
+                if pgvector_enabled():
+                    return self._multi_search_with_pgvector(query_embedding, description_embedding, weights, limit,
+                                                            exclude_ids, affiliated_only, categories, classification)
+                return self._multi_search_with_python(query_embedding, description_embedding, weights, limit,
+                                                      exclude_ids, affiliated_only, categories, classification)
+            if pgvector_enabled():
+                return self._search_with_pgvector(query_embedding, limit, exclude_ids, affiliated_only, categories,
+                                                  classification)
+            return self._search_with_python(query_embedding, limit, exclude_ids, affiliated_only, categories,
+                                            classification)
     
-    def _search_with_pgvector(self, query_embedding, limit, exclude_ids, affiliated_only=False, categories=None):
-        """PostgreSQL pgvector 확장 사용"""
-        from shop.models import Product
-        
-        with connection.cursor() as cursor:
-            where_clauses = ["name_embedding IS NOT NULL"]
-            params = []
-            
-            if affiliated_only:
-                where_clauses.append("if_affiliated = true")
-            
-            if categories:
-                where_clauses.append(f"category = ANY(%s)")
-                params.append(categories)
-            
-            if exclude_ids:
-                where_clauses.append(f"id <> ALL(%s)")
-                params.append(exclude_ids)
-            
-            where_sql = " AND ".join(where_clauses)
-            
-            # query_embedding 파라미터 2회 사용(정렬과 선택)
-            params = [query_embedding] + params + [query_embedding, limit]
-            
+    def _search_with_pgvector(self, query_embedding, limit, exclude_ids, affiliated_only=False, categories=None,
+                              classification=None):
+        """PostgreSQL pgvector 확장 사용 (필터 선택도에 따라 검색 전략 선택)
+        - 필터 없음: HNSW 인덱스 근접 탐색
+        - 필터에 맞는 상품이 적음(VECTOR_EXACT_SCAN_THRESHOLD 이하): B-tree 필터 후 정확한 거리 정렬
+        - 그 외: HNSW 반복 스캔(pgvector 0.8+) 또는 적응형 over-fetch 후 필터, 부족하면 정확 검색으로 보충
+        """
+        query = [float(v) for v in query_embedding]
+        filtered = bool(affiliated_only or categories or exclude_ids or classification)
+
+        alias = direct_alias()
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            if not filtered:
+                rows = self._pgvector_ann(cursor, query, limit)
+            else:
+                matching, total = self._bucket_counts(affiliated_only, categories, classification)
+                rows = []
+                if matching > settings.VECTOR_EXACT_SCAN_THRESHOLD:
+                    rows = self._pgvector_filtered_ann(
+                        cursor, query, limit, exclude_ids, affiliated_only, categories, classification,
+                        matching, total,
+                    )
+                if len(rows) < min(limit, matching):
+                    rows = self._pgvector_exact(cursor, query, limit, exclude_ids, affiliated_only, categories,
+                                                classification)
+
+        return [
+            {
+                'id': row[0],
+                'name': row[1],
+                'brand': row[2],
+                'price': row[3],
+                'if_affiliated': row[4],
+                'img': row[5],
+                'category': row[6],
+                'similarity_score': max(0, 1 - row[7])  # 거리를 유사도로 변환
+            }
+            for row in rows
+        ]
+
+    _SELECT_COLUMNS = "id, name, brand, price, if_affiliated, img, category"
+
+    def _pgvector_ann(self, cursor, query, limit):
+        """필터 없는 HNSW 근접 탐색"""
+        cursor.execute(f"""
+            SELECT {self._SELECT_COLUMNS}, (name_embedding <-> %s::vector) AS distance
+            FROM shop_product
+            WHERE name_embedding IS NOT NULL
+            ORDER BY name_embedding <-> %s::vector
+            LIMIT %s
+        """, [query, query, limit])
+        return cursor.fetchall()
+
+    def _pgvector_exact(self, cursor, query, limit, exclude_ids, affiliated_only, categories, classification):
+        """필터 적용 후 정확한 거리 정렬 (ORDER BY 식을 바꿔 HNSW 대신 B-tree 필터 경로를 타게 함)"""
+        where_sql, params = self._filter_sql(affiliated_only, categories, exclude_ids, classification)
+        cursor.execute(f"""
+            SELECT {self._SELECT_COLUMNS}, (name_embedding <-> %s::vector) AS distance
+            FROM shop_product
+            WHERE {where_sql}
+            ORDER BY (name_embedding <-> %s::vector) + 0
+            LIMIT %s
+        """, [query] + params + [query, limit])
+        return cursor.fetchall()
+
+    def _pgvector_filtered_ann(self, cursor, query, limit, exclude_ids, affiliated_only, categories, classification,
+                               matching, total):
+        """필터가 넓을 때의 인덱스 검색.
+        pgvector 0.8+는 hnsw.iterative_scan으로 필터를 만족할 때까지 인덱스를 이어서 스캔하고,
+        그 이전 버전은 선택도(matching/total)로 정한 배수만큼 후보를 더 가져와 필터한 뒤 부족하면 배수를 늘린다.
+        """
+        where_sql, params = self._filter_sql(affiliated_only, categories, exclude_ids, classification)
+        if _pgvector_version(cursor) >= (0, 8):
+            cursor.execute("SET LOCAL hnsw.iterative_scan = strict_order")
+            cursor.execute("SET LOCAL hnsw.ef_search = %s" % max(40, min(1000, limit * 4)))
             cursor.execute(f"""
-                SELECT id, name, brand, price, if_affiliated, img, category,
-                       (name_embedding <-> %s::vector) as distance
-                FROM shop_product 
+                SELECT {self._SELECT_COLUMNS}, (name_embedding <-> %s::vector) AS distance
+                FROM shop_product
                 WHERE {where_sql}
                 ORDER BY name_embedding <-> %s::vector
                 LIMIT %s
-            """, params)
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'brand': row[2], 
-                    'price': row[3],
-                    'if_affiliated': row[4],
-                    'img': row[5],
-                    'category': row[6],
-                    'similarity_score': max(0, 1 - row[7])  # 거리를 유사도로 변환
-                })
-            
-            return results
-    
-    def _search_with_python(self, query_embedding, limit, exclude_ids, affiliated_only=False, categories=None):
-        """Python 기반 유사도 검색 (SQLite 호환)"""
+            """, [query] + params + [query, limit])
+            return cursor.fetchall()
+
+        # 선택도의 역수 x2 만큼 over-fetch, 부족하면 4배씩 늘림
+        factor = max(2, math.ceil(2 * total / max(1, matching)))
+        while True:
+            candidates = limit * factor + len(exclude_ids or [])
+            cursor.execute("SET LOCAL hnsw.ef_search = %s" % max(40, min(1000, candidates)))
+            cursor.execute(f"""
+                SELECT {self._SELECT_COLUMNS}, distance
+                FROM (
+                    SELECT {self._SELECT_COLUMNS}, classification, name_embedding,
+                           (name_embedding <-> %s::vector) AS distance
+                    FROM shop_product
+                    WHERE name_embedding IS NOT NULL
+                    ORDER BY name_embedding <-> %s::vector
+                    LIMIT %s
+                ) candidates
+                WHERE {where_sql}
+                ORDER BY distance
+                LIMIT %s
+            """, [query, query, candidates] + params + [limit])
+            rows = cursor.fetchall()
+            if len(rows) >= limit or candidates >= total:
+                return rows
+            factor *= 4
+
+    @staticmethod
+    def _bucket_counts(affiliated_only=False, categories=None, classification=None):
+        """(classification, category, if_affiliated) 버킷별 상품 수로 필터 선택도 추정. (일치 수, 전체 수)"""
+        buckets = cache.get('vector:bucket_counts')
+        if buckets is None:
+            with connections[direct_alias()].cursor() as cursor:
+                cursor.execute("""
+                    SELECT classification, category, if_affiliated, count(*)
+                    FROM shop_product
+                    WHERE name_embedding IS NOT NULL
+                    GROUP BY classification, category, if_affiliated
+                """)
+                buckets = cursor.fetchall()
+            cache.set('vector:bucket_counts', buckets, 60)
+        cats = set(categories) if categories else None
+        matching = sum(
+            n for cls_name, cat, aff, n in buckets
+            if (not affiliated_only or aff)
+            and (cats is None or cat in cats)
+            and (not classification or cls_name == classification)
+        )
+        return matching, sum(b[3] for b in buckets)
+
+    def _search_with_python(self, query_embedding, limit, exclude_ids, affiliated_only=False, categories=None,
+                            classification=None):
+        """Python 기반 유사도 검색 (SQLite 호환) — 필터에 맞는 버킷만 스캔하는 인메모리 인덱스 사용"""
+        from .vector_index import get_vector_index
+
+        hits = get_vector_index().search(query_embedding, limit, exclude_ids, affiliated_only, categories,
+                                         classification)
+        return self._hydrate(hits)
+
+    @staticmethod
+    def _hydrate(hits):
+        """[(product_id, score)] → 결과 dict 목록 (상품 정보는 PK 조회 한 번)"""
         from shop.models import Product
-        
-        products = Product.objects.exclude(name_embedding__isnull=True)
-        if affiliated_only:
-            products = products.filter(if_affiliated=True)
-        if categories:
-            products = products.filter(category__in=categories)
-        if exclude_ids:
-            products = products.exclude(id__in=exclude_ids)
-        
-        similarities = []
-        for product in products:
-            if product.name_embedding:
-                similarity = self.cosine_similarity(query_embedding, product.name_embedding)
-                similarities.append((product, similarity))
-        
-        # 유사도 순으로 정렬
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
+
+        products = Product.objects.in_bulk([pid for pid, _ in hits])
         results = []
-        for product, similarity in similarities[:limit]:
+        for pid, score in hits:
+            product = products.get(pid)
+            if product is None:
+                continue
             results.append({
                 'id': product.id,
                 'name': product.name,
@@ -146,20 +361,133 @@ class OpenAIEmbeddingGenerator:
                 'if_affiliated': product.if_affiliated,
                 'img': product.img,
                 'category': product.category,
-                'similarity_score': similarity
+                'similarity_score': score,
             })
-        
         return results
 
-    def recommend_for_products(self, product_ids, limit=8, affiliated_only=True, use_categories=True):
+    @staticmethod
+    def _filter_sql(affiliated_only=False, categories=None, exclude_ids=None, classification=None):
+        """pgvector 검색 공통 WHERE 절과 파라미터"""
+        where_clauses = ["name_embedding IS NOT NULL"]
+        params = []
+        if affiliated_only:
+            where_clauses.append("if_affiliated = true")
+        if classification:
+            where_clauses.append("classification = %s")
+            params.append(classification)
+        if categories:
+            where_clauses.append("category = ANY(%s)")
+            params.append(categories)
+        if exclude_ids:
+            where_clauses.append("id <> ALL(%s)")
+            params.append(exclude_ids)
+        return " AND ".join(where_clauses), params
+
+    def _multi_search_with_pgvector(self, name_query, description_query, weights, limit, exclude_ids,
+                                    affiliated_only=False, categories=None, classification=None):
+        """name/description 코사인 유사도 가중합 검색 (단일 벡터 검색과 같은 선택도 기반 전략)
+        - 필터에 맞는 상품이 적음(VECTOR_EXACT_SCAN_THRESHOLD 이하): B-tree 필터 후 전체를 가중합으로 정렬
+        - 그 외: HNSW 인덱스가 있는 name 벡터로 limit × VECTOR_RESCORE_FACTOR개 후보를 뽑고
+          (필터가 있으면 반복 스캔/over-fetch) 후보만 가중합으로 재정렬. 부족하면 정확 검색으로 보충
+        """
+        name_q = [float(v) for v in name_query]
+        desc_q = [float(v) for v in description_query]
+        filtered = bool(affiliated_only or categories or exclude_ids or classification)
+        candidates = limit * settings.VECTOR_RESCORE_FACTOR
+
+        alias = direct_alias()
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            if not filtered:
+                ids = [row[0] for row in self._pgvector_ann(cursor, name_q, candidates)]
+                rows = self._pgvector_weighted(cursor, name_q, desc_q, weights, limit, "id = ANY(%s)", [ids])
+            else:
+                matching, total = self._bucket_counts(affiliated_only, categories, classification)
+                rows = []
+                if matching > settings.VECTOR_EXACT_SCAN_THRESHOLD:
+                    ids = [row[0] for row in self._pgvector_filtered_ann(
+                        cursor, name_q, candidates, exclude_ids, affiliated_only, categories, classification,
+                        matching, total,
+                    )]
+                    rows = self._pgvector_weighted(cursor, name_q, desc_q, weights, limit, "id = ANY(%s)", [ids])
+                if len(rows) < min(limit, matching):
+                    where_sql, params = self._filter_sql(affiliated_only, categories, exclude_ids, classification)
+                    rows = self._pgvector_weighted(cursor, name_q, desc_q, weights, limit, where_sql, params)
+
+        return [
+            {
+                'id': row[0],
+                'name': row[1],
+                'brand': row[2],
+                'price': row[3],
+                'if_affiliated': row[4],
+                'img': row[5],
+                'category': row[6],
+                'similarity_score': float(row[7]),
+            }
+            for row in rows
+        ]
+
+    def _pgvector_weighted(self, cursor, name_q, desc_q, weights, limit, where_sql, where_params):
+        """WHERE에 맞는 상품을 name/description 코사인 유사도 가중합으로 정렬 (description 없으면 name 유사도로 대체)"""
+        cursor.execute(f"""
+            SELECT {self._SELECT_COLUMNS}, score
+            FROM (
+                SELECT {self._SELECT_COLUMNS},
+                       %s * (1 - (name_embedding <=> %s::vector))
+                       + %s * COALESCE(1 - (description_embedding <=> %s::vector),
+                                       1 - (name_embedding <=> %s::vector)) AS score
+                FROM shop_product
+                WHERE {where_sql}
+            ) scored
+            ORDER BY score DESC
+            LIMIT %s
+        """, [weights[0], name_q, weights[1], desc_q, name_q] + where_params + [limit])
+        return cursor.fetchall()
+
+    def _multi_search_with_python(self, name_query, description_query, weights, limit, exclude_ids,
+                                  affiliated_only=False, categories=None, classification=None):
+        """NumPy 멀티 벡터 검색: 필터 버킷의 name/description 행렬로 유사도 가중합 계산"""
+        from .vector_index import get_vector_index
+
+        hits = get_vector_index().search(name_query, limit, exclude_ids, affiliated_only, categories, classification,
+                                         description_query=description_query, weights=weights)
+        return self._hydrate(hits)
+
+    @staticmethod
+    def _mean_vector(vectors):
+        """정규화 벡터들의 평균 (장바구니 집합 임베딩)"""
+        matrix = np.vstack(vectors)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        return matrix.mean(axis=0)
+
+    def recommend_for_products(self, product_ids, limit=8, affiliated_only=True, use_categories=True, weights=None):
         """장바구니 상품들로부터 집합 임베딩을 구성해 유사 상품 추천.
         - 장바구니 상품은 제외, 기본적으로 제휴 상품만 대상으로 함.
         - 카테고리 제한 옵션(use_categories) 제공.
+        - 저장된 name/description 임베딩 평균으로 멀티 벡터 검색 (추가 API 호출 없음)
+        - 저장된 임베딩이 없으면 상품명 + 리뷰 텍스트를 임베딩해 검색
         """
         from shop.models import Product
         items = list(Product.objects.filter(id__in=product_ids))
         if not items:
             return []
+        cats = list({p.category for p in items}) if use_categories else None
+
+        name_vecs = [v for v in (to_vector(p.name_embedding) for p in items) if v is not None]
+        if name_vecs:
+            desc_vecs = [v for v in (to_vector(p.description_embedding) for p in items) if v is not None]
+            name_query = self._mean_vector(name_vecs)
+            description_query = self._mean_vector(desc_vecs) if desc_vecs else name_query
+            return self.search_by_embedding(
+                name_query,
+                limit=limit,
+                exclude_ids=product_ids,
+                affiliated_only=affiliated_only,
+                categories=cats,
+                description_embedding=description_query,
+                weights=weights,
+            )
+
         # 쿼리 텍스트: 이름/브랜드/카테고리 + 리뷰 요약 일부를 합침
         parts = []
         for p in items:
@@ -173,7 +501,6 @@ class OpenAIEmbeddingGenerator:
             except Exception:
                 pass
         query_text = " | ".join(parts)
-        cats = list({p.category for p in items}) if use_categories else None
         return self.search_similar_products(
             query=query_text,
             limit=limit,
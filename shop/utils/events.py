@@ -0,0 +1,203 @@
+"""참여자 행동 로그 수집 (요청 경로는 메모리 링 버퍼에 추가만, 저장은 백그라운드 일괄 처리)
+
+- record_event(): 요청 처리 중 호출. 버퍼에 dict를 넣고 바로 반환 (DB 접근 없음)
+- 플러셔 스레드: EVENTS_FLUSH_INTERVAL초마다 또는 버퍼가 EVENTS_BATCH_SIZE개 이상 쌓이면 bulk_create
+- 버퍼가 EVENTS_BUFFER_SIZE를 넘으면 가장 오래된 이벤트부터 버리고 shop_events_dropped_total 증가
+- 저장이 MAX_FLUSH_RETRIES번 실패하면 한 건씩 저장해 문제 있는 이벤트만 버림 (한 클라이언트가 배치 전체를 날리지 않도록)
+- 프로세스 종료 시(atexit) 남은 이벤트 저장
+
+gunicorn 워커마다 버퍼와 플러셔가 하나씩 생긴다.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENTS_RECORDED = metrics.counter('shop_events_total', '수집된 참여자 이벤트 수 (kind별)')
+EVENTS_DROPPED = metrics.counter('shop_events_dropped_total', '버퍼 초과로 버려진 이벤트 수')
+EVENTS_FLUSH_SECONDS = metrics.histogram('shop_events_flush_seconds', '이벤트 일괄 저장 시간')
+
+# 클라이언트(/api/events/)에서 직접 보낼 수 있는 이벤트 종류
+CLIENT_EVENT_KINDS = {'reco_click'}
+MAX_FLUSH_RETRIES = 3
+# Event.rank(PositiveSmallIntegerField) / Event.product_id(IntegerField) 범위
+MAX_RANK = 32767
+MAX_PRODUCT_ID = 2 ** 31 - 1
+
+
+class EventBuffer:
+    """고정 크기 링 버퍼 + 백그라운드 플러셔"""
+
+    def __init__(self, capacity, batch_size, interval):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval = interval
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._failures = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def append(self, item):
+        with self._lock:
+            if len(self._items) >= self.capacity:
+                self._items.popleft()
+                EVENTS_DROPPED.inc()
+            self._items.append(item)
+            full = len(self._items) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        self._ensure_thread()
+
+    def _drain(self):
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+        return items
+
+    def _requeue(self, items):
+        """저장 실패분을 버퍼 앞쪽에 되돌림 (용량 초과분은 버림)"""
+        with self._lock:
+            room = self.capacity - len(self._items)
+            keep = items[-room:] if room > 0 else []
+            dropped = len(items) - len(keep)
+            self._items.extendleft(reversed(keep))
+        if dropped:
+            EVENTS_DROPPED.inc(dropped)
+
+    @staticmethod
+    def _existing_participants(items):
+        """세션에 남은 참여자 ID 중 지워진 참여자는 None으로 (외래키 오류로 배치가 실패하지 않도록)"""
+        from shop.models import Participant
+
+        ids = {item['participant_id'] for item in items if item.get('participant_id') is not None}
+        if not ids:
+            return items
+        existing = set(Participant.objects.filter(id__in=ids).values_list('id', flat=True))
+        return [
+            item if item.get('participant_id') in existing or item.get('participant_id') is None
+            else {**item, 'participant_id': None}
+            for item in items
+        ]
+
+    def _save_each(self, items):
+        """한 건씩 저장하고 실패한 이벤트만 버림. 저장한 개수 반환"""
+        from shop.models import Event
+
+        saved = 0
+        for item in items:
+            try:
+                with transaction.atomic():
+                    Event.objects.create(**item)
+            except Exception as exc:
+                logger.error('이벤트 저장 실패, 버림: %s (%s)', item, exc)
+                EVENTS_DROPPED.inc()
+            else:
+                saved += 1
+        return saved
+
+    def flush(self):
+        """버퍼의 이벤트를 bulk_create로 저장. 저장한 개수 반환"""
+        from shop.models import Event
+
+        with self._flush_lock:
+            items = self._drain()
+            if not items:
+                return 0
+            started = time.perf_counter()
+            try:
+                items = self._existing_participants(items)
+                Event.objects.bulk_create([Event(**item) for item in items], batch_size=self.batch_size)
+            except Exception:
+                self._failures += 1
+                if self._failures < MAX_FLUSH_RETRIES:
+                    logger.exception('이벤트 %d건 저장 실패, 다음 주기에 재시도', len(items))
+                    self._requeue(items)
+                    return 0
+                # 같은 배치가 계속 실패하면(범위를 벗어난 값 등) 한 건씩 저장해 문제 있는 이벤트만 버림
+                logger.exception('이벤트 %d건 일괄 저장 %d회 실패, 한 건씩 저장', len(items), self._failures)
+                self._failures = 0
+                return self._save_each(items)
+            finally:
+                EVENTS_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            self._failures = 0
+            return len(items)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='event-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # 플러셔 스레드의 DB 연결은 주기 사이에 유지하지 않음
+                connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = EventBuffer(
+                    settings.EVENTS_BUFFER_SIZE, settings.EVENTS_BATCH_SIZE, settings.EVENTS_FLUSH_INTERVAL,
+                )
+                atexit.register(_flush_at_exit)
+    return _buffer
+
+
+def _flush_at_exit():
+    try:
+        if _buffer is not None:
+            _buffer.flush()
+    finally:
+        connection.close()
+
+
+def record_event(request, kind, product_id=None, source='', rank=None, **payload):
+    """요청 세션의 참여자 기준으로 이벤트 1건 기록 (버퍼에 추가만 하고 즉시 반환)"""
+    if not settings.EVENTS_ENABLED:
+        return
+    session = getattr(request, 'session', None)
+    get_buffer().append({
+        'participant_id': session.get('participant_id') if session is not None else None,
+        'session_key': (session.session_key or '') if session is not None else '',
+        'kind': kind,
+        'product_id': product_id,
+        'source': source[:30],
+        'rank': rank,
+        'payload': payload,
+        'created_at': timezone.now(),
+    })
+    EVENTS_RECORDED.inc(kind=kind)
+
+
+def flush_events():
+    """버퍼에 남은 이벤트를 즉시 저장 (테스트/관리 명령용)"""
+    return get_buffer().flush()
@@ -0,0 +1,43 @@
+"""내보내기 명령 공용 도우미 (날짜 인자 파싱, gzip/표준출력 대상 열기)"""
+import gzip
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_when(value, end=False):
+    """YYYY-MM-DD 또는 ISO 시각 → aware datetime (날짜만 주면 end=True일 때 다음 날 0시)"""
+    if not value:
+        return None
+    try:
+        # parse_datetime()도 날짜만 있는 문자열을 0시로 받아들이므로 날짜 형식을 먼저 확인
+        d = parse_date(value) if len(value) == 10 else None
+        dt = datetime(d.year, d.month, d.day) if d else parse_datetime(value)
+    except ValueError:
+        dt = d = None
+    if dt is None:
+        raise CommandError(f"날짜 형식 오류: {value}")
+    if d and end:
+        dt += timedelta(days=1)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+@contextmanager
+def open_output(path, compress=False, stdout=None):
+    """텍스트 출력 대상. path가 '-'면 stdout(명령의 self.stdout), compress이거나 .gz로 끝나면 gzip"""
+    if path == '-':
+        if compress:
+            raise CommandError("표준출력('-')에는 --gzip을 쓸 수 없습니다. .gz 경로를 지정하세요")
+        yield stdout
+        return
+    if compress or path.endswith('.gz'):
+        f = gzip.open(path, 'wt', encoding='utf-8', newline='')
+    else:
+        f = open(path, 'w', encoding='utf-8', newline='')
+    with f:
+        yield f
@@ -0,0 +1,195 @@
+"""상품 목록 패싯 필터용 인메모리 비트셋 인덱스
+
+상품을 id 순으로 0..N-1 위치에 놓고, 패싯 값마다 "그 값을 가진 상품 위치" 비트셋(파이썬 int)을 만든다.
+- 결과: 선택한 패싯들의 비트셋 AND (같은 패싯 안의 여러 값은 OR)
+- 패싯별 건수: 자기 패싯을 뺀 나머지 선택의 AND에 값별 비트셋을 AND 해 bit_count() (선택을 바꿨을 때의 건수)
+- 검색어(q): 이름/브랜드/카테고리 부분일치(lexical_filter와 같은 규칙)를 메모리에서 계산해 비트셋으로 캐시
+따라서 패싯을 눌러도 DB는 최종 페이지 상품 카드 조회 한 번만 사용한다.
+카탈로그 버전(변경 시각 포함)이 바뀌면(임포트 등) 다음 조회 때 다시 만든다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.conf import settings
+
+from . import metrics
+
+FACET_BUILD_SECONDS = metrics.gauge('shop_facet_index_build_seconds', '패싯 인덱스 마지막 구성 시간')
+FACET_INDEX_SIZE = metrics.gauge('shop_facet_index_products', '패싯 인덱스 상품 수')
+
+DIMENSIONS = ('classification', 'category', 'brand', 'price', 'affiliated')
+AFFILIATED = '1'
+TEXT_CACHE_SIZE = 256
+
+
+def price_buckets():
+    """[(key, 라벨, 하한, 상한 미만|None)] — FACET_PRICE_BOUNDS 경계로 나눈 가격대"""
+    bounds = [0, *settings.FACET_PRICE_BOUNDS]
+    buckets = []
+    for low, high in zip(bounds, [*bounds[1:], None]):
+        if high is None:
+            label = f'{low:,}원 이상'
+        elif low == 0:
+            label = f'{high:,}원 미만'
+        else:
+            label = f'{low:,}~{high:,}원'
+        buckets.append((f"{low}-{high if high is not None else ''}", label, low, high))
+    return buckets
+
+
+def _bucket_key(price, buckets):
+    for key, _, low, high in buckets:
+        if price >= low and (high is None or price < high):
+            return key
+    return buckets[0][0]  # 음수 가격
+
+
+@dataclass
+class FacetResult:
+    ids: list  # 정렬된 결과 상품 ID
+    counts: dict = field(default_factory=dict)  # {패싯: [(값, 라벨, 건수, 선택 여부)]}
+
+    @property
+    def total(self):
+        return len(self.ids)
+
+
+class FacetIndex:
+
+    def __init__(self, version, ids):
+        self.version = version
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.positions = {pid: pos for pos, pid in enumerate(ids)}
+        self.size = len(ids)
+        self.all = (1 << self.size) - 1
+        self.bitsets = {dim: {} for dim in DIMENSIONS}
+        self.labels = {'price': {key: label for key, label, _, _ in price_buckets()}, 'affiliated': {AFFILIATED: '제휴'}}
+        self._texts = []
+        self._text_masks = OrderedDict()
+        self._text_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, version=None):
+        from shop.models import Product
+
+        rows = list(
+            Product.objects.order_by('id')
+            .values_list('id', 'classification', 'category', 'brand', 'price', 'if_affiliated', 'name')
+        )
+        index = cls(version, [row[0] for row in rows])
+        buckets = price_buckets()
+        values = {dim: {} for dim in DIMENSIONS}
+        for pos, (_, classification, category, brand, price, affiliated, name) in enumerate(rows):
+            for dim, value in (
+                ('classification', classification), ('category', category), ('brand', brand),
+                ('price', _bucket_key(price, buckets)), ('affiliated', AFFILIATED if affiliated else None),
+            ):
+                if value:
+                    values[dim].setdefault(value, []).append(pos)
+            index._texts.append('\0'.join((name, brand, category)).casefold())
+        for dim, by_value in values.items():
+            index.bitsets[dim] = {value: index._mask(positions) for value, positions in by_value.items()}
+        return index
+
+    def _mask(self, selector):
+        """위치 목록 또는 bool 배열 → 비트셋"""
+        bits = np.zeros(self.size, dtype=bool)
+        bits[selector] = True
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    def text_mask(self, q):
+        """이름/브랜드/카테고리에 q가 포함된 상품 비트셋 (최근 TEXT_CACHE_SIZE개 검색어 캐시)"""
+        needle = q.casefold()
+        with self._text_lock:
+            if needle in self._text_masks:
+                self._text_masks.move_to_end(needle)
+                return self._text_masks[needle]
+        mask = self._mask(np.fromiter((needle in text for text in self._texts), dtype=bool, count=self.size))
+        with self._text_lock:
+            self._text_masks[needle] = mask
+            while len(self._text_masks) > TEXT_CACHE_SIZE:
+                self._text_masks.popitem(last=False)
+        return mask
+
+    def _dimension_mask(self, dim, selected):
+        mask = 0
+        for value in selected:
+            mask |= self.bitsets[dim].get(value, 0)
+        return mask
+
+    def positions_of(self, mask):
+        """비트셋 → 오름차순 위치 배열"""
+        if not mask:
+            return np.empty(0, dtype=np.int64)
+        raw = np.frombuffer(mask.to_bytes((self.size + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder='little')[:self.size])
+
+    def search(self, selected, q=None, affiliated_first=False, base=None):
+        """selected: {패싯: 값 목록}. 결과 ID와 패싯별 건수를 한 번에 계산
+        base: 후보 비트셋 (하이브리드 검색 결과 — mask_of). 없으면 q 부분일치 또는 전체
+        """
+        masks = {dim: self._dimension_mask(dim, values) for dim, values in selected.items() if values}
+        if base is None:
+            base = self.text_mask(q) if q else self.all
+
+        result = base
+        for mask in masks.values():
+            result &= mask
+
+        counts = {}
+        for dim in DIMENSIONS:
+            # 자기 패싯의 선택은 빼고 계산해야 같은 패싯의 다른 값으로 바꿨을 때 건수가 됨
+            others = base
+            for other, mask in masks.items():
+                if other != dim:
+                    others &= mask
+            chosen = set(selected.get(dim) or ())
+            counts[dim] = [
+                (value, self.labels.get(dim, {}).get(value, value), (others & bits).bit_count(), value in chosen)
+                for value, bits in self.bitsets[dim].items()
+            ]
+
+        if affiliated_first:
+            affiliated = self.bitsets['affiliated'].get(AFFILIATED, 0)
+            positions = np.concatenate([self.positions_of(result & affiliated), self.positions_of(result & ~affiliated)])
+        else:
+            positions = self.positions_of(result)
+        return FacetResult(ids=self.ids[positions].tolist(), counts=counts)
+
+    def values_within(self, dim, parent_dim, parent_value):
+        """parent_dim=parent_value인 상품이 가진 dim 값 목록 (처음 나오는 상품 id 순)"""
+        parent = self.bitsets[parent_dim].get(parent_value, 0)
+        return [value for value, bits in self.bitsets[dim].items() if bits & parent]
+
+    def mask_of(self, product_ids):
+        """상품 ID 목록 → 비트셋 (인덱스에 없는 ID는 무시)"""
+        return self._mask([self.positions[pid] for pid in product_ids if pid in self.positions])
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_facet_index():
+    """프로세스 공유 인덱스. 카탈로그 상태(CATALOG_VERSION_TTL 캐시)가 바뀌었으면 재구성"""
+    global _index
+    from .catalog import catalog_state
+
+    version = catalog_state()
+    if _index is not None and _index.version == version:
+        return _index
+    with _lock:
+        if _index is None or _index.version != version:
+            started = time.perf_counter()
+            _index = FacetIndex.build(version)
+            FACET_BUILD_SECONDS.set(round(time.perf_counter() - started, 4))
+            FACET_INDEX_SIZE.set(_index.size)
+        return _index
+
+
+def invalidate_facet_index():
+    global _index
+    _index = None
@@ -0,0 +1,63 @@
+"""카탈로그에서 파생된 GET API용 HTTP 캐시 (ETag/Last-Modified, 304, Cache-Control)
+
+응답은 카탈로그 버전과 쿼리 파라미터만으로 결정되므로, 이 둘로 ETag를 만들어
+브라우저 재검증(If-None-Match)에는 뷰를 실행하지 않고 304를 돌려준다.
+세션/CSRF 쿠키를 건드리지 않아야 nginx proxy_cache와 브라우저가 공유 캐시로 저장할 수 있다.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .catalog import catalog_state
+
+
+def rotation_bucket(seconds):
+    """seconds 단위로 바뀌는 시간 구간 번호 (주기적으로 바뀌는 응답의 난수 시드/ETag용)"""
+    return int(time.time() // seconds)
+
+
+def catalog_conditional(max_age=None, rotate_seconds=None):
+    """카탈로그 파생 JSON API 데코레이터
+    - ETag: 카탈로그 버전 + 정렬된 쿼리 파라미터 (+ rotate_seconds 구간)
+    - Last-Modified: 카탈로그 마지막 변경 시각 (회전 응답이면 현재 구간 시작 시각과 비교해 늦은 쪽)
+    - Cache-Control: public, max-age (기본 settings.API_CACHE_MAX_AGE)
+    """
+
+    def etag_func(request, *args, **kwargs):
+        version, _ = catalog_state()
+        key = [version, sorted(request.GET.lists())]
+        if rotate_seconds:
+            key.append(rotation_bucket(rotate_seconds))
+        raw = json.dumps(key, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def last_modified_func(request, *args, **kwargs):
+        _, updated_at = catalog_state()
+        if rotate_seconds:
+            started = datetime.fromtimestamp(rotation_bucket(rotate_seconds) * rotate_seconds, tz=dt_timezone.utc)
+            return max(updated_at, started) if updated_at else started
+        return updated_at
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                age = settings.API_CACHE_MAX_AGE if max_age is None else max_age
+                if rotate_seconds:
+                    age = min(age, rotate_seconds - int(time.time()) % rotate_seconds)
+                patch_cache_control(response, public=True, max_age=age)
+                patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,160 @@
+"""상품 이미지(Product.img 외부 URL) 로컬 썸네일 캐시
+
+원본을 한 번만 받아 THUMBNAIL_WIDTHS × THUMBNAIL_FORMATS 변형을 MEDIA_ROOT/thumbs/ 아래에 저장한다.
+경로: thumbs/<상품 ID>/<원본 URL 해시>-<너비>.<확장자>  (URL이 바뀌면 해시가 달라져 새로 생성)
+
+- fetch_product_images 명령: 미리 일괄 생성
+- {% product_image %} 템플릿 태그: 디스크에 있는 변형만 srcset으로 출력하고, 없는 변형은 작업 큐(build_thumbnails)에 등록
+  (요청 경로에서는 원본을 받지 않음 — 외부 이미지 서버가 느려도 gunicorn 워커를 잡지 않도록)
+- shop.views.product_thumbnail: 지워진 파일/오래된 페이지의 요청. 생성을 등록하고 원본 URL로 리다이렉트
+- 원본을 받지 못하면 thumbs/<상품 ID>/<해시>.failed를 남기고 THUMBNAIL_RETRY_SECONDS 동안 다시 시도하지 않음
+"""
+import hashlib
+import io
+import os
+import time
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import jobs, metrics
+
+# Pillow가 없으면 썸네일을 만들지 않고 원본 URL을 그대로 사용
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+THUMBNAILS_BUILT = metrics.counter('shop_thumbnails_total', '썸네일 생성 결과 (outcome=ok|fetch_error|decode_error)')
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+FORMATS = {ext: fmt for fmt, ext in EXTENSIONS.items()}
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+def thumbnails_enabled():
+    return PIL_AVAILABLE and settings.THUMBNAILS_ENABLED
+
+
+def url_digest(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+
+
+def thumb_name(product_id, img_url, width, fmt):
+    """MEDIA_ROOT 기준 상대 경로"""
+    return f"thumbs/{product_id}/{url_digest(img_url)}-{width}.{EXTENSIONS[fmt]}"
+
+
+def thumb_url(product_id, img_url, width, fmt='jpeg'):
+    return settings.MEDIA_URL + thumb_name(product_id, img_url, width, fmt)
+
+
+def srcset(product_id, img_url, fmt, widths=None):
+    widths = settings.THUMBNAIL_WIDTHS if widths is None else widths
+    return ', '.join(f"{thumb_url(product_id, img_url, w, fmt)} {w}w" for w in widths)
+
+
+def available_widths(product_id, img_url, fmt):
+    """이미 만들어진 변형의 너비 (THUMBNAIL_WIDTHS 순서)"""
+    root = Path(settings.MEDIA_ROOT)
+    return [w for w in settings.THUMBNAIL_WIDTHS if (root / thumb_name(product_id, img_url, w, fmt)).exists()]
+
+
+def failure_marker(product_id, img_url):
+    return Path(settings.MEDIA_ROOT) / f"thumbs/{product_id}/{url_digest(img_url)}.failed"
+
+
+def recently_failed(product_id, img_url):
+    """THUMBNAIL_RETRY_SECONDS 안에 원본을 받지 못한 적이 있으면 True"""
+    try:
+        failed_at = failure_marker(product_id, img_url).stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return time.time() - failed_at < settings.THUMBNAIL_RETRY_SECONDS
+
+
+def request_thumbnails(product_id, img_url):
+    """없는 변형 생성을 작업 큐에 등록. 최근 실패했거나 이미 등록했으면 건너뜀
+    (카드마다 매 렌더링 INSERT가 나가지 않도록 프로세스 캐시에 등록 여부를 잠시 기억)
+    """
+    if recently_failed(product_id, img_url):
+        return
+    if cache.add(f'thumbs-requested:{product_id}:{url_digest(img_url)}', True, settings.THUMBNAIL_RETRY_SECONDS):
+        jobs.enqueue_thumbnails(product_id)
+
+
+def fetch_image(url):
+    """원본 이미지 바이트 (http/https만, IMAGE_FETCH_MAX_BYTES 초과 시 실패)"""
+    if not url.lower().startswith(('http://', 'https://')):
+        raise ImageFetchError(f'지원하지 않는 URL: {url}')
+    request = urllib.request.Request(url, headers={'User-Agent': 'roopang-thumbnailer/1.0'})
+    limit = settings.IMAGE_FETCH_MAX_BYTES
+    try:
+        with urllib.request.urlopen(request, timeout=settings.IMAGE_FETCH_TIMEOUT) as response:
+            data = response.read(limit + 1)
+    except OSError as e:
+        raise ImageFetchError(f'{url}: {e}') from e
+    if len(data) > limit:
+        raise ImageFetchError(f'{url}: {limit}바이트 초과')
+    return data
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image  # 확대하지 않음 (작은 원본은 원래 크기로 저장)
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _save_atomic(path, image, fmt):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    image.save(tmp, format=fmt.upper(), quality=settings.THUMBNAIL_QUALITY, optimize=True)
+    os.replace(tmp, path)
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+
+def build_thumbnails(product_id, img_url, force=False):
+    """모든 변형을 생성하고 새로 만든 파일 수를 반환. 원본을 받지 못하면 ImageFetchError"""
+    root = Path(settings.MEDIA_ROOT)
+    targets = [
+        (width, fmt, root / thumb_name(product_id, img_url, width, fmt))
+        for width in settings.THUMBNAIL_WIDTHS
+        for fmt in settings.THUMBNAIL_FORMATS
+    ]
+    if not force:
+        targets = [t for t in targets if not t[2].exists()]
+    if not targets:
+        return 0
+
+    marker = failure_marker(product_id, img_url)
+    try:
+        data = fetch_image(img_url)
+    except ImageFetchError:
+        THUMBNAILS_BUILT.inc(outcome='fetch_error')
+        _touch(marker)
+        raise
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source.load()
+            image = source.convert('RGB')
+    except Exception as e:
+        THUMBNAILS_BUILT.inc(outcome='decode_error')
+        _touch(marker)
+        raise ImageFetchError(f'{img_url}: 이미지 해석 실패 ({e})') from e
+
+    for width, fmt, path in targets:
+        _save_atomic(path, _resize(image, width), fmt)
+    marker.unlink(missing_ok=True)
+    THUMBNAILS_BUILT.inc(len(targets), outcome='ok')
+    return len(targets)
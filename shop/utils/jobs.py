@@ -0,0 +1,284 @@
+"""DB 기반 백그라운드 작업 큐 (별도 브로커 없음)
+
+- enqueue(): 작업 등록. 같은 key의 대기 중 작업이 있으면 무시 (부분 유니크 인덱스)
+- claim(): 실행할 작업 하나를 원자적으로 가져옴 (queued → running, 종류별 동시 실행 수 제한을 같은 트랜잭션에서 확인)
+- run_job(): 핸들러 실행 후 done, 실패하면 지수 백오프로 다시 queued (JOB_MAX_ATTEMPTS회 후 failed)
+- 워커가 죽어 JOB_LOCK_TIMEOUT초 넘게 running으로 남은 작업은 다시 queued로 돌림
+
+상품 저장(post_save, shop/signals.py)과 임포트 명령이 임베딩/이웃 갱신 작업을, {% product_image %}가 썸네일 생성 작업을
+등록하고 run_worker 명령이 처리한다.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+JOBS_TOTAL = metrics.counter('shop_jobs_total', '처리한 백그라운드 작업 수 (kind, outcome=done|retry|failed)')
+JOB_SECONDS = metrics.histogram('shop_job_seconds', '백그라운드 작업 실행 시간 (kind별)')
+JOBS_QUEUED = metrics.gauge('shop_jobs_queued', '대기 중인 백그라운드 작업 수 (kind별)')
+
+EMBED_PRODUCT = 'embed_product'
+REFRESH_NEIGHBORS = 'refresh_neighbors'
+PURGE_SESSIONS = 'purge_sessions'
+BUILD_THUMBNAILS = 'build_thumbnails'
+PUBLISH_THUMBNAILS = 'publish_thumbnails'
+
+_handlers = {}
+
+
+def handler(kind):
+    """작업 종류별 실행 함수 등록: @handler('embed_product') def f(payload): ..."""
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(kind, key=None, payload=None, delay=0):
+    """작업 1건 등록 (같은 key가 이미 대기 중이면 무시)"""
+    enqueue_many(kind, [(key or kind, payload or {})], delay=delay)
+
+
+def enqueue_many(kind, items, delay=0):
+    """[(key, payload)] 일괄 등록. 현재 트랜잭션이 커밋된 뒤에 등록해 롤백된 변경으로는 작업이 생기지 않게 함"""
+    from shop.models import Job
+
+    if not settings.JOBS_ENABLED or not items:
+        return
+    run_after = timezone.now() + timedelta(seconds=delay)
+    jobs = [Job(kind=kind, key=key, payload=payload, run_after=run_after) for key, payload in items]
+    transaction.on_commit(lambda: Job.objects.bulk_create(jobs, batch_size=500, ignore_conflicts=True))
+
+
+def enqueue_product_changes(product_ids):
+    """상품 내용이 바뀌었을 때: 상품별 재임베딩 (이웃 갱신은 임베딩 작업이 끝난 뒤 등록)"""
+    enqueue_many(EMBED_PRODUCT, [(f'{EMBED_PRODUCT}:{pid}', {'product_id': pid}) for pid in product_ids])
+
+
+def enqueue_thumbnails(product_id):
+    """상품 썸네일 생성 (같은 상품은 대기 중인 작업 하나로 합쳐짐)"""
+    enqueue(BUILD_THUMBNAILS, key=f'{BUILD_THUMBNAILS}:{product_id}', payload={'product_id': product_id})
+
+
+def schedule_session_purge(delay=0):
+    """주기적 세션 정리 작업 등록 (SESSION_PURGE_INTERVAL이 0이면 등록 안 함)"""
+    if settings.SESSION_PURGE_INTERVAL > 0:
+        enqueue(PURGE_SESSIONS, delay=delay)
+
+
+def _requeue(job, **fields):
+    """running 작업을 다시 대기열로. 그 사이 같은 key가 새로 등록됐으면 그 작업이 대신 실행되므로 이 작업은 종료"""
+    from shop.models import Job
+
+    try:
+        with transaction.atomic():
+            return Job.objects.filter(id=job.id, status='running').update(
+                status='queued', locked_by='', locked_at=None, **fields)
+    except IntegrityError:  # 대기 중 key 유니크 제약
+        return Job.objects.filter(id=job.id, status='running').update(
+            status='done', finished_at=timezone.now(), last_error='대기 중인 같은 작업으로 대체됨')
+
+
+def requeue_stale():
+    """JOB_LOCK_TIMEOUT초 넘게 running인 작업(워커 비정상 종료)을 다시 대기열로"""
+    from shop.models import Job
+
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return sum(_requeue(job) for job in Job.objects.filter(status='running', locked_at__lt=cutoff).only('id'))
+
+
+def _count_by_kind(status):
+    from shop.models import Job
+
+    return dict(Job.objects.filter(status=status).values_list('kind').annotate(n=Count('id')).order_by())
+
+
+def claim(worker, kinds=None):
+    """실행 가능한 작업 하나를 running으로 바꿔 반환 (없으면 None)
+    후보는 SKIP LOCKED로 고르고(PostgreSQL), 종류별 동시 실행 수는 running 개수를 세는 조건부 UPDATE로 지킨다.
+    PostgreSQL은 READ COMMITTED라 두 워커의 UPDATE가 서로의 claim을 못 볼 수 있으므로 종류별 advisory lock을
+    트랜잭션 끝까지 잡고 세며, SQLite는 쓰기가 직렬화되어 UPDATE 한 문장으로 충분하다.
+    """
+    from shop.models import Job
+
+    limits = settings.JOB_CONCURRENCY
+    running = _count_by_kind('running')
+    full = {kind for kind, limit in limits.items() if running.get(kind, 0) >= limit}
+
+    qs = Job.objects.filter(status='queued', run_after__lte=timezone.now())
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+    if full:
+        qs = qs.exclude(kind__in=full)  # 미리 거르기만 함 (실제 확인은 아래 UPDATE)
+
+    alias = router.db_for_write(Job)
+    with transaction.atomic(using=alias):
+        candidates = list(
+            qs.select_for_update(skip_locked=True).order_by('run_after', 'id').values_list('id', 'kind')[:5]
+        )
+        for job_id, kind in candidates:
+            claimable = Job.objects.filter(id=job_id, status='queued')
+            limit = limits.get(kind)
+            if limit is not None:
+                if not _lock_kind(alias, kind):
+                    continue  # 다른 워커가 같은 종류를 가져가는 중
+                running_now = Job.objects.filter(kind=kind, status='running').values('kind') \
+                    .annotate(n=Count('id')).values('n')
+                claimable = claimable.filter(LessThan(Coalesce(Subquery(running_now), 0), limit))
+            claimed = claimable.update(
+                status='running', locked_by=worker, locked_at=timezone.now(), attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Job.objects.get(id=job_id)
+    return None
+
+
+def _lock_kind(alias, kind):
+    """PostgreSQL: 종류별 advisory lock (트랜잭션 끝에 풀림). 기다리지 않고 못 잡으면 False
+    여러 종류를 차례로 잡다가 워커끼리 교착되지 않도록 try 버전을 쓴다. 다른 DB는 항상 True
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(hashtext(%s))', [f'shop_jobs:{kind}'])
+        return cursor.fetchone()[0]
+
+
+def _backoff(attempts):
+    return settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+
+
+def run_job(job):
+    """핸들러를 실행하고 결과(outcome)를 기록"""
+    from shop.models import Job
+
+    func = _handlers.get(job.kind)
+    started = time.perf_counter()
+    try:
+        if func is None:
+            raise LookupError(f'알 수 없는 작업 종류: {job.kind}')
+        func(job.payload)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS or func is None:
+            outcome = 'failed'
+            Job.objects.filter(id=job.id).update(status='failed', last_error=error, finished_at=timezone.now(),
+                                                 locked_by='', locked_at=None)
+            logger.error('작업 %s 실패 (%d회 시도): %s', job.key, job.attempts, error)
+        else:
+            outcome = 'retry'
+            retry_at = timezone.now() + timedelta(seconds=_backoff(job.attempts))
+            _requeue(job, last_error=error, run_after=retry_at)
+            logger.warning('작업 %s 실패, %s에 재시도: %s', job.key, retry_at, error)
+    else:
+        outcome = 'done'
+        Job.objects.filter(id=job.id).update(status='done', finished_at=timezone.now(), last_error='')
+    JOB_SECONDS.observe(time.perf_counter() - started, kind=job.kind)
+    JOBS_TOTAL.inc(kind=job.kind, outcome=outcome)
+    return outcome
+
+
+def update_queue_metrics():
+    counts = _count_by_kind('queued')
+    for kind in set(_handlers) | set(counts):
+        JOBS_QUEUED.set(counts.get(kind, 0), kind=kind)
+
+
+def purge_finished(days):
+    """완료된 지 days일 지난 작업 삭제"""
+    from shop.models import Job
+
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# --- 작업 핸들러 ---
+
+class EmbeddingUnavailable(Exception):
+    """임베딩 API 실패 (재시도 대상)"""
+
+
+@handler(EMBED_PRODUCT)
+def embed_product(payload):
+    from shop.models import Product
+
+    from .embeddings import OpenAIEmbeddingGenerator
+
+    product = Product.objects.filter(id=payload['product_id']).first()
+    if product is None:
+        return  # 그 사이 삭제됨
+    result = OpenAIEmbeddingGenerator().update_product_embeddings(product)
+    if result == 'failed':
+        raise EmbeddingUnavailable(f'상품 {product.id} 임베딩 생성 실패')
+    if result == 'updated':
+        # 여러 상품의 임베딩 작업이 몰려도 이웃 갱신은 한 번으로 합쳐지도록 조금 늦춰 등록
+        enqueue(REFRESH_NEIGHBORS, delay=settings.JOB_NEIGHBOR_DELAY_SECONDS)
+
+
+@handler(REFRESH_NEIGHBORS)
+def refresh_neighbors_job(payload):
+    from .neighbors import refresh_neighbors
+
+    # 임베딩이 이웃 계산 이후에 바뀐 상품만 증분 갱신 (카탈로그 버전도 올림)
+    refresh_neighbors()
+
+
+@handler(BUILD_THUMBNAILS)
+def build_thumbnails_job(payload):
+    from shop.models import Product
+
+    from .images import ImageFetchError, build_thumbnails
+
+    product = Product.objects.only('id', 'img').filter(id=payload['product_id']).first()
+    if product is None or not product.img:
+        return
+    try:
+        created = build_thumbnails(product.id, product.img)
+    except ImageFetchError as e:
+        # 재시도하지 않음: 실패 표시가 남아 THUMBNAIL_RETRY_SECONDS 뒤 다음 요청 때 다시 등록됨
+        logger.warning('상품 %s 썸네일 생성 실패: %s', product.id, e)
+        return
+    if created:
+        # 조각 캐시에 원본 URL로 남은 카드가 새 썸네일을 쓰도록 (여러 상품을 모아 버전을 한 번만 올림)
+        enqueue(PUBLISH_THUMBNAILS, delay=settings.JOB_NEIGHBOR_DELAY_SECONDS)
+
+
+@handler(PUBLISH_THUMBNAILS)
+def publish_thumbnails_job(payload):
+    from .catalog import bump_catalog_version
+
+    bump_catalog_version()
+
+
+@handler(PURGE_SESSIONS)
+def purge_sessions_job(payload):
+    from .sessions import purge_expired_sessions, session_table_stats
+
+    try:
+        purge_expired_sessions(
+            batch_size=settings.SESSION_PURGE_BATCH_SIZE,
+            max_batches=settings.SESSION_PURGE_MAX_BATCHES,
+            pause=settings.SESSION_PURGE_PAUSE_SECONDS,
+        )
+        session_table_stats()
+    finally:
+        # 실패해도 다음 주기는 예약 (이 작업은 running이라 대기 중 key 제약에 걸리지 않음)
+        schedule_session_purge(delay=settings.SESSION_PURGE_INTERVAL)
@@ -0,0 +1,209 @@
+"""프로세스 내 메트릭 레지스트리 (Prometheus 텍스트 포맷으로 /metrics 에 노출)
+
+gunicorn 워커마다 별도 레지스트리를 가지므로 값은 워커 단위로 집계된다.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + (extra or [])
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name, key, None, value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with _lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels):
+        data = self._values.get(_label_key(labels))
+        return data[-1] if data else 0
+
+    def samples(self):
+        for key, data in sorted(self._values.items()):
+            for i, bound in enumerate(self.buckets):
+                yield self.name + '_bucket', key, [('le', _format_value(bound))], data[i]
+            yield self.name + '_sum', key, None, data[-2]
+            yield self.name + '_count', key, None, data[-1]
+
+
+def _get_or_create(cls, name, help_text, **kwargs):
+    with _lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help_text, **kwargs)
+    return metric
+
+
+def counter(name, help_text):
+    return _get_or_create(Counter, name, help_text)
+
+
+def gauge(name, help_text):
+    return _get_or_create(Gauge, name, help_text)
+
+
+def histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    return _get_or_create(Histogram, name, help_text, buckets=buckets)
+
+
+def render_prometheus():
+    """레지스트리 전체를 Prometheus exposition 텍스트로 변환"""
+    lines = []
+    for name in sorted(_registry):
+        metric = _registry[name]
+        lines.append(f'# HELP {name} {metric.help}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        with _lock:
+            samples = list(metric.samples())
+        for sample_name, key, extra, value in samples:
+            lines.append(f'{sample_name}{_format_labels(key, extra)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- 표준 메트릭 ---------------------------------------------------------------
+
+REQUEST_SECONDS = histogram('shop_request_duration_seconds', '뷰별 요청 처리 시간')
+REQUEST_DB_QUERIES = histogram('shop_request_db_queries', '요청당 DB 쿼리 수', buckets=COUNT_BUCKETS)
+REQUEST_DB_SECONDS = histogram('shop_request_db_seconds', '요청당 DB 쿼리 누적 시간')
+EMBEDDING_SECONDS = histogram('shop_embedding_call_seconds', '임베딩 API 호출 시간')
+CACHE_REQUESTS = counter('shop_cache_requests_total', '캐시 조회 수 (result=hit|miss)')
+
+
+# --- 요청 단위 누적값 (Server-Timing 헤더용) -------------------------------------
+
+class RequestStats:
+    __slots__ = ('db_count', 'db_seconds', 'embedding_count', 'embedding_seconds', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.embedding_count = 0
+        self.embedding_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+_current = ContextVar('shop_request_stats', default=None)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_stats():
+    return _current.get()
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper 훅: 쿼리 수/시간 누적"""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.db_count += 1
+            stats.db_seconds += time.perf_counter() - started
+
+
+@contextmanager
+def embedding_call():
+    """임베딩 API 호출 계측: with embedding_call() as outcome: ... outcome['status'] = 'error'"""
+    outcome = {'status': 'ok'}
+    started = time.perf_counter()
+    try:
+        yield outcome
+    except Exception:
+        outcome['status'] = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        EMBEDDING_SECONDS.observe(elapsed, status=outcome['status'])
+        stats = _current.get()
+        if stats is not None:
+            stats.embedding_count += 1
+            stats.embedding_seconds += elapsed
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
@@ -0,0 +1,240 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .db import direct_alias
+from .embeddings import to_vector
+
+
+def load_embedding_matrix(weights=None):
+    """임베딩이 있는 전체 상품을 (ids, 행렬, 제휴 마스크)로 로드.
+    행 벡터 = [sqrt(w_n) * name, sqrt(w_d) * description] (각각 정규화)
+    → 내적이 곧 멀티 벡터 점수(w_n * name 유사도 + w_d * description 유사도)가 된다.
+    """
+    from shop.models import Product
+
+    w_name, w_desc = weights or (settings.RECOMMEND_NAME_WEIGHT, settings.RECOMMEND_DESCRIPTION_WEIGHT)
+    rows = (
+        Product.objects.exclude(name_embedding__isnull=True)
+        .order_by('id')
+        .values_list('id', 'if_affiliated', 'name_embedding', 'description_embedding')
+    )
+    ids, affiliated, vectors = [], [], []
+    for pid, aff, name_emb, desc_emb in rows.iterator(chunk_size=500):
+        name_vec = to_vector(name_emb)
+        if name_vec is None:
+            continue
+        desc_vec = to_vector(desc_emb)
+        if desc_vec is None:
+            desc_vec = name_vec
+        name_vec = name_vec / (np.linalg.norm(name_vec) + 1e-12)
+        desc_vec = desc_vec / (np.linalg.norm(desc_vec) + 1e-12)
+        ids.append(pid)
+        affiliated.append(aff)
+        vectors.append(np.concatenate([np.sqrt(w_name) * name_vec, np.sqrt(w_desc) * desc_vec]))
+    if not ids:
+        return np.array([], dtype=np.int64), np.empty((0, 0), dtype=np.float32), np.array([], dtype=bool)
+    return np.asarray(ids, dtype=np.int64), np.vstack(vectors).astype(np.float32), np.asarray(affiliated, dtype=bool)
+
+
+def _top_n(scores, n):
+    """행별 상위 n개 열 인덱스 (점수 내림차순)"""
+    n = min(n, scores.shape[1])
+    if n <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    order = np.take_along_axis(scores, part, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+def compute_neighbors(ids, matrix, affiliated, row_indices, top_n=10, block_size=512, include_affiliated=True):
+    """row_indices 행들의 이웃을 블록 단위 행렬곱으로 계산.
+    yield (product_id, affiliated_only, [(neighbor_id, score), ...])
+    """
+    for start in range(0, len(row_indices), block_size):
+        block = np.asarray(row_indices[start:start + block_size])
+        scores = matrix[block] @ matrix.T  # (B, N)
+        scores[np.arange(len(block)), block] = -np.inf  # 자기 자신 제외
+
+        variants = [(False, scores)]
+        if include_affiliated:
+            aff_scores = np.where(affiliated[None, :], scores, -np.inf)
+            variants.append((True, aff_scores))
+
+        for affiliated_only, variant in variants:
+            top = _top_n(variant, top_n)
+            for r, row in enumerate(block):
+                pairs = [
+                    (int(ids[c]), float(variant[r, c]))
+                    for c in top[r]
+                    if np.isfinite(variant[r, c])
+                ]
+                yield int(ids[row]), affiliated_only, pairs
+
+
+def _write_neighbors(results):
+    """계산 결과로 해당 상품의 이웃 목록을 교체"""
+    from shop.models import ProductNeighbor
+
+    now = timezone.now()
+    product_ids = set()
+    objs = []
+    for pid, affiliated_only, pairs in results:
+        product_ids.add(pid)
+        objs.extend(
+            ProductNeighbor(
+                product_id=pid,
+                neighbor_id=nid,
+                affiliated_only=affiliated_only,
+                rank=rank,
+                score=score,
+                computed_at=now,
+            )
+            for rank, (nid, score) in enumerate(pairs, start=1)
+        )
+    with transaction.atomic(using=direct_alias()):
+        ProductNeighbor.objects.filter(product_id__in=product_ids).delete()
+        ProductNeighbor.objects.bulk_create(objs, batch_size=1000)
+    return len(product_ids)
+
+
+def rebuild_neighbors(top_n=10, block_size=512, include_affiliated=True, product_ids=None):
+    """이웃 테이블 전체(또는 product_ids) 재계산. 처리한 상품 수 반환"""
+    from shop.models import ProductNeighbor
+
+    ids, matrix, affiliated = load_embedding_matrix()
+    if product_ids is None:
+        rows = np.arange(len(ids))
+        # 임베딩이 사라진 상품의 목록도 정리
+        ProductNeighbor.objects.exclude(product_id__in=ids.tolist()).delete()
+    else:
+        rows = np.flatnonzero(np.isin(ids, list(product_ids)))
+    if not len(rows):
+        return 0
+
+    written = 0
+    chunk = []
+    for item in compute_neighbors(ids, matrix, affiliated, rows, top_n, block_size, include_affiliated):
+        chunk.append(item)
+        if len(chunk) >= block_size * 2:
+            written += _write_neighbors(chunk)
+            chunk = []
+    if chunk:
+        written += _write_neighbors(chunk)
+    # 상세 페이지의 관련 상품 조각이 새 이웃 목록으로 다시 렌더링되도록
+    bump_catalog_version()
+    return written
+
+
+def stale_product_ids():
+    """임베딩이 이웃 목록 계산 이후 갱신되었거나 목록이 아직 없는 상품 ID"""
+    from shop.models import Product
+
+    qs = (
+        Product.objects.exclude(name_embedding__isnull=True)
+        .annotate(last_computed=Max('neighbors__computed_at'))
+        .values_list('id', 'embedding_updated_at', 'last_computed')
+    )
+    return [
+        pid for pid, updated, computed in qs
+        if computed is None or (updated is not None and updated > computed)
+    ]
+
+
+def refresh_neighbors(changed_ids=None, top_n=10, block_size=512, include_affiliated=True):
+    """임베딩이 바뀐 상품 기준 증분 갱신.
+    1) 바뀐 상품 자신 + 기존 목록에 바뀐 상품을 포함한 상품은 전체 재계산
+    2) 나머지 상품은 바뀐 상품과의 점수만 계산해, 현재 목록의 최저 점수를 넘는 경우에만 재계산
+    """
+    from shop.models import ProductNeighbor
+
+    if changed_ids is None:
+        changed_ids = stale_product_ids()
+    changed_ids = set(changed_ids)
+    if not changed_ids:
+        return 0
+
+    ids, matrix, affiliated = load_embedding_matrix()
+    if not len(ids):
+        return 0
+    index_of = {int(pid): i for i, pid in enumerate(ids)}
+
+    dirty = {pid for pid in changed_ids if pid in index_of}
+    dirty.update(
+        ProductNeighbor.objects.filter(neighbor_id__in=changed_ids)
+        .values_list('product_id', flat=True)
+        .distinct()
+    )
+
+    # 목록별 최저 점수(rank 꼴찌) — 목록이 꽉 차지 않았으면 무조건 재계산 대상
+    thresholds = {}
+    for row in (
+        ProductNeighbor.objects.values('product_id', 'affiliated_only')
+        .annotate(min_score=Min('score'), max_rank=Max('rank'))
+    ):
+        full = row['max_rank'] >= min(top_n, len(ids) - 1)
+        thresholds[(row['product_id'], row['affiliated_only'])] = row['min_score'] if full else -np.inf
+
+    changed_cols = np.asarray([index_of[pid] for pid in changed_ids if pid in index_of], dtype=np.int64)
+    others = np.asarray([i for pid, i in index_of.items() if pid not in dirty], dtype=np.int64)
+    if len(changed_cols) and len(others):
+        for start in range(0, len(others), block_size):
+            block = others[start:start + block_size]
+            scores = matrix[block] @ matrix[changed_cols].T  # (B, C)
+            best_all = scores.max(axis=1)
+            aff_scores = np.where(affiliated[changed_cols][None, :], scores, -np.inf)
+            best_aff = aff_scores.max(axis=1)
+            for r, row in enumerate(block):
+                pid = int(ids[row])
+                if best_all[r] > thresholds.get((pid, False), -np.inf):
+                    dirty.add(pid)
+                elif include_affiliated and best_aff[r] > thresholds.get((pid, True), -np.inf):
+                    dirty.add(pid)
+
+    return rebuild_neighbors(top_n, block_size, include_affiliated, product_ids=dirty)
+
+
+def related_products(product_id, limit=4, affiliated_only=False):
+    """미리 계산된 이웃 상품 (한 번의 인덱스 조회, rank 순)"""
+    from shop.models import Product
+
+    return list(
+        Product.objects.filter(neighbor_of__product_id=product_id, neighbor_of__affiliated_only=affiliated_only)
+        .order_by('neighbor_of__rank')[:limit]
+    )
+
+
+def recommend_from_neighbors(product_ids, limit=8, affiliated_only=True, use_categories=True):
+    """장바구니 상품들의 이웃 목록을 합산해 추천 (OpenAIEmbeddingGenerator 결과와 같은 형식).
+    이웃 테이블이 비어 있으면 빈 리스트를 반환하므로 호출 측에서 벡터 검색으로 대체한다.
+    """
+    from shop.models import Product, ProductNeighbor
+
+    qs = ProductNeighbor.objects.filter(product_id__in=product_ids, affiliated_only=affiliated_only)
+    qs = qs.exclude(neighbor_id__in=product_ids)
+    if use_categories:
+        qs = qs.filter(neighbor__category__in=Product.objects.filter(id__in=product_ids).values('category'))
+    rows = (
+        qs.values(
+            'neighbor_id', 'neighbor__name', 'neighbor__brand', 'neighbor__price',
+            'neighbor__if_affiliated', 'neighbor__img', 'neighbor__category',
+        )
+        .annotate(total_score=Sum('score'))
+        .order_by('-total_score', 'neighbor_id')[:limit]
+    )
+    return [
+        {
+            'id': r['neighbor_id'],
+            'name': r['neighbor__name'],
+            'brand': r['neighbor__brand'],
+            'price': r['neighbor__price'],
+            'if_affiliated': r['neighbor__if_affiliated'],
+            'img': r['neighbor__img'],
+            'category': r['neighbor__category'],
+            'similarity_score': float(r['total_score']) / max(1, len(product_ids)),
+        }
+        for r in rows
+    ]
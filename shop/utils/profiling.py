@@ -0,0 +1,274 @@
+"""요청 단위 프로파일링 (필요할 때만)
+
+대상 요청 (PROFILING_ENABLED일 때):
+- X-Shop-Profile 헤더에 서명 토큰(make_token(), 관리자 프로파일 페이지에서 발급)이 있는 요청
+- 스태프 로그인 상태에서 ?_profile=1 을 붙인 요청
+- PROFILE_VIEWS 뷰의 요청 중 PROFILE_SAMPLE_RATE건에 1건 (0이면 표본 수집 안 함)
+
+프로파일러는 별도 스레드가 PROFILE_INTERVAL_MS마다 요청 스레드의 스택을 샘플링해
+collapsed stack("a;b;c 횟수", flamegraph.pl 형식)으로 모으고, 실행된 SQL과 시간을 함께
+PROFILE_DIR/<시각>-<뷰>-<id>.json.gz 로 저장한다. 파일 수(PROFILE_MAX_FILES)와 보관 기간(PROFILE_MAX_AGE_DAYS)을
+넘은 것은 저장할 때마다 지운다.
+"""
+import gzip
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILES_TOTAL = metrics.counter('shop_profiles_total', '저장한 요청 프로파일 수 (trigger=header|staff|sample)')
+
+HEADER = 'HTTP_X_SHOP_PROFILE'
+QUERY_FLAG = '_profile'
+TOKEN_SALT = 'shop.profiling'
+SUFFIX = '.json.gz'
+MAX_SQL_LENGTH = 2000
+
+
+def make_token():
+    """X-Shop-Profile 헤더 값 (PROFILE_TOKEN_MAX_AGE초 동안 유효)"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def _valid_token(value):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(value, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def trigger_for(request, view_name):
+    """이 요청을 프로파일링할 이유(header|staff|sample), 대상이 아니면 None"""
+    if not settings.PROFILING_ENABLED:
+        return None
+    token = request.META.get(HEADER)
+    if token and _valid_token(token):
+        return 'header'
+    if request.GET.get(QUERY_FLAG) == '1':
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return 'staff'
+    rate = settings.PROFILE_SAMPLE_RATE
+    if rate > 0 and view_name in settings.PROFILE_VIEWS and random.random() < 1 / rate:
+        return 'sample'
+    return None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({'/'.join(path.parts[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """대상 스레드의 스택을 주기적으로 샘플링 (cProfile처럼 모든 호출을 가로채지 않아 오버헤드가 작음)"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='shop-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class QueryRecorder:
+    """execute_wrapper: 실행된 SQL과 시간(ms)을 순서대로 기록 (최대 PROFILE_MAX_QUERIES개)"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+        self.dropped = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.queries) < settings.PROFILE_MAX_QUERIES:
+                self.queries.append({
+                    'alias': self.alias,
+                    'sql': sql[:MAX_SQL_LENGTH],
+                    'ms': round((time.perf_counter() - started) * 1000, 3),
+                    'many': many,
+                })
+            else:
+                self.dropped += 1
+
+
+class RequestProfile:
+    """with RequestProfile(...) as profile: 블록 안의 샘플과 SQL을 모음. 끝나면 save()"""
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.profiler = SamplingProfiler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+        self.recorders = []
+        self._stack = ExitStack()
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        for conn in connections.all(initialized_only=False):
+            recorder = QueryRecorder(conn.alias)
+            self.recorders.append(recorder)
+            self._stack.enter_context(conn.execute_wrapper(recorder))
+        self._started = time.perf_counter()
+        self.profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.stop()
+        self.elapsed = time.perf_counter() - self._started
+        self._stack.close()
+        return False
+
+    def report(self, request, view_name, status):
+        queries = sorted((q for r in self.recorders for q in r.queries), key=lambda q: -q['ms'])
+        return {
+            'id': uuid.uuid4().hex[:12],
+            'created_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'view': view_name,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': status,
+            'trigger': self.trigger,
+            'duration_ms': round(self.elapsed * 1000, 3),
+            'interval_ms': settings.PROFILE_INTERVAL_MS,
+            'samples': self.profiler.samples,
+            'stacks': dict(self.profiler.stacks.most_common()),
+            'queries': queries,
+            'query_count': sum(len(r.queries) + r.dropped for r in self.recorders),
+            'query_ms': round(sum(q['ms'] for q in queries), 3),
+        }
+
+    def save(self, request, view_name, status):
+        data = self.report(request, view_name, status)
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(dt_timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        path = directory / f"{stamp}-{view_name}-{data['id']}{SUFFIX}"
+        tmp = path.with_name(f'.{path.name}.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        PROFILES_TOTAL.inc(trigger=self.trigger)
+        prune()
+        return path
+
+
+# --- 저장된 프로파일 ---
+
+def _profile_files():
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    # 파일 이름이 시각으로 시작하므로 이름 역순 = 최신순
+    return sorted((p for p in directory.iterdir() if p.name.endswith(SUFFIX)), key=lambda p: p.name, reverse=True)
+
+
+def prune():
+    """PROFILE_MAX_FILES개를 넘거나 PROFILE_MAX_AGE_DAYS일 지난 프로파일 삭제"""
+    cutoff = time.time() - settings.PROFILE_MAX_AGE_DAYS * 86400
+    removed = 0
+    for index, path in enumerate(_profile_files()):
+        try:
+            if index >= settings.PROFILE_MAX_FILES or path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass  # 다른 워커가 먼저 지움
+    return removed
+
+
+def list_profiles():
+    """최신순 요약 목록 (stacks/queries 제외)"""
+    summaries = []
+    for path in _profile_files():
+        data = load_profile(path.name[:-len(SUFFIX)])
+        if data is not None:
+            data.pop('stacks')
+            data.pop('queries')
+            data['name'] = path.name[:-len(SUFFIX)]
+            summaries.append(data)
+    return summaries
+
+
+def load_profile(name):
+    """name: 확장자를 뺀 파일 이름. 없거나 경로 밖을 가리키면 None"""
+    if '/' in name or '\\' in name or name.startswith('.'):
+        return None
+    path = Path(settings.PROFILE_DIR) / f'{name}{SUFFIX}'
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def collapsed_text(data):
+    """flamegraph.pl / speedscope에 그대로 넣을 수 있는 텍스트"""
+    return ''.join(f'{stack} {count}\n' for stack, count in data['stacks'].items())
+
+
+def flame_rects(stacks, min_width=0.2):
+    """collapsed stacks → 아이시클 그래프 사각형 [{depth, x, width(%), label, count}]
+    너비가 min_width% 미만인 가지는 생략
+    """
+    total = sum(stacks.values())
+    if not total:
+        return []
+    root = {'children': {}, 'count': 0}
+    for stack, count in stacks.items():
+        node = root
+        for label in stack.split(';'):
+            node = node['children'].setdefault(label, {'children': {}, 'count': 0})
+            node['count'] += count
+
+    rects = []
+
+    def walk(node, depth, x):
+        for label, child in sorted(node['children'].items()):
+            width = child['count'] * 100 / total
+            if width >= min_width:
+                rects.append({'depth': depth, 'x': round(x, 3), 'width': round(width, 3),
+                              'label': label, 'count': child['count']})
+                walk(child, depth + 1, x)
+            x += width
+
+    walk(root, 0, 0.0)
+    return rects
@@ -0,0 +1,93 @@
+"""스토어프런트 쿼리의 실행 계획(EXPLAIN) 확인
+
+뷰가 상품 테이블에 보내는 쿼리를 같은 조건으로 재구성해 EXPLAIN 결과를 얻고,
+상품 테이블 전체를 훑는 접근이 있는지 검사한다. shop.tests.QueryPlanTests가 SQLite/PostgreSQL 각각에서 실행.
+- 순차 스캔: SQLite "SCAN shop_product", PostgreSQL "Seq Scan on shop_product"
+- 조건 없는 전체 인덱스 스캔 (정렬용으로만 인덱스를 쓰는 경우): SQLite "SCAN ... USING INDEX",
+  PostgreSQL "Index Scan"에 Index Cond가 없는 경우. 단 부분 인덱스는 대상 행만 담고 있으므로 허용
+
+PostgreSQL은 작은 테이블이면 인덱스가 있어도 순차 스캔을 고르므로 enable_seqscan=off로
+"쓸 수 있는 인덱스가 있는지"를 확인한다 (쓸 인덱스가 없으면 그래도 Seq Scan이 나옴).
+"""
+import re
+
+from django.db import connections, transaction
+
+TABLE = 'shop_product'
+SQLITE_SCAN = re.compile(rf'\bSCAN (?:TABLE )?{TABLE}\b(?: USING (?:COVERING )?INDEX (\w+))?')
+PG_SCAN = re.compile(rf'(Seq Scan|Index Only Scan|Index Scan)(?: Backward)?(?: using (\w+))? on {TABLE}\b')
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+
+def storefront_queries(category='필기구', cart_ids=(1, 2, 3)):
+    """{이름: 쿼리셋} — 각 뷰가 실제로 보내는 상품 조회와 같은 조건
+
+    home의 카테고리 목록과 product_list의 필터/건수/정렬은 패싯 인덱스(shop/utils/facets.py)가 메모리에서 계산하므로
+    DB 조회는 현재 페이지 상품 in_bulk뿐이다. 하이브리드 검색의 문자열 후보(lexical_candidates)는 부분일치라
+    SQLite에서는 항상 전체 스캔이고 PostgreSQL은 pg_trgm GIN 인덱스(0006)를 쓰므로 여기서는 검사하지 않는다.
+    """
+    from shop.models import Product
+
+    cart_ids = list(cart_ids)
+    return {
+        # home: 오늘의 발견 (제휴 상품)
+        'home_affiliated': Product.objects.filter(if_affiliated=True)[:30],
+        # product_detail: 상품 조회, 이웃이 없을 때 같은 카테고리 상품
+        'product_detail': Product.objects.filter(id=cart_ids[0]),
+        'product_related': Product.objects.filter(category=category).exclude(id=cart_ids[0])[:4],
+        # product_list 현재 페이지 / hybrid_search 결과 상품 (in_bulk)
+        'list_page': Product.objects.filter(id__in=cart_ids),
+        # cart_view: 장바구니 상품, 제휴 + 카테고리 추천
+        'cart_items': Product.objects.filter(id__in=cart_ids),
+        'cart_recommendations': Product.objects.filter(if_affiliated=True, category__in=[category])
+        .exclude(id__in=cart_ids).distinct()[:5],
+        # api_ai_recommendations 대체 전략 (_category_recommendations)
+        'ai_reco_fallback': Product.objects.filter(
+            if_affiliated=True, category__in=Product.objects.filter(id__in=cart_ids).values('category'),
+        ).exclude(id__in=cart_ids).order_by('id').values('id', 'name', 'brand', 'price')[:5],
+    }
+
+
+def explain(queryset):
+    """쿼리셋의 실행 계획 텍스트"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def _partial_indexes():
+    from shop.models import Product
+
+    return {index.name for index in Product._meta.indexes if index.condition is not None}
+
+
+def full_scans(plan, vendor):
+    """계획에서 상품 테이블 전체를 훑는 접근 줄 목록 (지원하지 않는 DB면 빈 목록)"""
+    partial = _partial_indexes()
+    lines = plan.splitlines()
+    found = []
+    for i, line in enumerate(lines):
+        if vendor == 'sqlite':
+            match = SQLITE_SCAN.search(line)
+            if match and match.group(1) not in partial:
+                found.append(line.strip())
+        elif vendor == 'postgresql':
+            match = PG_SCAN.search(line)
+            if not match:
+                continue
+            if match.group(1) == 'Seq Scan':
+                found.append(line.strip())
+                continue
+            # 노드 상세 줄(다음 "->" 전까지)에 Index Cond가 있어야 조건으로 찾는 인덱스 스캔
+            details = []
+            for detail in lines[i + 1:]:
+                if '->' in detail:
+                    break
+                details.append(detail)
+            if match.group(2) not in partial and not any('Index Cond' in d for d in details):
+                found.append(line.strip())
+    return found
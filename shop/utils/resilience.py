@@ -0,0 +1,150 @@
+"""외부 API(OpenAI 임베딩) 장애가 웹 워커를 붙잡지 않도록 하는 보호 장치
+
+- latency_budget(): 요청 단위 지연 예산. 임베딩 호출은 남은 예산만큼만 기다린다 (remaining())
+- CircuitBreaker: 연속 실패 시 열림 → reset_timeout 후 반열림에서 호출 1건으로 시험 → 성공하면 닫힘
+- hedged(): 주 전략을 별도 스레드에서 예산만큼 기다리고, 시간 초과/실패/임베딩 불가면 대체 전략 결과를 반환
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATE = metrics.gauge('shop_circuit_state', '서킷 브레이커 상태 (0=closed, 1=half_open, 2=open)')
+BREAKER_REJECTED = metrics.counter('shop_circuit_rejected_total', '브레이커가 열려 있어 건너뛴 호출 수')
+STRATEGY_TOTAL = metrics.counter('shop_reco_strategy_total',
+                                 '추천 응답 전략 (outcome=primary|timeout|error|degraded, 나머지는 대체 전략 사용)')
+
+_deadline = ContextVar('shop_latency_deadline', default=None)
+_degraded = ContextVar('shop_degraded', default=False)
+
+
+@contextmanager
+def latency_budget(seconds):
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """현재 예산의 남은 시간(초). 예산 밖이면 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def mark_degraded():
+    """외부 호출을 건너뛰었거나 실패했음을 표시 (hedged()가 대체 전략 사용 여부 판단에 사용)"""
+    _degraded.set(True)
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(0, breaker=name)
+
+    def _set_state(self, state):
+        self.state = state
+        BREAKER_STATE.set(self._STATE_VALUES[state], breaker=self.name)
+
+    def allow(self):
+        """호출해도 되는지. 반열림 상태에서는 시험 호출 1건만 허용"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+                return True
+        BREAKER_REJECTED.inc(breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    logger.warning('서킷 브레이커 %s 열림 (연속 실패 %d회)', self.name, self._failures)
+                self._set_state(self.OPEN)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """이름별 프로세스 공유 브레이커 (임계값은 EMBEDDING_BREAKER_* 설정)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name, settings.EMBEDDING_BREAKER_FAILURES, settings.EMBEDDING_BREAKER_RESET_SECONDS,
+            )
+        return _breakers[name]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.RECO_HEDGE_WORKERS, thread_name_prefix='hedge')
+        return _executor
+
+
+def _run_primary(primary, budget):
+    _degraded.set(False)
+    try:
+        with latency_budget(budget):
+            result = primary()
+        # 임베딩을 못 얻어 빈 결과가 나왔으면 "결과 없음"이 아니라 실패로 취급
+        return None if _degraded.get() and not result else result
+    finally:
+        # 이 스레드의 DB 연결은 요청 사이에 유지하지 않음
+        connections.close_all()
+
+
+def hedged(name, primary, fallback, budget):
+    """primary()를 최대 budget초 기다리고, 안 되면 fallback() 결과로 응답. (결과, outcome) 반환
+    시간 초과된 primary는 백그라운드에서 끝까지 실행되지만 요청은 기다리지 않는다.
+    """
+    future = _get_executor().submit(contextvars.copy_context().run, _run_primary, primary, budget)
+    try:
+        result = future.result(timeout=budget)
+        outcome = 'primary' if result is not None else 'degraded'
+    except FutureTimeout:
+        outcome = 'timeout'
+    except Exception:
+        logger.exception('%s 주 전략 실패, 대체 전략 사용', name)
+        outcome = 'error'
+    STRATEGY_TOTAL.inc(strategy=name, outcome=outcome)
+    if outcome != 'primary':
+        result = fallback()
+    return result, outcome
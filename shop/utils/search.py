@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .embeddings import OpenAIEmbeddingGenerator
+
+
+def lexical_filter(q):
+    """이름/브랜드/카테고리 부분일치 조건 (기존 product_list 검색과 동일)"""
+    return Q(name__icontains=q) | Q(brand__icontains=q) | Q(category__icontains=q)
+
+
+def lexical_candidates(q, classification=None, limit=50):
+    """문자열 일치 점수 순 상품 ID 후보.
+    점수: 이름 완전일치 > 이름 접두 > 이름 포함 > 브랜드 포함 > 카테고리 포함
+    (PostgreSQL에서는 0006 마이그레이션의 pg_trgm GIN 인덱스가 ILIKE 후보 탐색을 처리)
+    """
+    from shop.models import Product
+
+    qs = Product.objects.filter(lexical_filter(q))
+    if classification:
+        qs = qs.filter(classification=classification)
+    qs = qs.annotate(
+        lexical_score=Case(
+            When(name__iexact=q, then=Value(5)),
+            When(name__istartswith=q, then=Value(4)),
+            When(name__icontains=q, then=Value(3)),
+            When(brand__icontains=q, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    )
+    return list(qs.order_by('-lexical_score', 'id').values_list('id', flat=True)[:limit])
+
+
+def vector_candidates(q, classification=None, limit=50, generator=None):
+    """name_embedding 유사도 순 상품 ID 후보 (검색어 임베딩은 캐시 사용).
+    임베딩을 만들 수 없으면(API 키 없음 등) 빈 리스트를 반환해 문자열 검색만으로 동작한다.
+    """
+    generator = generator or OpenAIEmbeddingGenerator()
+    query_embedding = generator.get_query_embedding(q)
+    if not query_embedding:
+        return []
+    results = generator.search_by_embedding(query_embedding, limit=limit, classification=classification)
+    return [r['id'] for r in results]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """RRF 점수 합산. rankings: [(id 리스트, 가중치), ...] -> {id: score}"""
+    scores = {}
+    for ids, weight in rankings:
+        for rank, pid in enumerate(ids, start=1):
+            scores[pid] = scores.get(pid, 0.0) + weight / (k + rank)
+    return scores
+
+
+def hybrid_search(q, classification=None, generator=None):
+    """문자열 + 벡터 하이브리드 검색.
+    두 후보 목록을 RRF로 합치고 제휴 상품 가산점(SEARCH_AFFILIATED_BOOST)을 더해 정렬한 상품 리스트를 반환.
+    - 가산점이 RRF 최대값(2/(k+1))보다 크면 기존 검색처럼 '제휴 우선'이 그대로 유지된다.
+    - 0으로 두면 순수 관련도 정렬.
+    """
+    from shop.models import Product
+
+    limit = settings.SEARCH_CANDIDATES
+    lexical_ids = lexical_candidates(q, classification, limit)
+    vector_ids = vector_candidates(q, classification, limit, generator)
+
+    scores = reciprocal_rank_fusion(
+        [
+            (lexical_ids, settings.SEARCH_LEXICAL_WEIGHT),
+            (vector_ids, settings.SEARCH_VECTOR_WEIGHT),
+        ],
+        k=settings.SEARCH_RRF_K,
+    )
+    products = Product.objects.in_bulk(list(scores))
+    boost = settings.SEARCH_AFFILIATED_BOOST
+    for pid, product in products.items():
+        if product.if_affiliated:
+            scores[pid] += boost
+    return sorted(products.values(), key=lambda p: (-scores[p.id], p.id))
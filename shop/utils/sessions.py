@@ -0,0 +1,145 @@
+"""세션 테이블(django_session) 정리
+
+consent_form의 flush()와 장바구니 갱신으로 세션 행이 계속 쌓이지만 Django는 clearsessions 명령을 직접
+실행하기 전까지 지우지 않는다. purge_expired_sessions()는 만료 세션을 expire_date 인덱스 순서로
+batch_size개씩 나눠 지우며, 배치마다 짧은 트랜잭션으로
+1) 참여자 세션의 최종 장바구니를 ArchivedCart에 남기고 (cart_id만 있는 세션은 이미 Cart 테이블에 있으므로 제외)
+2) 그 사이 갱신되지 않은(여전히 만료된) 세션만 삭제한다.
+purge_sessions 명령(cron) 또는 run_worker의 purge_sessions 작업으로 실행.
+"""
+import logging
+import time
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_PURGED = metrics.counter('shop_sessions_purged_total', '삭제한 만료 세션 수')
+CARTS_ARCHIVED = metrics.counter('shop_carts_archived_total', '세션 삭제 전에 보관한 참여자 장바구니 수')
+PURGE_RATE = metrics.gauge('shop_session_purge_rows_per_second', '최근 세션 정리 처리량 (행/초)')
+SESSION_ROWS = metrics.gauge('shop_session_rows', '세션 테이블 행 수 (state=total|expired)')
+SESSION_TABLE_BYTES = metrics.gauge('shop_session_table_bytes', '세션 테이블 + 인덱스 크기 (바이트, 알 수 없으면 미설정)')
+
+
+def _cart_items(data):
+    """세션의 cart({상품 ID: 수량})를 정수 수량만 남겨 정리"""
+    items = {}
+    for pid, qty in (data.get('cart') or {}).items():
+        try:
+            items[str(int(pid))] = max(1, int(qty))
+        except (TypeError, ValueError):
+            continue
+    return items
+
+
+def _archive(rows):
+    """[(session_key, session_data, expire_date)] 중 참여자 세션의 장바구니를 보관하고 보관 수 반환"""
+    from shop.models import ArchivedCart, Participant
+
+    store = SessionStore()
+    carts = {}
+    for key, data, expire_date in rows:
+        decoded = store.decode(data)
+        participant_id = decoded.get('participant_id')
+        if participant_id is None or 'cart' not in decoded:
+            continue  # 동의 전 세션, 또는 장바구니가 Cart/CartItem에 저장된 세션
+        items = _cart_items(decoded)
+        previous = carts.get(participant_id)
+        # 같은 참여자의 세션이 여러 개면 가장 늦게 만료되는(마지막으로 쓴) 것을 남김
+        if previous is None or previous.session_expired_at < expire_date:
+            carts[participant_id] = ArchivedCart(
+                participant_id=participant_id, session_key=key, items=items,
+                quantity=sum(items.values()), session_expired_at=expire_date,
+            )
+    if not carts:
+        return 0
+    existing = set(Participant.objects.filter(id__in=carts).values_list('id', flat=True))
+    archived = [cart for pid, cart in carts.items() if pid in existing]
+    ArchivedCart.objects.bulk_create(
+        archived,
+        update_conflicts=True,
+        unique_fields=['participant'],
+        update_fields=['session_key', 'items', 'quantity', 'session_expired_at', 'archived_at'],
+    )
+    return len(archived)
+
+
+def purge_expired_sessions(batch_size=500, max_batches=None, pause=0.0):
+    """만료 세션을 배치 단위로 보관/삭제하고 통계 반환
+    max_batches: 한 번에 처리할 최대 배치 수 (None이면 끝까지), pause: 배치 사이 대기(초, DB 부하 분산)
+    """
+    now = timezone.now()
+    stats = {'batches': 0, 'deleted': 0, 'archived': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    while max_batches is None or stats['batches'] < max_batches:
+        rows = list(
+            Session.objects.filter(expire_date__lt=now)
+            .order_by('expire_date')
+            .values_list('session_key', 'session_data', 'expire_date')[:batch_size]
+        )
+        if not rows:
+            break
+        with transaction.atomic(using=router.db_for_write(Session)):
+            archived = _archive(rows)
+            # 조회 이후 다시 사용되어 만료 시각이 늘어난 세션은 남김
+            deleted, _ = Session.objects.filter(
+                session_key__in=[row[0] for row in rows], expire_date__lt=now,
+            ).delete()
+        stats['batches'] += 1
+        stats['deleted'] += deleted
+        stats['archived'] += archived
+        SESSIONS_PURGED.inc(deleted)
+        CARTS_ARCHIVED.inc(archived)
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['rows_per_second'] = round(stats['deleted'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+    if stats['deleted']:
+        PURGE_RATE.set(stats['rows_per_second'])
+        logger.info('만료 세션 %d개 삭제 (장바구니 %d개 보관, %.1f행/초)',
+                    stats['deleted'], stats['archived'], stats['rows_per_second'])
+    return stats
+
+
+def _table_bytes(alias):
+    table = Session._meta.db_table
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            # dbstat 가상 테이블은 SQLITE_ENABLE_DBSTAT_VTAB 빌드에서만 사용 가능
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s "
+                    "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table, table],
+                )
+            except Exception:
+                return None
+            return cursor.fetchone()[0]
+    return None
+
+
+def session_table_stats():
+    """세션 테이블 행 수/만료 행 수/크기(바이트, 알 수 없으면 None)를 반환하고 지표 갱신"""
+    alias = router.db_for_read(Session)
+    stats = {
+        'rows': Session.objects.count(),
+        'expired': Session.objects.filter(expire_date__lt=timezone.now()).count(),
+        'bytes': _table_bytes(alias),
+    }
+    SESSION_ROWS.set(stats['rows'], state='total')
+    SESSION_ROWS.set(stats['expired'], state='expired')
+    if stats['bytes'] is not None:
+        SESSION_TABLE_BYTES.set(stats['bytes'])
+    return stats
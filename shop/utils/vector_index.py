@@ -0,0 +1,193 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .embeddings import to_vector
+
+
+class PartitionedVectorIndex:
+    """(classification, category, if_affiliated) 버킷별로 나눈 인메모리 벡터 인덱스.
+    필터에 맞는 버킷만 골라 행렬곱하므로 선택도가 높은 필터에서도 항상 정확한 top-k를 돌려준다.
+    """
+
+    def __init__(self, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.partitions = {}  # (classification, category, affiliated) -> (ids, name 행렬, description 행렬)
+        self.size = 0
+
+    @classmethod
+    def from_partitions(cls, partitions, fingerprint=None):
+        """이미 정규화된 버킷 {key: (ids, name 행렬, description 행렬)}으로 구성 (샤드 조각)"""
+        index = cls(fingerprint)
+        index.partitions = partitions
+        index.size = sum(len(ids) for ids, _, _ in partitions.values())
+        return index
+
+    @classmethod
+    def build(cls, fingerprint=None):
+        from shop.models import Product
+
+        index = cls(fingerprint)
+        buckets = {}
+        rows = (
+            Product.objects.exclude(name_embedding__isnull=True)
+            .order_by('id')
+            .values_list('id', 'classification', 'category', 'if_affiliated', 'name_embedding', 'description_embedding')
+        )
+        for pid, cls_name, category, aff, name_emb, desc_emb in rows.iterator(chunk_size=1000):
+            name_vec = to_vector(name_emb)
+            if name_vec is None:
+                continue
+            desc_vec = to_vector(desc_emb)
+            bucket = buckets.setdefault((cls_name, category, bool(aff)), ([], [], []))
+            bucket[0].append(pid)
+            bucket[1].append(name_vec)
+            bucket[2].append(desc_vec if desc_vec is not None else name_vec)
+
+        for key, (ids, names, descs) in buckets.items():
+            name_matrix = np.vstack(names).astype(np.float32)
+            desc_matrix = np.vstack(descs).astype(np.float32)
+            name_matrix /= np.linalg.norm(name_matrix, axis=1, keepdims=True) + 1e-12
+            desc_matrix /= np.linalg.norm(desc_matrix, axis=1, keepdims=True) + 1e-12
+            index.partitions[key] = (np.asarray(ids, dtype=np.int64), name_matrix, desc_matrix)
+            index.size += len(ids)
+        return index
+
+    def select(self, affiliated_only=False, categories=None, classification=None):
+        """필터에 맞는 버킷 키 목록"""
+        cats = set(categories) if categories else None
+        return [
+            key for key in self.partitions
+            if (not affiliated_only or key[2])
+            and (cats is None or key[1] in cats)
+            and (not classification or key[0] == classification)
+        ]
+
+    def count(self, affiliated_only=False, categories=None, classification=None):
+        return sum(len(self.partitions[k][0]) for k in self.select(affiliated_only, categories, classification))
+
+    def search(self, query, limit, exclude_ids=None, affiliated_only=False, categories=None, classification=None,
+               description_query=None, weights=(1.0, 0.0)):
+        """필터 버킷만 스캔하는 정확한 top-k. [(product_id, score)] 반환
+        description_query가 있으면 name/description 유사도 가중합으로 점수화
+        """
+        keys = self.select(affiliated_only, categories, classification)
+        if not keys or limit <= 0:
+            return []
+        q_name = to_vector(query)
+        q_name = q_name / (np.linalg.norm(q_name) + 1e-12)
+        q_desc = None
+        if description_query is not None:
+            q_desc = to_vector(description_query)
+            q_desc = q_desc / (np.linalg.norm(q_desc) + 1e-12)
+
+        all_ids, all_scores = [], []
+        for key in keys:
+            ids, name_matrix, desc_matrix = self.partitions[key]
+            scores = name_matrix @ q_name
+            if q_desc is not None:
+                scores = weights[0] * scores + weights[1] * (desc_matrix @ q_desc)
+            all_ids.append(ids)
+            all_scores.append(scores)
+        ids = np.concatenate(all_ids)
+        scores = np.concatenate(all_scores)
+        if exclude_ids:
+            keep = ~np.isin(ids, np.asarray(list(exclude_ids), dtype=np.int64))
+            ids, scores = ids[keep], scores[keep]
+        if not len(ids):
+            return []
+
+        k = min(limit, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def search_batch(self, queries, limit, exclude_ids=None, affiliated_only=False, categories=None,
+                     classification=None):
+        """여러 쿼리를 행렬곱 한 번으로 검색 (일괄 평가용). 쿼리마다 [(product_id, score)]"""
+        keys = self.select(affiliated_only, categories, classification)
+        if not keys or limit <= 0 or not len(queries):
+            return [[] for _ in queries]
+        matrix = np.vstack([to_vector(q) for q in queries]).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+
+        ids = np.concatenate([self.partitions[key][0] for key in keys])
+        scores = np.concatenate([self.partitions[key][1] @ matrix.T for key in keys])  # (상품, 쿼리)
+        if exclude_ids:
+            keep = ~np.isin(ids, np.asarray(list(exclude_ids), dtype=np.int64))
+            ids, scores = ids[keep], scores[keep]
+        if not len(ids):
+            return [[] for _ in queries]
+
+        k = min(limit, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        results = []
+        for col in range(scores.shape[1]):
+            rows = top[:, col]
+            rows = rows[np.argsort(-scores[rows, col])]
+            results.append([(int(ids[i]), float(scores[i, col])) for i in rows])
+        return results
+
+    def nbytes(self):
+        return sum(n.nbytes + d.nbytes + i.nbytes for i, n, d in self.partitions.values())
+
+    def close(self, wait=True):
+        """샤드 인덱스(vector_shards)와 같은 인터페이스용 — 정리할 자원 없음"""
+
+
+def build_index(fingerprint=None):
+    """상품 수가 VECTOR_SHARD_MIN_PRODUCTS 이상이고 VECTOR_SHARDS > 1이면 프로세스 샤드 인덱스로 나눔"""
+    index = PartitionedVectorIndex.build(fingerprint)
+    if settings.VECTOR_SHARDS > 1 and index.size >= settings.VECTOR_SHARD_MIN_PRODUCTS:
+        from .vector_shards import ShardedVectorIndex
+
+        return ShardedVectorIndex.from_index(index, settings.VECTOR_SHARDS, settings.VECTOR_SHARD_BY)
+    return index
+
+
+def catalog_fingerprint():
+    """인덱스 재구성 여부 판단용: (상품 수, 최대 ID, 마지막 임베딩 갱신 시각, 카탈로그 버전)
+
+    버킷 키(분류/카테고리/제휴 여부)만 바뀌는 수정은 임베딩 시각을 바꾸지 않으므로 카탈로그 버전도 함께 본다.
+    (다른 프로세스의 변경도 바로 보이도록 catalog_state()의 TTL 캐시 대신 DB에서 직접 읽음)
+    """
+    from shop.models import CatalogState, Product
+
+    agg = Product.objects.aggregate(n=Count('id'), max_id=Max('id'), last=Max('embedding_updated_at'))
+    version = CatalogState.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+    return agg['n'], agg['max_id'], agg['last'], version
+
+
+_lock = threading.Lock()
+_index = None
+_checked_at = 0.0
+
+
+def get_vector_index():
+    """프로세스 공유 인덱스. VECTOR_INDEX_CHECK_INTERVAL초마다 지문을 확인해 바뀌었으면 재구성"""
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < settings.VECTOR_INDEX_CHECK_INTERVAL:
+        return _index
+    previous = None
+    with _lock:
+        if _index is not None and now - _checked_at < settings.VECTOR_INDEX_CHECK_INTERVAL:
+            return _index
+        fingerprint = catalog_fingerprint()
+        if _index is None or _index.fingerprint != fingerprint:
+            previous, _index = _index, build_index(fingerprint)
+        _checked_at = now
+        index = _index
+    # 이전 샤드 프로세스 종료는 잠금 밖에서 (종료를 기다리는 동안 다른 검색이 막히지 않게)
+    if previous is not None:
+        previous.close()
+    return index
+
+
+def invalidate_vector_index():
+    """다음 조회 때 지문을 다시 확인하도록 (임포트/임베딩 갱신 직후 호출)"""
+    global _checked_at
+    _checked_at = 0.0
@@ -0,0 +1,204 @@
+"""프로세스 풀 샤드 벡터 검색 (scatter-gather)
+
+카탈로그가 크면 PartitionedVectorIndex 검색이 한 코어에 묶이고, 스레드로 나눠도 GIL 때문에 파이썬 구간
+(버킷 순회, 제외/정렬)은 함께 빨라지지 않는다. ShardedVectorIndex는 버킷을 VECTOR_SHARDS개 조각으로 나누고
+조각마다 전용 프로세스(작업자 1개짜리 ProcessPoolExecutor)가 자기 조각만 들고 검색한다.
+- 나누는 기준(VECTOR_SHARD_BY): 'id' — 상품 ID 구간으로 고르게, 'classification' — 분류 단위로 묶어
+  분류 필터 검색은 그 분류가 있는 샤드에만 보냄
+- 검색: 필터에 맞는 버킷이 있는 샤드에만 쿼리를 보내고(scatter) 샤드별 top-k를 점수순으로 합침(gather).
+  전체 top-k는 반드시 어느 샤드의 top-k 안에 있으므로 결과는 단일 인덱스와 같다.
+- 샤드 프로세스는 프로세스마다 첫 검색 때 띄운다 (gunicorn --preload 마스터에서 만든 인덱스도 워커별 풀 사용).
+  부모도 조각을 들고 있어 샤드 프로세스가 죽거나 응답이 늦으면 그 샤드는 부모에서 계산하고 다음 검색 때 다시 띄운다.
+"""
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+from . import metrics
+from .embeddings import to_vector
+from .vector_index import PartitionedVectorIndex
+
+logger = logging.getLogger(__name__)
+
+SHARD_FALLBACKS = metrics.counter('shop_vector_shard_fallbacks_total', '샤드 프로세스 대신 부모에서 계산한 검색 수')
+
+SHARD_BY = ('id', 'classification')
+
+
+# --- 샤드 프로세스 쪽 ---
+
+_shard = None
+
+
+def _load_shard(partitions):
+    global _shard
+    _shard = PartitionedVectorIndex.from_partitions(partitions)
+
+
+def _call_shard(method, args, kwargs):
+    return getattr(_shard, method)(*args, **kwargs)
+
+
+# --- 부모 쪽 ---
+
+def split_partitions(index, shards, by='id'):
+    """index의 버킷을 최대 shards개 조각 [{key: (ids, name 행렬, description 행렬)}]으로 나눔 (빈 조각 제외)"""
+    if by not in SHARD_BY:
+        raise ValueError(f"VECTOR_SHARD_BY는 {SHARD_BY} 중 하나여야 합니다: {by!r}")
+    slices = [{} for _ in range(shards)]
+    if by == 'classification':
+        groups = {}
+        for key, (ids, _, _) in index.partitions.items():
+            keys, size = groups.get(key[0], ([], 0))
+            groups[key[0]] = (keys + [key], size + len(ids))
+        # 큰 분류부터 지금 가장 가벼운 샤드에 배정
+        loads = [0] * shards
+        for keys, size in sorted(groups.values(), key=lambda group: -group[1]):
+            target = loads.index(min(loads))
+            loads[target] += size
+            for key in keys:
+                slices[target][key] = index.partitions[key]
+    else:
+        all_ids = np.sort(np.concatenate([ids for ids, _, _ in index.partitions.values()]))
+        # 조각별 마지막 ID (이 값 이하 → 해당 조각)
+        bounds = [chunk[-1] for chunk in np.array_split(all_ids, shards)[:-1] if len(chunk)]
+        for key, (ids, names, descs) in index.partitions.items():
+            shard_of = np.searchsorted(bounds, ids, side='left')
+            for shard in np.unique(shard_of):
+                mask = shard_of == shard
+                slices[shard][key] = (ids[mask], names[mask], descs[mask])
+    return [partitions for partitions in slices if partitions]
+
+
+class ShardedVectorIndex:
+    """PartitionedVectorIndex와 같은 인터페이스(search/search_batch/select/count/nbytes/close)"""
+
+    def __init__(self, shards, fingerprint=None, by='id'):
+        self.shards = shards  # [PartitionedVectorIndex] 부모 쪽 조각 (프로세스 시작 데이터, 장애 시 대체 계산)
+        self.fingerprint = fingerprint
+        self.by = by
+        self.size = sum(shard.size for shard in shards)
+        self._pools = None
+        self._pid = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_index(cls, index, shards, by='id'):
+        parts = [PartitionedVectorIndex.from_partitions(p, index.fingerprint)
+                 for p in split_partitions(index, shards, by)]
+        return cls(parts, index.fingerprint, by)
+
+    def _executors(self):
+        """샤드별 풀 (닫힌 인덱스면 None — 교체된 인덱스를 아직 들고 있는 요청은 부모 쪽 조각으로 계산)"""
+        with self._lock:
+            if self._closed:
+                return None
+            # 포크로 물려받은 풀은 부모 것이므로 건드리지 않고 새로 띄움
+            if self._pools is None or self._pid != os.getpid():
+                context = multiprocessing.get_context(settings.VECTOR_SHARD_START_METHOD)
+                self._pools = [
+                    ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_load_shard,
+                                        initargs=(shard.partitions,))
+                    for shard in self.shards
+                ]
+                self._pid = os.getpid()
+            return self._pools
+
+    def close(self, wait=True):
+        """인덱스를 닫고 샤드 프로세스 종료 (이후 검색은 부모에서 계산, 풀을 다시 띄우지 않음)"""
+        with self._lock:
+            self._closed = True
+        self._shutdown(wait)
+
+    def _shutdown(self, wait):
+        """샤드 프로세스 종료. wait=False면 실행 중인 검색을 기다리지 않음 (멈춘 샤드 정리용)"""
+        with self._lock:
+            pools, self._pools = self._pools, None
+            if pools is None or self._pid != os.getpid():
+                return
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _scatter(self, method, args, filters, extra=None):
+        """filters에 맞는 샤드에 method(*args, **filters, **extra)를 보내고 샤드별 결과 목록 반환"""
+        targets = [i for i, shard in enumerate(self.shards) if shard.select(**filters)]
+        if not targets:
+            return []
+        kwargs = {**filters, **(extra or {})}
+        pools = self._executors()
+        if pools is None:
+            return [getattr(self.shards[i], method)(*args, **kwargs) for i in targets]
+        futures = {}
+        for i in targets:
+            try:
+                futures[i] = pools[i].submit(_call_shard, method, args, kwargs)
+            except RuntimeError as exc:  # 이미 깨졌거나(BrokenProcessPool) 종료된 풀
+                futures[i] = exc
+        results = []
+        broken = False
+        for i, future in futures.items():
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                results.append(future.result(timeout=settings.VECTOR_SHARD_TIMEOUT))
+            except Exception:
+                logger.warning('벡터 샤드 %d 검색 실패, 부모 프로세스에서 계산', i, exc_info=True)
+                SHARD_FALLBACKS.inc()
+                broken = True
+                results.append(getattr(self.shards[i], method)(*args, **kwargs))
+        if broken:
+            self._shutdown(wait=False)  # 다음 검색 때 다시 띄움
+        return results
+
+    @staticmethod
+    def _filters(affiliated_only, categories, classification):
+        return {
+            'affiliated_only': affiliated_only,
+            'categories': list(categories) if categories else None,
+            'classification': classification,
+        }
+
+    def search(self, query, limit, exclude_ids=None, affiliated_only=False, categories=None, classification=None,
+               description_query=None, weights=(1.0, 0.0)):
+        if limit <= 0:
+            return []
+        args = (to_vector(query), limit, list(exclude_ids) if exclude_ids else None)
+        extra = None
+        if description_query is not None:
+            extra = {'description_query': to_vector(description_query), 'weights': tuple(weights)}
+        hits = self._scatter('search', args, self._filters(affiliated_only, categories, classification), extra)
+        return heapq.nlargest(limit, (hit for shard_hits in hits for hit in shard_hits), key=lambda hit: hit[1])
+
+    def search_batch(self, queries, limit, exclude_ids=None, affiliated_only=False, categories=None,
+                     classification=None):
+        if limit <= 0 or not len(queries):
+            return [[] for _ in queries]
+        args = ([to_vector(q) for q in queries], limit, list(exclude_ids) if exclude_ids else None)
+        per_shard = self._scatter('search_batch', args, self._filters(affiliated_only, categories, classification))
+        if not per_shard:
+            return [[] for _ in queries]
+        return [
+            heapq.nlargest(limit, (hit for shard_results in per_shard for hit in shard_results[q]),
+                           key=lambda hit: hit[1])
+            for q in range(len(queries))
+        ]
+
+    def select(self, affiliated_only=False, categories=None, classification=None):
+        keys = {}
+        for shard in self.shards:
+            keys.update(dict.fromkeys(shard.select(affiliated_only, categories, classification)))
+        return list(keys)
+
+    def count(self, affiliated_only=False, categories=None, classification=None):
+        return sum(shard.count(affiliated_only, categories, classification) for shard in self.shards)
+
+    def nbytes(self):
+        """부모 쪽 조각 크기 (샤드 프로세스도 각자 자기 조각을 같은 크기로 가짐)"""
+        return sum(shard.nbytes() for shard in self.shards)
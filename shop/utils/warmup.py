@@ -0,0 +1,113 @@
+"""워커 기동 단계 계측과 사전 워밍업
+
+- 단계: import(WSGI 앱 로드) → warmup(선택, URLconf/뷰 import, 카탈로그 상태, 벡터 인덱스, 템플릿) → 첫 요청
+- gunicorn --preload(GUNICORN_PRELOAD=1)면 config/gunicorn.conf.py의 when_ready 훅이 마스터에서 warmup()을
+  실행하므로, 포크된 워커들은 만들어진 인덱스/컴파일된 템플릿을 copy-on-write로 공유한다.
+- 워커마다 앱 로드 시간, 워커 시작부터 첫 응답까지 시간을 /metrics로 노출
+"""
+import gc
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SECONDS = metrics.gauge('shop_worker_import_seconds', 'WSGI 앱 로드(import) 시간')
+WARMUP_SECONDS = metrics.gauge('shop_warmup_seconds', '워밍업 단계별 소요 시간 (phase별)')
+FIRST_REQUEST_SECONDS = metrics.gauge('shop_worker_first_request_seconds', '워커 시작부터 첫 응답 완료까지 시간')
+
+WARMUP_TEMPLATES = (
+    'shop/home.html', 'shop/product_list.html', 'shop/product_detail.html', 'shop/cart.html',
+    'shop/consent_form.html',
+)
+
+_worker_started = time.monotonic()
+_first_request_seen = False
+
+
+def record_import(seconds):
+    IMPORT_SECONDS.set(round(seconds, 4))
+
+
+def worker_started():
+    """포크 직후(post_fork) 호출: 첫 요청 시간 측정 기준점을 이 워커 기준으로 다시 잡음"""
+    global _worker_started, _first_request_seen
+    _worker_started = time.monotonic()
+    _first_request_seen = False
+
+
+def observe_request():
+    """요청 완료마다 호출 (첫 요청만 기록)"""
+    global _first_request_seen
+    if _first_request_seen:
+        return
+    _first_request_seen = True
+    FIRST_REQUEST_SECONDS.set(round(time.monotonic() - _worker_started, 4))
+
+
+def _warm_imports():
+    # URLconf는 첫 요청 때 로드되므로 미리 resolve해 뷰 모듈까지 import
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+def _warm_catalog():
+    from .catalog import catalog_state
+
+    catalog_state()
+
+
+def _warm_vector_index():
+    # pgvector를 쓰면 검색은 DB에서 하므로 인메모리 인덱스가 필요 없음
+    from .embeddings import pgvector_enabled
+    from .vector_index import get_vector_index
+
+    if not pgvector_enabled():
+        get_vector_index()
+
+
+def _warm_templates():
+    from django.template.loader import get_template
+
+    for name in WARMUP_TEMPLATES:
+        get_template(name)
+
+
+PHASES = {
+    'imports': _warm_imports,
+    'catalog': _warm_catalog,
+    'vector_index': _warm_vector_index,
+    'templates': _warm_templates,
+}
+
+
+def warmup(phases=None, freeze=False):
+    """phases(기본 WARMUP_PHASES) 순서대로 실행하고 {phase: 초} 반환.
+    실패한 단계는 로그만 남기고 건너뜀 (워커가 첫 요청 때 다시 시도)
+    freeze=True면 포크 전에 gc.freeze()로 지금까지 만든 객체를 GC 대상에서 빼 copy-on-write 공유가 유지되게 함
+    """
+    timings = {}
+    for name in phases if phases is not None else settings.WARMUP_PHASES:
+        func = PHASES.get(name)
+        if func is None:
+            logger.warning('알 수 없는 워밍업 단계: %s', name)
+            continue
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            logger.exception('워밍업 단계 %s 실패', name)
+            continue
+        timings[name] = round(time.perf_counter() - started, 4)
+        WARMUP_SECONDS.set(timings[name], phase=name)
+    # 마스터의 DB 연결을 워커가 물려받지 않도록 닫음
+    connections.close_all()
+    if freeze:
+        gc.freeze()
+    logger.info('워밍업 완료: %s', timings)
+    return timings
@@ -1,11 +1,24 @@
 # shop/views.py
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, HttpResponseBadRequest
 from django.db.models import Q
 from .models import Product, Participant
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.csrf import ensure_csrf_cookie
-import json
+from .utils import metrics as shop_metrics
+from .utils.db import update_pool_metrics
 from .utils.embeddings import OpenAIEmbeddingGenerator
+from .utils.events import CLIENT_EVENT_KINDS, MAX_PRODUCT_ID, MAX_RANK, record_event
+from .utils import carts, images
+from .utils.catalog import SYNC_FIELDS, catalog_delta
+from .utils.http_cache import catalog_conditional, rotation_bucket
+from .utils.resilience import hedged
+from .utils.neighbors import recommend_from_neighbors, related_products as related_products_for
+from .utils.search import hybrid_search
+from .utils.facets import AFFILIATED, get_facet_index
+from django.core.paginator import Paginator
 from datetime import datetime, timedelta
 import random
 
@@ -40,10 +53,14 @@ def consent_form(request):
             # 기존 브라우저 세션(장바구니 포함)을 초기화하고 새 세션으로 시작
             # 동일 브라우저에서 여러 참가자가 연속 참여할 때 이전 장바구니가 보이지 않도록 함
             request.session.flush()
-            # 새 세션에 동의 상태 및 참여자 ID 저장 + 빈 장바구니 보장
+            # 새 세션에 동의 상태 및 참여자 ID 저장
             request.session['experiment_consent'] = True
             request.session['participant_id'] = participant.id
-            request.session['cart'] = {}
+            # 세션 키를 바로 발급받아 참여자와 연결 (내보내기에서 장바구니 조회용)
+            request.session.save()
+            Participant.objects.filter(pk=participant.pk).update(session_key=request.session.session_key)
+            # 참여자 장바구니 (세션에는 cart_id만 저장)
+            carts.create_cart(request, participant.id)
             return redirect('home')
         else:
             return render(request, 'shop/consent_form.html', {
@@ -65,12 +82,8 @@ def home(request):
     random.shuffle(affiliated)
     todays = affiliated[:8] if affiliated else list(qs[:8])
 
-    # 인기 카테고리 샘플
-    categories = (
-        Product.objects.values_list('category', flat=True)
-        .distinct()
-    )
-    categories = [c for c in categories if c][:10]
+    # 인기 카테고리 샘플 (패싯 인덱스의 카테고리 값 — 상품 테이블 DISTINCT 전체 스캔 없이)
+    categories = list(get_facet_index().bitsets['category'])[:10]
 
     context = {
         'todays': todays,
@@ -92,48 +105,85 @@ def product_list(request):
     raw_cls = request.GET.get('cls', '').strip()
     current_cls = raw_cls if raw_cls else ('' if q else '생활용품')
 
-    products = Product.objects.all()
-    # 분류(대카테고리) 필터
-    if current_cls:
-        products = products.filter(classification=current_cls)
-
-    # 검색/소카테고리 필터 (이름/브랜드/카테고리에 광범위 적용)
-    if q:
-        products = (
-            products
-            .filter(
-                Q(name__icontains=q) | Q(brand__icontains=q) | Q(category__icontains=q)
-            )
-        )
+    search_mode = request.GET.get('mode', '').strip() or settings.SEARCH_MODE
+
+    # 패싯 선택 (분류/카테고리/브랜드/가격대/제휴). 필터와 건수는 인메모리 비트셋으로 계산하고
+    # DB는 현재 페이지 상품만 조회
+    index = get_facet_index()
+    selected = {
+        'classification': [current_cls] if current_cls else [],
+        'category': request.GET.getlist('category'),
+        'brand': request.GET.getlist('brand'),
+        'price': request.GET.getlist('price'),
+        'affiliated': [AFFILIATED] if request.GET.get('aff') == '1' else [],
+    }
 
-    # 정렬 전략
-    # - 기본 리스트: id 순
-    # - 검색(q 존재): 제휴 우선 → id 순
-    if q:
-        products = products.order_by('-if_affiliated', 'id')
+    if q and search_mode == 'hybrid':
+        # 하이브리드 검색: 문자열 후보 + 벡터 후보를 RRF로 결합, 제휴 가산점 반영 (패싯은 결과 안에서 적용)
+        # 건수도 화면에 나오는 순위 결과(벡터 후보 포함) 안에서 계산
+        ranked = hybrid_search(q, classification=current_cls or None)
+        result = index.search(selected, base=index.mask_of([p.id for p in ranked]))
+        allowed = set(result.ids)
+        page = Paginator([p for p in ranked if p.id in allowed], settings.PRODUCT_LIST_PAGE_SIZE) \
+            .get_page(request.GET.get('page'))
+        products = page.object_list
+        facet_counts = result.counts
     else:
-        products = products.order_by('id')
+        # 정렬 전략
+        # - 기본 리스트: id 순
+        # - 검색(q 존재, 이름/브랜드/카테고리 부분일치): 제휴 우선 → id 순
+        result = index.search(selected, q=q or None, affiliated_first=bool(q))
+        page = Paginator(result.ids, settings.PRODUCT_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
+        found = Product.objects.in_bulk(page.object_list)
+        products = [found[pid] for pid in page.object_list if pid in found]
+        facet_counts = result.counts
 
     # 현재 분류에 속한 소카테고리 목록(빈 값 제외)
-    categories = (
-        Product.objects
-        .filter(classification=current_cls)
-        .exclude(category__isnull=True)
-        .exclude(category__exact='')
-        .values_list('category', flat=True)
-        .distinct()
-    )
-    categories = list(categories)
+    categories = index.values_within('category', 'classification', current_cls)
 
     context = {
         'products': products,
+        'page_obj': page,
+        'facets': _facet_groups(request, facet_counts, selected),
         'q': q,
+        'search_mode': search_mode,
         'current_cls': current_cls,
         'categories': categories,
         'classifications': ['생활용품', '다과류'],
     }
     return render(request, 'shop/product_list.html', context)
 
+
+# 패싯 이름 → (URL 파라미터, 제목)
+FACET_PARAMS = {
+    'brand': ('brand', '브랜드'),
+    'price': ('price', '가격대'),
+    'affiliated': ('aff', '제휴'),
+}
+
+
+def _facet_groups(request, counts, selected):
+    """템플릿용 패싯 목록: 값마다 건수와 선택 토글 URL (페이지는 처음으로)"""
+    groups = []
+    for name, (param, title) in FACET_PARAMS.items():
+        options = [o for o in counts.get(name, []) if o[2] or o[3]]  # 건수 0은 선택된 것만 표시
+        if name == 'brand':
+            options.sort(key=lambda o: (not o[3], -o[2], o[0]))
+            options = options[:max(settings.FACET_MAX_VALUES, len(selected['brand']))]
+        items = []
+        for value, label, count, is_selected in options:
+            params = request.GET.copy()
+            params.pop('page', None)
+            values = [v for v in params.getlist(param) if v != value]
+            if not is_selected:
+                values.append(value)
+            params.setlist(param, values)
+            items.append({'label': label, 'count': count, 'selected': is_selected,
+                          'url': f"?{params.urlencode()}"})
+        if items:
+            groups.append({'name': name, 'title': title, 'options': items})
+    return groups
+
 @ensure_csrf_cookie
 def product_detail(request, product_id):
     """
@@ -145,23 +195,20 @@ def product_detail(request, product_id):
     
     product = get_object_or_404(Product, id=product_id)
     
-    # 리뷰 데이터 파싱
-    reviews = []
-    if product.reviews:
-        try:
-            reviews = json.loads(product.reviews)
-        except json.JSONDecodeError:
-            reviews = []
-    
-    # 관련 상품 추천 (같은 카테고리의 다른 상품들)
-    related_products = Product.objects.filter(
-        category=product.category
-    ).exclude(id=product_id)[:4]
+    # 리뷰 파싱/관련 상품 조회는 상세 조각 캐시가 비었을 때만 실행되도록 지연 평가
+    def _related_products():
+        # 관련 상품 추천: 미리 계산된 이웃 목록 (4개가 안 되면 같은 카테고리의 다른 상품들로 채움)
+        related = related_products_for(product.id, limit=4)
+        if len(related) < 4:
+            related += list(Product.objects.filter(
+                category=product.category
+            ).exclude(id__in=[product_id, *(p.id for p in related)])[:4 - len(related)])
+        return related
     
     context = {
         'product': product,
-        'reviews': reviews,
-        'related_products': related_products,
+        'reviews': SimpleLazyObject(product.get_reviews_list),
+        'related_products': SimpleLazyObject(_related_products),
     }
     return render(request, 'shop/product_detail.html', context)
 
@@ -174,8 +221,8 @@ def cart_view(request):
     if not request.session.get('experiment_consent', False):
         return redirect('consent_form')
     
-    # 세션 기반 장바구니: {product_id: quantity}
-    cart = request.session.get('cart', {})
+    # 장바구니: {product_id: quantity} (CartItem 테이블)
+    cart = carts.cart_contents(request)
     cart_product_ids = list(map(int, cart.keys())) if cart else []
     cart_products = Product.objects.filter(id__in=cart_product_ids)
 
@@ -195,24 +242,10 @@ def cart_view(request):
     # 배송비 정책: 30,000원 미만 3,000원, 이상 무료
     shipping = 0 if subtotal >= 30000 or subtotal == 0 else 3000
     total = subtotal + shipping
-    
-    # --- 💡 연구 핵심: 조작된 추천 로직 ---
-    # 1. 장바구니 상품들의 카테고리를 가져옵니다.
-    cart_categories = [p.category for p in cart_products]
-    
-    # 2. 제휴 브랜드(if_affiliated=True)이면서,
-    #    장바구니 상품과 카테고리가 겹치는 상품들을 추천 후보로 선정합니다.
-    recommended_products = Product.objects.filter(
-        if_affiliated=True,
-        category__in=cart_categories
-    ).exclude(
-        id__in=cart_product_ids # 장바구니에 이미 있는 상품은 제외
-    ).distinct()[:5] # 추천 상품 5개만 선택
-    
-    # "당신의 취향을 기반으로 추천합니다" 라는 문구와 함께 전달
+
+    # 추천 상품은 페이지의 AI 추천 박스가 api_ai_recommendations로 따로 불러옴 (노출 이벤트도 그쪽에서 기록)
     context = {
         'cart_products': cart_products,
-        'recommended_products': recommended_products,
         'cart_quantities': {str(k): v for k, v in cart.items()},
         'subtotal': subtotal,
         'shipping': shipping,
@@ -222,37 +255,33 @@ def cart_view(request):
 
 
 def add_to_cart(request):
-    """AJAX: 장바구니 담기 (세션 기반)
-    POST: product_id, quantity(옵션, 기본 1)
+    """AJAX: 장바구니 담기 (CartItem 저장, 세션에는 cart_id만)
+    POST: product_id, quantity(옵션, 기본 1), source(옵션, 담기 위치: ai_reco/product_list/product_detail)
     """
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid method')
 
     try:
         product_id = int(request.POST.get('product_id'))
-        quantity = int(request.POST.get('quantity', 1))
-        if quantity < 1:
-            quantity = 1
+        quantity = min(max(1, int(request.POST.get('quantity', 1))), carts.MAX_QUANTITY)
     except (TypeError, ValueError):
         return JsonResponse({'ok': False, 'error': 'invalid-params'}, status=400)
 
     # 존재 검증
     try:
-        Product.objects.only('id').get(id=product_id)
+        product = Product.objects.only('id', 'if_affiliated').get(id=product_id)
     except Product.DoesNotExist:
         return JsonResponse({'ok': False, 'error': 'product-not-found'}, status=404)
 
-    cart = request.session.get('cart', {})
-    current_qty = int(cart.get(str(product_id), 0))
-    cart[str(product_id)] = current_qty + quantity
-    request.session['cart'] = cart
-    request.session.modified = True
+    source = request.POST.get('source', '')
+    carts.add_item(request, product, quantity, source=source[:30])
+    record_event(request, 'cart_add', product_id=product_id, source=source, quantity=quantity)
 
-    return JsonResponse({'ok': True, 'cart': cart})
+    return JsonResponse({'ok': True, 'cart': carts.cart_contents(request)})
 
 
 def _calc_summary(cart: dict):
-    """세션 카트(dict[str,int])로부터 합계 계산"""
+    """카트(dict[str,int], carts.cart_contents)로부터 합계 계산"""
     ids = [int(k) for k in cart.keys()] if cart else []
     products = Product.objects.filter(id__in=ids)
     qty_map = {int(k): max(1, int(v)) if str(v).isdigit() or isinstance(v, int) else 1 for k, v in cart.items()}
@@ -270,31 +299,25 @@ def _calc_summary(cart: dict):
 
 
 def update_cart(request):
-    """AJAX: 수량 변경/삭제 (quantity <= 0 이면 제거)
+    """AJAX: 수량 변경/삭제 (quantity <= 0 이면 제거, 최대 carts.MAX_QUANTITY)
     POST: product_id, quantity
     """
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid method')
     try:
         product_id = int(request.POST.get('product_id'))
-        quantity = int(request.POST.get('quantity', 1))
+        quantity = min(int(request.POST.get('quantity', 1)), carts.MAX_QUANTITY)
     except (TypeError, ValueError):
         return JsonResponse({'ok': False, 'error': 'invalid-params'}, status=400)
 
     # 존재 검증
     try:
-        Product.objects.only('id').get(id=product_id)
+        product = Product.objects.only('id', 'if_affiliated').get(id=product_id)
     except Product.DoesNotExist:
         return JsonResponse({'ok': False, 'error': 'product-not-found'}, status=404)
 
-    cart = request.session.get('cart', {})
-    key = str(product_id)
-    if quantity <= 0:
-        cart.pop(key, None)
-    else:
-        cart[key] = quantity
-    request.session['cart'] = cart
-    request.session.modified = True
+    carts.set_quantity(request, product, quantity)
+    cart = carts.cart_contents(request)
 
     summary = _calc_summary(cart)
     return JsonResponse({'ok': True, 'cart': cart, 'summary': summary})
@@ -304,8 +327,7 @@ def clear_cart(request):
     """AJAX: 장바구니 비우기"""
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid method')
-    request.session['cart'] = {}
-    request.session.modified = True
+    carts.clear_cart(request)
     return JsonResponse({'ok': True, 'cart': {}, 'summary': {'count': 0, 'subtotal': 0, 'shipping': 0, 'total': 0}})
 
 
@@ -316,8 +338,8 @@ def api_ai_recommendations(request):
     if request.method != 'GET':
         return HttpResponseBadRequest('Invalid method')
 
-    # 세션 장바구니
-    cart = request.session.get('cart', {})
+    # 장바구니
+    cart = carts.cart_contents(request)
     cart_ids = [int(k) for k in cart.keys()] if cart else []
     if not cart_ids:
         return JsonResponse({'ok': True, 'results': []})
@@ -327,15 +349,72 @@ def api_ai_recommendations(request):
     except ValueError:
         limit = 8
 
-    gen = OpenAIEmbeddingGenerator()
-    results = gen.recommend_for_products(
-        product_ids=cart_ids,
-        limit=limit,
-        affiliated_only=True,
-        use_categories=True,
+    def ai_recommendations():
+        # 이웃 테이블이 있으면 한 번의 조회로, 없으면 벡터 검색으로 추천
+        results = recommend_from_neighbors(
+            cart_ids,
+            limit=limit,
+            affiliated_only=True,
+            use_categories=True,
+        )
+        if not results:
+            gen = OpenAIEmbeddingGenerator()
+            results = gen.recommend_for_products(
+                product_ids=cart_ids,
+                limit=limit,
+                affiliated_only=True,
+                use_categories=True,
+            )
+        return results
+
+    # 지연 예산 안에 끝나지 않거나 임베딩을 못 얻으면 카테고리/제휴 SQL 추천으로 응답
+    results, outcome = hedged(
+        'ai_reco', ai_recommendations, lambda: _category_recommendations(cart_ids, limit),
+        settings.AI_RECO_BUDGET_SECONDS,
     )
 
-    return JsonResponse({'ok': True, 'results': results})
+    for rank, item in enumerate(results, start=1):
+        if images.thumbnails_enabled() and item.get('img'):
+            item['thumb'] = images.thumb_url(item['id'], item['img'], 320)
+        record_event(request, 'reco_impression', product_id=item.get('id'), source='ai_reco', rank=rank,
+                     score=item.get('similarity_score'), strategy=outcome)
+
+    return JsonResponse({'ok': True, 'results': results, 'fallback': outcome != 'primary'})
+
+
+def _category_recommendations(cart_ids, limit=8):
+    """AI 추천 대체 전략: 장바구니와 카테고리가 겹치는 제휴 상품 (cart_view 추천과 같은 규칙)"""
+    categories = Product.objects.filter(id__in=cart_ids).values('category')
+    rows = (
+        Product.objects.filter(if_affiliated=True, category__in=categories)
+        .exclude(id__in=cart_ids)
+        .order_by('id')
+        .values('id', 'name', 'brand', 'price', 'if_affiliated', 'img', 'category')[:limit]
+    )
+    return [dict(row, similarity_score=None) for row in rows]
+
+
+def api_events(request):
+    """AJAX/sendBeacon: 클라이언트 이벤트 기록 (추천 클릭 등)
+    POST: kind, product_id(옵션), source(옵션), rank(옵션)
+    """
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid method')
+    kind = request.POST.get('kind', '')
+    if kind not in CLIENT_EVENT_KINDS:
+        return JsonResponse({'ok': False, 'error': 'invalid-kind'}, status=400)
+    try:
+        product_id = int(request.POST['product_id']) if request.POST.get('product_id') else None
+        rank = int(request.POST['rank']) if request.POST.get('rank') else None
+    except ValueError:
+        return JsonResponse({'ok': False, 'error': 'invalid-params'}, status=400)
+    # 컬럼 범위를 벗어난 값이 섞이면 Postgres에서 배치 저장이 실패하므로 여기서 거름
+    if (product_id is not None and not 1 <= product_id <= MAX_PRODUCT_ID) \
+            or (rank is not None and not 1 <= rank <= MAX_RANK):
+        return JsonResponse({'ok': False, 'error': 'invalid-params'}, status=400)
+
+    record_event(request, kind, product_id=product_id, source=request.POST.get('source', ''), rank=rank)
+    return JsonResponse({'ok': True})
 
 
 def _suggest_from_products(query: str, limit: int = 8):
@@ -359,7 +438,7 @@ def _suggest_from_products(query: str, limit: int = 8):
     return out
 
 
-@ensure_csrf_cookie
+@catalog_conditional()
 def api_search_suggest(request):
     if request.method != 'GET':
         return HttpResponseBadRequest('Invalid method')
@@ -371,20 +450,110 @@ def api_search_suggest(request):
     return JsonResponse({'ok': True, 'suggestions': _suggest_from_products(q, limit)})
 
 
-@ensure_csrf_cookie
+@catalog_conditional(rotate_seconds=settings.TRENDING_ROTATE_SECONDS)
 def api_search_trending(request):
-    """가상의 실시간 검색어 제공: 최근 인기 카테고리/브랜드/키워드 믹스"""
+    """가상의 실시간 검색어 제공: 최근 인기 카테고리/브랜드/키워드 믹스
+    (TRENDING_ROTATE_SECONDS 구간마다 순서가 바뀌고, 구간 안에서는 같은 응답이라 캐시 가능)
+    """
     if request.method != 'GET':
         return HttpResponseBadRequest('Invalid method')
     brands = list(Product.objects.values_list('brand', flat=True).distinct()[:30])
     cats = list(Product.objects.values_list('category', flat=True).distinct()[:30])
     picks = [b for b in brands if b][:10] + [c for c in cats if c][:10]
-    random.shuffle(picks)
+    rng = random.Random(rotation_bucket(settings.TRENDING_ROTATE_SECONDS))
+    rng.shuffle(picks)
     trending = picks[:10]
     # 랭킹과 변동 화살표 가상 부여
     arrows = ['▲', '▼', '→']
     payload = [
-        {'rank': i+1, 'term': t, 'delta': random.choice(arrows)}
+        {'rank': i+1, 'term': t, 'delta': rng.choice(arrows)}
         for i, t in enumerate(trending)
     ]
-    return JsonResponse({'ok': True, 'trending': payload})
\ No newline at end of file
+    return JsonResponse({'ok': True, 'trending': payload})
+
+
+@catalog_conditional()
+def api_catalog(request):
+    """카탈로그 동기화 (클라이언트 IndexedDB 캐시용)
+    GET: since(옵션, 이전 응답의 version → 그 뒤 바뀐 상품과 삭제된 ID만), fields(옵션, 쉼표 구분)
+    응답: {version, full, fields, products: [[필드 순서대로 값]], deleted: [ID]}
+    """
+    if request.method != 'GET':
+        return HttpResponseBadRequest('Invalid method')
+    try:
+        since = int(request.GET['since']) if request.GET.get('since') else None
+    except ValueError:
+        return JsonResponse({'ok': False, 'error': 'invalid-since'}, status=400)
+
+    requested = [f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()]
+    allowed = set(SYNC_FIELDS) | {'thumb'}
+    if any(f not in allowed for f in requested):
+        return JsonResponse({'ok': False, 'error': 'invalid-fields', 'allowed': sorted(allowed)}, status=400)
+    fields = ['id'] + [f for f in dict.fromkeys(requested or SYNC_FIELDS) if f != 'id']
+
+    db_fields = [f for f in fields if f != 'thumb']
+    if 'thumb' in fields and 'img' not in db_fields:
+        db_fields.append('img')
+    version, rows, deleted = catalog_delta(since, db_fields)
+    if since is not None and since > version:
+        # 클라이언트 버전이 서버보다 앞섬 (DB 초기화 등): 전체 다시 받기
+        since = None
+        version, rows, deleted = catalog_delta(None, db_fields)
+
+    if 'thumb' in fields:
+        img_at = db_fields.index('img')
+        thumbs = images.thumbnails_enabled()
+        rows = [
+            dict(zip(db_fields, row), thumb=images.thumb_url(row[0], row[img_at], 160) if thumbs and row[img_at]
+                 else row[img_at])
+            for row in rows
+        ]
+        rows = [[row[f] for f in fields] for row in rows]
+
+    return JsonResponse({
+        'ok': True,
+        'version': version,
+        'full': since is None,
+        'fields': fields,
+        'products': rows,
+        'deleted': deleted,
+    })
+
+
+def product_thumbnail(request, product_id, digest, width, ext):
+    """상품 썸네일 (MEDIA_ROOT/thumbs/). nginx는 만들어진 파일을 직접 서빙하므로 여기에는 없는 변형만 도달한다.
+    요청 경로에서는 원본을 받지 않는다: 생성은 작업 큐에 등록하고 그동안 외부 원본 URL로 리다이렉트
+    """
+    fmt = images.FORMATS.get(ext)
+    if fmt not in settings.THUMBNAIL_FORMATS or width not in settings.THUMBNAIL_WIDTHS:
+        raise Http404('unknown variant')
+    product = get_object_or_404(Product.objects.only('id', 'img'), id=product_id)
+    if not product.img:
+        raise Http404('no image')
+    if not images.thumbnails_enabled():
+        return redirect(product.img)
+    if images.url_digest(product.img) != digest:
+        # 원본 URL이 바뀐 뒤의 오래된 페이지: 현재 썸네일로 안내
+        return redirect(images.thumb_url(product.id, product.img, width, fmt))
+
+    path = settings.MEDIA_ROOT / images.thumb_name(product.id, product.img, width, fmt)
+    if not path.exists():
+        images.request_thumbnails(product.id, product.img)
+        return redirect(product.img)
+    response = FileResponse(open(path, 'rb'), content_type=f'image/{fmt}')
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def metrics(request):
+    """Prometheus 텍스트 포맷 메트릭 (워커 프로세스 단위)
+    운영(DEBUG=False)에서는 METRICS_TOKEN이 있어야 열림 (풀/큐/브레이커 내부 상태 노출 방지)
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden('METRICS_TOKEN not configured')
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden('forbidden')
+    update_pool_metrics()
+    return HttpResponse(shop_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')